@@ -0,0 +1,88 @@
+"""
+Benchmark for the optional event compression (EventPublisher(compression=...)): Compares the encoded size
+and the encode/decode times of large events, with each available compression algorithm, using
+representative detector and AO telemetry payloads.
+Since each published event is sent to Redis twice (SET and PUBLISH), the bytes saved per event are twice
+the difference in size.
+
+Run from the top level directory with:
+
+    PYTHONPATH=. python benchmarks/bench_event_compression.py [--json results.json]
+"""
+import argparse
+import json
+import sys
+import timeit
+
+import numpy as np
+
+from csw.Event import SystemEvent
+from csw.EventCodec import EventCodec
+from csw.EventName import EventName
+from csw.Parameter import FloatMatrixKey, ByteArrayKey, DoubleArrayKey
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+prefix = Prefix(Subsystem.CSW, "benchmark")
+
+
+def makeEvents() -> dict[str, SystemEvent]:
+    rng = np.random.default_rng(42)
+    y, x = np.mgrid[0:256, 0:256]
+    # Smooth image: A star on a background with a little noise, quantized like detector data
+    spot = 1000 * np.exp(-((x - 128) ** 2 + (y - 100) ** 2) / 50) + 100
+    smoothImage = np.round(spot + rng.normal(0, 2, spot.shape)).astype(np.float32)
+    noise = rng.normal(0, 1, (256, 256)).astype(np.float32)
+    frame = rng.poisson(20, 512 * 512).astype(np.uint8).tobytes()
+    telemetry = np.round(np.sin(np.arange(10000) / 100) * 1000) / 1000
+
+    def event(name, param):
+        return SystemEvent(prefix, EventName(name), [param])
+
+    return {
+        "FloatMatrix 256x256 image": event("image", FloatMatrixKey.make("image").set(smoothImage)),
+        "FloatMatrix 256x256 noise": event("noise", FloatMatrixKey.make("noise").set(noise)),
+        "ByteArray 512x512 frame": event("frame", ByteArrayKey.make("frame").set(frame)),
+        "DoubleArray 10000 telemetry": event("telemetry", DoubleArrayKey.make("telemetry").set(telemetry)),
+    }
+
+
+def timePerCall(func, number: int = 10) -> float:
+    """
+    Returns the best time per call in microseconds
+    """
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event compression benchmark")
+    parser.add_argument("--json", help="file to write the results to")
+    args = parser.parse_args()
+
+    decoder = EventCodec()
+    results = {}
+    for name, event in makeEvents().items():
+        results[name] = {}
+        for algorithm in [None] + EventCodec.compressionAlgorithms():
+            codec = EventCodec(compression=algorithm, compressionThreshold=0)
+            data = codec.encode(event)
+            results[name][algorithm or "none"] = {
+                "bytes": len(data),
+                "encode_us": timePerCall(lambda: codec.encode(event)),
+                "decode_us": timePerCall(lambda: decoder.decode(data)),
+            }
+
+    for name, r in results.items():
+        raw = r["none"]["bytes"]
+        print(name, file=sys.stderr)
+        for algorithm, a in r.items():
+            print(f"    {algorithm:6} {a['bytes']:9d} bytes ({a['bytes'] / raw * 100:5.1f}%)  "
+                  f"encode {a['encode_us']:9.0f} us  decode {a['decode_us']:9.0f} us  "
+                  f"saved per publish: {2 * (raw - a['bytes']):9d} bytes", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Benchmark suite for the Event Service, with results in JSON format for regression tracking:
+
+* encoding and decoding of an event with a parameter of each key type
+* publish rate (single events and batches)
+* end to end latency (publish to subscriber callback) percentiles
+* subscriber fan-out (one publisher, many subscribers)
+
+By default the benchmarks use InMemoryRedis, which measures the client side cost only and needs no services.
+Use --redis to run against a local redis-server instead (the events are published directly to it,
+without the sentinel and location service). Run from the top level directory with:
+
+    PYTHONPATH=. python benchmarks/bench_event_service.py [--redis localhost:6379] [--json results.json]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+import redis.asyncio
+
+from csw.Coords import EqCoord, EqFrame, SolarSystemCoord, SolarSystemObject, MinorPlanetCoord, CometCoord, AltAzCoord
+from csw.Event import SystemEvent
+from csw.EventCodec import EventCodec
+from csw.EventKey import EventKey
+from csw.EventName import EventName
+from csw.EventPublisher import EventPublisher
+from csw.EventSubscriber import EventSubscriber
+from csw.InMemoryRedis import InMemoryRedis
+from csw.Parameter import *
+from csw.Prefix import Prefix
+from csw.RedisConnector import RedisConnector
+from csw.Subsystem import Subsystem
+from csw.TMTTime import UTCTime, TAITime
+from csw.Units import Units
+
+prefix = Prefix(Subsystem.CSW, "benchmark")
+
+
+def makeParams() -> list[Parameter]:
+    """
+    Returns a parameter for each key type (with a few values each)
+    """
+    eqCoord = EqCoord.make(ra="12:13:14.15 hours", dec="-30:31:32.3 deg", frame=EqFrame.FK5, pm=(0.5, 2.33))
+    return [
+        IntKey.make("IntKey", Units.arcsec).set(1, 2, 3),
+        LongKey.make("LongKey").set(1, 2, 3),
+        ShortKey.make("ShortKey").set(1, 2, 3),
+        ByteKey.make("ByteKey").set(0xDE, 0xAD, 0xBE, 0xEF),
+        FloatKey.make("FloatKey").set(1.1, 2.2, 3.3),
+        DoubleKey.make("DoubleKey").set(1.1, 2.2, 3.3),
+        BooleanKey.make("BooleanKey").set(True, False),
+        CharKey.make("CharKey").set('a', 'b'),
+        StringKey.make("StringKey").set("abc", "def"),
+        ChoiceKey.make("ChoiceKey", ["A", "B", "C"]).set("A", "C"),
+        UTCTimeKey.make("UTCTimeKey").set(UTCTime.now()),
+        TAITimeKey.make("TAITimeKey").set(TAITime.now()),
+        ByteArrayKey.make("ByteArrayKey").set(b'\xDE\xAD\xBE\xEF', bytes([1, 2, 3, 4])),
+        ShortArrayKey.make("ShortArrayKey").set([1, 2, 3, 4]),
+        LongArrayKey.make("LongArrayKey").set([1, 2, 3, 4]),
+        IntArrayKey.make("IntArrayKey").set([1, 2, 3, 4], [5, 6, 7, 8]),
+        FloatArrayKey.make("FloatArrayKey").set([1.2, 2.3, 3.4], [5.6, 7.8, 9.1]),
+        DoubleArrayKey.make("DoubleArrayKey").set(list(range(1000))),
+        ByteMatrixKey.make("ByteMatrixKey").set([[1, 2], [3, 4]]),
+        ShortMatrixKey.make("ShortMatrixKey").set([[1, 2], [3, 4]]),
+        LongMatrixKey.make("LongMatrixKey").set([[1, 2], [3, 4]]),
+        IntMatrixKey.make("IntMatrixKey").set([[1, 2, 3, 4], [5, 6, 7, 8]]),
+        FloatMatrixKey.make("FloatMatrixKey").set([[1.0, 2.0], [3.0, 4.0]]),
+        DoubleMatrixKey.make("DoubleMatrixKey").set([[1.0, 2.0], [3.0, 4.0]]),
+        EqCoordKey.make("EqCoordKey").set(eqCoord),
+        SolarSystemCoordKey.make("SolarSystemCoordKey").set(SolarSystemCoord.make("BASE", SolarSystemObject.Venus)),
+        MinorPlanetCoordKey.make("MinorPlanetCoordKey").set(
+            MinorPlanetCoord.make("GUIDER1", 2000, "90 deg", "2 deg", "100 deg", 1.4, 0.234, "220 deg")),
+        CometCoordKey.make("CometCoordKey").set(CometCoord.make("BASE", 2000.0, "90 deg", "2 deg", "100 deg", 1.4, 0.234)),
+        AltAzCoordKey.make("AltAzCoordKey").set(AltAzCoord.make("301 deg", "42.5 deg")),
+    ]
+
+
+def timePerCall(func, number: int) -> float:
+    """
+    Returns the best time per call in microseconds
+    """
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def percentiles(samples: list[float]) -> dict:
+    # The inclusive method keeps the percentiles within the range of the samples
+    q = statistics.quantiles(samples, n=100, method='inclusive')
+    return {"p50": q[49], "p90": q[89], "p99": q[98], "max": max(samples), "mean": statistics.fmean(samples)}
+
+
+def benchCodec(number: int) -> dict:
+    codec = EventCodec()
+    results = {}
+    for param in makeParams():
+        event = SystemEvent(prefix, EventName("codecEvent"), [param])
+        data = codec.encode(event)
+        # The coordinate key types are much slower to decode (astropy)
+        n = number // 10 if "Coord" in param.keyName else number
+        results[param.keyName] = {
+            "bytes": len(data),
+            "encode_us": timePerCall(lambda: codec.encode(event), n),
+            "decode_us": timePerCall(lambda: codec.decode(data), n),
+        }
+    return results
+
+
+async def benchPublish(makeClient, count: int, batchSize: int) -> dict:
+    pub = EventPublisher(RedisConnector(client=makeClient()))
+    events = [SystemEvent(prefix, EventName(f"publishEvent{i % 100}"), [IntKey.make("value").set(i)])
+              for i in range(count)]
+    start = time.perf_counter()
+    for event in events:
+        await pub.publish(event)
+    singleSecs = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(0, count, batchSize):
+        await pub.publishBatch(events[i:i + batchSize])
+    batchSecs = time.perf_counter() - start
+    await pub.close()
+    return {
+        "events": count,
+        "publish_per_sec": count / singleSecs,
+        "batch_size": batchSize,
+        "publishBatch_per_sec": count / batchSecs,
+    }
+
+
+async def benchLatency(makeClient, count: int) -> dict:
+    """
+    Publishes one event at a time and waits until the subscriber callback receives it
+    """
+    pub = EventPublisher(RedisConnector(client=makeClient()))
+    sub = EventSubscriber(RedisConnector(client=makeClient()))
+    eventName = EventName("latencyEvent")
+    received = asyncio.Event()
+    samples = []
+    sentTime = 0.0
+
+    async def callback(_):
+        samples.append((time.perf_counter() - sentTime) * 1e6)
+        received.set()
+
+    subscription = await sub.subscribe([EventKey(prefix, eventName)], callback)
+    for i in range(count):
+        event = SystemEvent(prefix, eventName, [IntKey.make("value").set(i)])
+        received.clear()
+        sentTime = time.perf_counter()
+        await pub.publish(event)
+        await asyncio.wait_for(received.wait(), 5)
+    await subscription.unsubscribe()
+    await pub.close()
+    await sub.close()
+    return {"events": count, "latency_us": percentiles(samples)}
+
+
+async def benchFanOut(makeClient, count: int, numSubscribers: int) -> dict:
+    """
+    Publishes events to many subscribers (each with its own connection) and waits until all of them are received
+    """
+    pub = EventPublisher(RedisConnector(client=makeClient()))
+    subs = [EventSubscriber(RedisConnector(client=makeClient())) for _ in range(numSubscribers)]
+    eventName = EventName("fanOutEvent")
+    eventKey = EventKey(prefix, eventName)
+    expected = count * numSubscribers
+    done = asyncio.Event()
+    deliveries = 0
+
+    async def callback(_):
+        nonlocal deliveries
+        deliveries += 1
+        if deliveries == expected:
+            done.set()
+
+    subscriptions = [await sub.subscribe([eventKey], callback) for sub in subs]
+    events = [SystemEvent(prefix, eventName, [IntKey.make("value").set(i)]) for i in range(count)]
+    start = time.perf_counter()
+    for event in events:
+        await pub.publish(event)
+    await asyncio.wait_for(done.wait(), 60)
+    secs = time.perf_counter() - start
+    for subscription in subscriptions:
+        await subscription.unsubscribe()
+    for sub in subs:
+        await sub.close()
+    await pub.close()
+    return {"events": count, "subscribers": numSubscribers, "deliveries_per_sec": expected / secs}
+
+
+async def runBenchmarks(args) -> dict:
+    if args.redis:
+        host, _, port = args.redis.partition(':')
+        transport = f"redis://{host}:{port or 6379}"
+
+        def makeClient():
+            return redis.asyncio.Redis(host=host, port=int(port or 6379))
+    else:
+        transport = "InMemoryRedis"
+        inMemoryRedis = InMemoryRedis()
+
+        def makeClient():
+            return inMemoryRedis
+
+    return {
+        "transport": transport,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "results": {
+            "codec": benchCodec(args.codecIterations),
+            "publish": await benchPublish(makeClient, args.events, args.batchSize),
+            "latency": await benchLatency(makeClient, args.events),
+            "fanOut": await benchFanOut(makeClient, args.events // 10, args.subscribers),
+        }
+    }
+
+
+def printResults(report: dict):
+    print(f"Transport: {report['transport']}", file=sys.stderr)
+    results = report["results"]
+    for keyName, r in results["codec"].items():
+        print(f"{keyName:25} {r['bytes']:6d} bytes  encode {r['encode_us']:8.1f} us  decode {r['decode_us']:8.1f} us",
+              file=sys.stderr)
+    publish = results["publish"]
+    print(f"publish: {publish['publish_per_sec']:.0f} events/sec, "
+          f"publishBatch({publish['batch_size']}): {publish['publishBatch_per_sec']:.0f} events/sec", file=sys.stderr)
+    latency = results["latency"]["latency_us"]
+    print(f"latency: p50 {latency['p50']:.1f} us, p90 {latency['p90']:.1f} us, p99 {latency['p99']:.1f} us, "
+          f"max {latency['max']:.1f} us", file=sys.stderr)
+    fanOut = results["fanOut"]
+    print(f"fan-out to {fanOut['subscribers']} subscribers: {fanOut['deliveries_per_sec']:.0f} deliveries/sec",
+          file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event Service benchmarks")
+    parser.add_argument("--redis", help="host:port of a local redis-server to use instead of InMemoryRedis")
+    parser.add_argument("--json", help="file to write the results to (default: stdout)")
+    parser.add_argument("--events", type=int, default=2000, help="number of events for the publish and latency benchmarks")
+    parser.add_argument("--batchSize", type=int, default=100, help="number of events per publishBatch() call")
+    parser.add_argument("--subscribers", type=int, default=20, help="number of subscribers for the fan-out benchmark")
+    parser.add_argument("--codecIterations", type=int, default=1000, help="iterations for the codec benchmarks")
+    args = parser.parse_args()
+
+    report = asyncio.run(runBenchmarks(args))
+    printResults(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark for the client side JSON cost of the HTTP requests made by CommandService, SequencerClient and
+LocationService: Compares the previous request path (json.loads(json.dumps(data)), then serialized again by aiohttp's
+json= argument, and the response decoded with response.json()) with JsonCodec (one pass to bytes, and the
+response decoded from its bytes, using orjson if installed).
+
+Both a serialization only benchmark and requests to a local aiohttp server (started by this script, so no services
+are needed) are run, for a small command and one with large array parameters.
+Run from the top level directory with:
+
+    PYTHONPATH=. python benchmarks/bench_json_requests.py [--requests 2000] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import timeit
+
+from aiohttp import ClientSession, web
+
+from csw.CommandResponse import Completed
+from csw.CommandServiceRequest import Submit
+from csw.JsonCodec import JsonCodec, orjson
+from csw.LocationService import LocationServiceUtil
+from csw.Parameter import IntKey, DoubleArrayKey, StringKey
+from csw.ParameterSetType import Setup, CommandName
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+prefix = Prefix(Subsystem.CSW, "benchmark")
+
+
+def makeRequests() -> dict[str, dict]:
+    small = Setup(prefix, CommandName("move"), None, [IntKey.make("axis").set(1), StringKey.make("mode").set("fast")])
+    large = Setup(prefix, CommandName("configure"), None,
+                  [DoubleArrayKey.make(f"axis{i}").set([j / 7 for j in range(100)]) for i in range(20)])
+    return {"small command": Submit(small)._asDict(), "large command": Submit(large)._asDict()}
+
+
+def timePerCall(func, number: int) -> float:
+    """
+    Returns the best time per call in microseconds
+    """
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def benchSerialization(request: dict, number: int) -> dict:
+    return {
+        # What the client did before: a round trip through a string, and then aiohttp's json.dumps()
+        "before_us": timePerCall(lambda: json.dumps(json.loads(json.dumps(request))).encode(), number),
+        "after_us": timePerCall(lambda: JsonCodec.encode(request), number),
+    }
+
+
+async def benchRequests(session: ClientSession, url: str, request: dict, count: int) -> dict:
+    headers = {'Content-type': 'application/json'}
+
+    async def before():
+        response = await session.post(url, headers=headers, json=json.loads(json.dumps(request)))
+        return await response.json()
+
+    async def after():
+        response = await JsonCodec.post(session, url, request)
+        return await JsonCodec.readResponse(response)
+
+    results = {}
+    for name, func in [("before", before), ("after", after)]:
+        await func()
+        start = time.perf_counter()
+        for _ in range(count):
+            await func()
+        results[f"{name}_us"] = (time.perf_counter() - start) / count * 1e6
+    return results
+
+
+async def runBenchmarks(args) -> dict:
+    responseBody = json.dumps(Completed("benchmark-run-id")._asDict())
+
+    async def handlePost(request: web.Request) -> web.Response:
+        await request.read()
+        return web.Response(text=responseBody, content_type="application/json")
+
+    app = web.Application(client_max_size=16 * 1024 * 1024)
+    app.add_routes([web.post('/post-endpoint', handlePost)])
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = LocationServiceUtil.getFreePort()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    results = {}
+    try:
+        async with ClientSession() as session:
+            for name, request in makeRequests().items():
+                results[name] = {
+                    "bytes": len(JsonCodec.encode(request)),
+                    "serialization": benchSerialization(request, args.iterations),
+                    "request": await benchRequests(session, f"http://127.0.0.1:{port}/post-endpoint", request,
+                                                   args.requests),
+                }
+    finally:
+        await runner.cleanup()
+    return {"orjson": orjson is not None, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON request overhead benchmark")
+    parser.add_argument("--requests", type=int, default=2000, help="number of requests to the local server")
+    parser.add_argument("--iterations", type=int, default=2000, help="iterations for the serialization benchmark")
+    parser.add_argument("--json", help="file to write the results to")
+    args = parser.parse_args()
+
+    report = asyncio.run(runBenchmarks(args))
+    print(f"orjson: {'yes' if report['orjson'] else 'no (json module)'}", file=sys.stderr)
+    for name, r in report["results"].items():
+        s, q = r["serialization"], r["request"]
+        print(f"{name} ({r['bytes']} bytes): serialization {s['before_us']:.1f} -> {s['after_us']:.1f} us, "
+              f"request {q['before_us']:.0f} -> {q['after_us']:.0f} us", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
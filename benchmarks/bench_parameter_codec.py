@@ -0,0 +1,88 @@
+"""
+Micro-benchmark for encoding and decoding the parameters of an event or command,
+using the parameter mix from examples/TestPublisher3.py,
+and the CBOR event encoding used by the Event Service.
+
+Run from the top level directory with:
+
+    PYTHONPATH=. python benchmarks/bench_parameter_codec.py
+"""
+import timeit
+
+from csw.Coords import EqCoord, EqFrame, SolarSystemCoord, SolarSystemObject, MinorPlanetCoord, CometCoord, AltAzCoord
+from csw.Event import SystemEvent, Event
+from csw.EventCodec import EventCodec
+from csw.EventName import EventName
+from csw.Parameter import *
+from csw.Parameter import _cborDefault
+from csw.ParameterSetType import Setup, CommandName, SequenceCommand
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+from csw.Units import Units
+
+
+def makeParamSet() -> list:
+    intParam = IntKey.make("IntValue", Units.arcsec).set(42)
+    floatParam = FloatKey.make("floatValue", Units.arcsec).set(42.1)
+    longParam = LongKey.make("longValue", Units.arcsec).set(42)
+    shortParam = ShortKey.make("shortValue", Units.arcsec).set(42)
+    byteParam = ByteKey.make("byteValue").set(0xDE, 0xAD, 0xBE, 0xEF)
+    booleanParam = BooleanKey.make("booleanValue").set(True, False)
+
+    intArrayParam = IntArrayKey.make("IntArrayValue").set([1, 2, 3, 4], [5, 6, 7, 8])
+    floatArrayParam = FloatArrayKey.make("FloatArrayValue", Units.arcsec).set([1.2, 2.3, 3.4], [5.6, 7.8, 9.1])
+    doubleArrayParam = DoubleArrayKey.make("DoubleArrayValue", Units.arcsec).setAll(
+        [[1.2, 2.3, 3.4], [5.6, 7.8, 9.1]])
+    byteArrayParam = ByteArrayKey.make("ByteArrayValue").set(b'\xDE\xAD\xBE\xEF', bytes([1, 2, 3, 4]))
+    intMatrixParam = IntMatrixKey.make("IntMatrixValue", Units.meter).set([[1, 2, 3, 4], [5, 6, 7, 8]],
+                                                                          [[-1, -2, -3, -4], [-5, -6, -7, -8]])
+
+    eqCoord = EqCoord.make(ra="12:13:14.15 hours", dec="-30:31:32.3 deg", frame=EqFrame.FK5, pm=(0.5, 2.33))
+    solarSystemCoord = SolarSystemCoord.make("BASE", SolarSystemObject.Venus)
+    minorPlanetCoord = MinorPlanetCoord.make("GUIDER1", 2000, "90 deg", "2 deg", "100 deg", 1.4, 0.234, "220 deg")
+    cometCoord = CometCoord.make("BASE", 2000.0, "90 deg", "2 deg", "100 deg", 1.4, 0.234)
+    altAzCoord = AltAzCoord.make("301 deg", "42.5 deg")
+    coordsParam = CoordKey.make("CoordParam").set(eqCoord, solarSystemCoord, minorPlanetCoord, cometCoord,
+                                                  altAzCoord)
+    return [coordsParam, byteParam, intParam, floatParam, longParam, shortParam, booleanParam, byteArrayParam,
+            intArrayParam, floatArrayParam, doubleArrayParam, intMatrixParam]
+
+
+def bench(name: str, func, number: int = 2000):
+    secs = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{name:40} {secs * 1e6:10.1f} us")
+
+
+# noinspection PyProtectedMember
+def main():
+    prefix = Prefix(Subsystem.CSW, "testassembly")
+    paramSet = makeParamSet()
+    # The same parameters without the coordinates, whose decoding is dominated by astropy
+    primitiveParamSet = paramSet[1:]
+
+    event = SystemEvent(prefix, EventName("myAssemblyEvent"), paramSet)
+    eventDict = event._asDict()
+    primitiveEvent = SystemEvent(prefix, EventName("myAssemblyEvent"), primitiveParamSet)
+    primitiveEventDict = primitiveEvent._asDict()
+    setup = Setup(prefix, CommandName("myCommand"), None, primitiveParamSet)
+    setupDict = setup._asDict()
+
+    bench("Event._asDict (TestPublisher3)", lambda: event._asDict())
+    bench("Event._fromDict (TestPublisher3)", lambda: Event._fromDict(eventDict), number=200)
+    bench("Event._asDict (without coords)", lambda: primitiveEvent._asDict())
+    bench("Event._fromDict (without coords)", lambda: Event._fromDict(primitiveEventDict))
+    codec = EventCodec()
+    primitiveEventBytes = cbor2.dumps(primitiveEventDict, default=_cborDefault)
+    bench("cbor2.dumps(Event._asDict())", lambda: cbor2.dumps(primitiveEvent._asDict(), default=_cborDefault))
+    bench("EventCodec.encode", lambda: codec.encode(primitiveEvent))
+    bench("Event._fromDict(cbor2.loads())", lambda: Event._fromDict(cbor2.loads(primitiveEventBytes)))
+    bench("EventCodec.decode", lambda: codec.decode(primitiveEventBytes))
+    eventBytes = codec.encode(event)
+    bench("EventCodec.decode (TestPublisher3)", lambda: codec.decode(eventBytes), number=200)
+    bench("EventCodec.decodeLazy + get (TestPublisher3)", lambda: codec.decodeLazy(eventBytes).get("IntValue"))
+    bench("SequenceCommand._asDict (without coords)", lambda: setup._asDict())
+    bench("SequenceCommand._fromDict (without coords)", lambda: SequenceCommand._fromDict(setupDict))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark comparing subscriptions to explicit event keys with pattern subscriptions (EventSubscriber.pSubscribe()),
+with 2000 event keys by default, through the real EventPublisher, EventSubscriber and RedisConnector:
+
+* the time to set up the subscriptions
+* the time to publish one event for each key and deliver all of them to the subscriber callback
+* the same, when only some of the keys are wanted (a pattern that is filtered on the client side,
+  compared with subscribing to the matching keys)
+
+By default the benchmarks use InMemoryRedis, which measures the client side cost only and needs no services.
+Use --redis to also run them against a local redis-server (the events are published directly to it,
+without the sentinel and location service). Run from the top level directory with:
+
+    PYTHONPATH=. python benchmarks/bench_pattern_subscribe.py [--keys 2000] [--redis localhost:6379] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import redis.asyncio
+
+from csw.Event import SystemEvent
+from csw.EventKey import EventKey
+from csw.EventName import EventName
+from csw.EventPublisher import EventPublisher
+from csw.EventSubscriber import EventSubscriber
+from csw.InMemoryRedis import InMemoryRedis
+from csw.Parameter import IntKey
+from csw.PatternIndex import PatternIndex
+from csw.Prefix import Prefix
+from csw.RedisConnector import RedisConnector
+from csw.Subsystem import Subsystem
+
+subsystems = [Subsystem.TCS, Subsystem.AOESW, Subsystem.IRIS, Subsystem.NFIRAOS, Subsystem.WFOS]
+
+
+def makeKeys(numKeys: int) -> list[EventKey]:
+    return [EventKey(Prefix(subsystems[i % len(subsystems)], f"component{i % 40}"), EventName(f"event{i}"))
+            for i in range(numKeys)]
+
+
+async def benchCase(makeClient, keys: list[EventKey], subscribe, expected: int) -> dict:
+    """
+    Subscribes with the given function (which is passed the subscriber and the callback), then publishes one event
+    for each key and waits until the expected number of events were delivered to the callback
+    """
+    pub = EventPublisher(RedisConnector(client=makeClient()))
+    sub = EventSubscriber(RedisConnector(client=makeClient()))
+    done = asyncio.Event()
+    delivered = 0
+
+    async def callback(_):
+        nonlocal delivered
+        delivered += 1
+        if delivered == expected:
+            done.set()
+
+    start = time.perf_counter()
+    subscription = await subscribe(sub, callback)
+    subscribeSecs = time.perf_counter() - start
+
+    events = [SystemEvent(k.source, k.eventName, [IntKey.make("value").set(i)]) for i, k in enumerate(keys)]
+    start = time.perf_counter()
+    for event in events:
+        await pub.publish(event)
+    publishSecs = time.perf_counter() - start
+    await asyncio.wait_for(done.wait(), 60)
+    totalSecs = time.perf_counter() - start
+
+    await subscription.unsubscribe()
+    await pub.close()
+    await sub.close()
+    return {
+        "delivered": expected,
+        "subscribe_ms": subscribeSecs * 1e3,
+        "publish_ms": publishSecs * 1e3,
+        "publish_and_deliver_ms": totalSecs * 1e3,
+        "deliveries_per_sec": expected / totalSecs,
+    }
+
+
+async def runBenchmarks(makeClient, keys: list[EventKey]) -> dict:
+    allPatterns = [f"{s.name}.*" for s in subsystems]
+    # Only some of the TCS keys: Redis sends all TCS events, and the others are filtered out on the client side
+    subsetPattern = "TCS.component1*"
+    subsetRegex = PatternIndex.globToRegex(subsetPattern)
+    subsetKeys = [k for k in keys if subsetRegex.fullmatch(str(k))]
+    return {
+        "all keys": {
+            "explicit": await benchCase(makeClient, keys, lambda sub, cb: sub.subscribe(keys, cb), len(keys)),
+            "pattern": await benchCase(makeClient, keys, lambda sub, cb: sub.pSubscribe(allPatterns, cb), len(keys)),
+        },
+        f"subset ({subsetPattern})": {
+            "explicit": await benchCase(makeClient, keys, lambda sub, cb: sub.subscribe(subsetKeys, cb),
+                                        len(subsetKeys)),
+            "pattern": await benchCase(makeClient, keys, lambda sub, cb: sub.pSubscribe([subsetPattern], cb),
+                                       len(subsetKeys)),
+        },
+    }
+
+
+def printResults(transport: str, results: dict):
+    print(f"Transport: {transport}", file=sys.stderr)
+    for case, r in results.items():
+        for kind, c in r.items():
+            print(f"{case:28} {kind:9} subscribe {c['subscribe_ms']:8.1f} ms, publish {c['publish_ms']:8.1f} ms, "
+                  f"publish and deliver {c['delivered']} events {c['publish_and_deliver_ms']:8.1f} ms "
+                  f"({c['deliveries_per_sec']:.0f}/sec)", file=sys.stderr)
+
+
+async def main(args):
+    keys = makeKeys(args.keys)
+    inMemoryRedis = InMemoryRedis()
+    report = {"keys": args.keys, "results": {"InMemoryRedis": await runBenchmarks(lambda: inMemoryRedis, keys)}}
+    if args.redis:
+        host, _, port = args.redis.partition(':')
+        transport = f"redis://{host}:{port or 6379}"
+        report["results"][transport] = await runBenchmarks(lambda: redis.asyncio.Redis(host=host, port=int(port or 6379)),
+                                                           keys)
+    for transport, results in report["results"].items():
+        printResults(transport, results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pattern subscription benchmark")
+    parser.add_argument("--keys", type=int, default=2000, help="number of event keys")
+    parser.add_argument("--redis", help="host:port of a local redis-server to also run the benchmarks against")
+    parser.add_argument("--json", help="file to write the results to")
+    asyncio.run(main(parser.parse_args()))
@@ -178,7 +178,7 @@ class Result:
             a dictionary corresponding to this object
         """
         return {
-            'paramSet': list(map(lambda p: p._asDict(), self.paramSet))
+            'paramSet': [p._asDict() for p in self.paramSet]
         }
 
     # noinspection PyProtectedMember
@@ -187,7 +187,7 @@ class Result:
         """
         Returns a Result for the given dict.
         """
-        paramSet = list(map(lambda p: Parameter._fromDict(p), obj['paramSet']))
+        paramSet = [Parameter._fromDict(p) for p in obj['paramSet']]
         return Result(paramSet)
 
 
@@ -18,6 +18,7 @@ class CommandResponseManager:
     async def waitForTask(self, runId: str, timeout: timedelta) -> CommandResponse:
         if runId in self.tasks:
             task: Task = self.tasks[runId]
-            return await asyncio.wait_for(task, timeout=timeout.total_seconds())
+            # Shield the task, so that it is not cancelled if waiting for it times out
+            return await asyncio.wait_for(asyncio.shield(task), timeout=timeout.total_seconds())
         else:
             return Error(runId, "No task was found for runId " + runId)
@@ -1,5 +1,8 @@
+import asyncio
 import atexit
 import json
+from asyncio import Task
+from typing import List
 
 import aiohttp
 import structlog
@@ -10,9 +13,10 @@ import uuid
 
 from aiohttp.web_ws import WebSocketResponse
 
-from csw.CommandResponse import Error
+from csw.CommandResponse import Error, CommandResponse
 from csw.CommandResponseManager import CommandResponseManager
-from csw.CommandServiceRequest import QueryFinal, SubscribeCurrentState
+from csw.CommandServiceRequest import QueryFinal, SubscribeCurrentState, SubscribeCurrentStateAck, \
+    MultiplexWebSocketProtocol
 from csw.ComponentHandlers import ComponentHandlers
 from csw.LocationServiceSync import LocationServiceSync
 from csw.ParameterSetType import ControlCommand
@@ -27,12 +31,34 @@ class CommandServer:
     async def _handlePost(self, request: Request) -> Response:
         obj = await request.json()
         method = obj['_type']
+        if method in ('SubmitBatch', 'OnewayBatch'):
+            return self._handleBatch(method.removesuffix('Batch'), obj['controlCommands'])
+        commandResponse = self._handleCommand(method, obj['controlCommand'])
+        return web.json_response(commandResponse._asDict())
+
+    def _handleBatch(self, method: str, commandDicts: List[dict]) -> Response:
+        """
+        Handles a SubmitBatch or OnewayBatch request by dispatching each command in order, as for a Submit or Oneway
+        request, and returns the list of responses
+        """
+        self.log.info(f"Received {method} batch of {len(commandDicts)} commands")
+        commandResponses = []
+        for commandDict in commandDicts:
+            try:
+                commandResponse = self._handleCommand(method, commandDict)
+            except Exception as ex:
+                # A failing command must not prevent the other commands in the batch from being handled
+                self.log.error(f"{method} command in batch failed: {ex}")
+                commandResponse = Error(str(uuid.uuid4()), f"{method} command failed: {ex}")
+            commandResponses.append(commandResponse)
+        return web.json_response([commandResponse._asDict() for commandResponse in commandResponses])
+
+    def _handleCommand(self, method: str, commandDict: dict) -> CommandResponse:
         runId = str(uuid.uuid4())
         try:
-            command: ControlCommand = ControlCommand._fromDict(obj['controlCommand'])
+            command: ControlCommand = ControlCommand._fromDict(commandDict)
         except TypeError:
-            commandResponse = Error(runId, "Invalid command")
-            return web.json_response(commandResponse._asDict())
+            return Error(runId, "Invalid command")
 
         self.log.info(f"Received command {command}")
         match method:
@@ -48,13 +74,23 @@ class CommandServer:
                 commandResponse = self.handler.validateCommand(runId, command)
             case _:  # should not happe
                 commandResponse = Error(runId, "Invalid command")
-        return web.json_response(commandResponse._asDict())
+        return commandResponse
 
     async def _handleQueryFinal(self, queryFinal: QueryFinal) -> Response:
-        commandResponse = await self._crm.waitForTask(queryFinal.runId, queryFinal.timeout)
+        try:
+            commandResponse = await self._crm.waitForTask(queryFinal.runId, queryFinal.timeout)
+        except asyncio.TimeoutError:
+            commandResponse = Error(queryFinal.runId, "Timed out waiting for the command to complete")
         responseDict = commandResponse._asDict()
         return web.json_response(responseDict)
 
+    async def _sendQueryFinalResponse(self, ws: WebSocketResponse, queryFinal: QueryFinal):
+        resp = await self._handleQueryFinal(queryFinal)
+        if ws.closed:
+            self.log.debug(f"Websocket closed before the final response for runId {queryFinal.runId} was sent")
+        else:
+            await ws.send_str(resp.text)
+
     async def _handleWsTextMessage(self, ws: WebSocketResponse, msg: WSMessage):
         if msg.data == 'close':
             self.log.debug("Received ws close message")
@@ -63,19 +99,25 @@ class CommandServer:
             obj = json.loads(msg.data)
             match obj['_type']:
                 case "QueryFinal":
+                    # The client can send many QueryFinal messages on the same websocket (the responses contain the
+                    # runId), so each one is handled in a separate task and the websocket is kept open
                     queryFinal = QueryFinal._fromDict(obj)
-                    resp = await self._handleQueryFinal(queryFinal)
-                    await ws.send_str(resp.text)
-                    await ws.close()
+                    tasks = self._wsTasks.setdefault(ws, set())
+                    task = asyncio.create_task(self._sendQueryFinalResponse(ws, queryFinal))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
                 case "SubscribeCurrentState":
                     stateNames = SubscribeCurrentState._fromDict(obj).stateNames
                     self.log.debug(f"Received SubscribeCurrentState: stateNames = {stateNames}")
                     self.handler._subscribeCurrentState(stateNames, ws)
+                    # Let the client know that the subscription is active
+                    await ws.send_str(json.dumps(SubscribeCurrentStateAck(stateNames)._asDict()))
                 case _:
                     self.log.debug(f"Warning: Received unknown ws message: {str(msg.data)}")
 
     async def _handleWs(self, request: Request) -> WebSocketResponse:
-        ws = web.WebSocketResponse()
+        # Let clients know that several requests can be sent on this websocket
+        ws = web.WebSocketResponse(protocols=(MultiplexWebSocketProtocol,))
         await ws.prepare(request)
         msg: WSMessage
         async for msg in ws:
@@ -86,6 +128,8 @@ class CommandServer:
                     self.log.debug('Error: ws connection closed with exception %s' % ws.exception())
         self.log.debug('websocket connection closed')
         self.handler._unsubscribeCurrentState(ws)
+        for task in self._wsTasks.pop(ws, set()):
+            task.cancel()
         return ws
 
     def registerWithLocationService(self):
@@ -111,6 +155,8 @@ class CommandServer:
         self.port = LocationServiceUtil.getFreePort(port)
         self._app = web.Application()
         self._crm = CommandResponseManager()
+        # Tasks that send QueryFinal responses for each open websocket
+        self._wsTasks: dict[WebSocketResponse, set[Task]] = {}
         self._log = structlog.get_logger()
         self._app.add_routes([
             web.post('/post-endpoint', self._handlePost),
@@ -1,23 +1,27 @@
 import asyncio
+import math
+import time
 import uuid
 from asyncio import Task
+from collections import deque
 from datetime import timedelta
 from typing import List, Callable, Awaitable
 
+import aiohttp
 import structlog
-from websockets.asyncio.client import connect
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientResponse, ClientConnectorError, ClientWebSocketResponse
 
 from csw.CommandResponse import SubmitResponse, Error, CommandResponse, Started, ValidateResponse, OnewayResponse
 from csw.CommandServiceRequest import Submit, Validate, Oneway, QueryFinal, SubscribeCurrentState, \
-    ExecuteDiagnosticMode, ExecuteOperationsMode, GoOnline, GoOffline
+    SubmitBatch, OnewayBatch, ExecuteDiagnosticMode, ExecuteOperationsMode, GoOnline, GoOffline, \
+    MultiplexWebSocketProtocol
 from csw.CurrentState import CurrentState
-from csw.LocationService import ConnectionInfo, ComponentType, ConnectionType, HttpLocation
-from csw.LocationServiceSync import LocationServiceSync
+from csw.JsonCodec import JsonCodec
+from csw.LocationService import ConnectionInfo, ComponentType, ConnectionType, HttpLocation, LocationService
 from csw.ParameterSetType import ControlCommand
 from csw.Prefix import Prefix
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from csw.TMTTime import UTCTime
 from esw.SequencerRequest import Query
@@ -31,6 +35,40 @@ class Subscription:
         self.task.cancel()
 
 
+@dataclass
+class _CurrentStateSubscriber:
+    """
+    A subscriber to the current states with the given names (or to all current states, if names is empty)
+    """
+    names: set[str]
+    callback: Callable[[CurrentState], Awaitable]
+
+
+@dataclass(eq=False)
+class _CurrentStateSocket:
+    """
+    A websocket that receives the current states of a component for one or more subscribers
+    """
+    ws: ClientWebSocketResponse
+    subscribers: List[_CurrentStateSubscriber] = field(default_factory=list)
+    # Futures that are completed when the component acknowledges each SubscribeCurrentState message, in order
+    # (Only for components that selected MultiplexWebSocketProtocol)
+    pendingAcks: deque[asyncio.Future] = field(default_factory=deque)
+    # Task reading the messages on the websocket
+    reader: Task | None = None
+
+
+@dataclass
+class _PendingQueryFinal:
+    """
+    A QueryFinal request that is waiting for its response on the shared websocket
+    """
+    deadline: float
+    futures: List[asyncio.Future]
+    # Number of times the request was sent on a websocket that was closed without delivering any response
+    failedAttempts: int = 0
+
+
 # logging.basicConfig(
 #     format="%(asctime)s %(message)s",
 #     level=logging.DEBUG,
@@ -40,27 +78,90 @@ class Subscription:
 # A CSW command service client
 # noinspection PyProtectedMember
 class CommandService:
+    # Seconds to keep the resolved URI of a component (The cached URI is also dropped if connecting to it fails)
+    locationCacheTtl: float = 60.0
+
+    # Maximum number of times a QueryFinal request is sent again after the websocket was closed without any response
+    maxQueryFinalResends: int = 3
+
+    # Seconds that subscribeCurrentState() waits after sending the subscription to a component that does not
+    # acknowledge it (such as a Scala component), to give it time to subscribe. This does not guarantee that the
+    # subscription is active: A current state published right after subscribeCurrentState() returns might be missed.
+    currentStateSubscribeDelay: float = 0.1
+
+    # Maps (prefix, componentType) to the component's resolved base URI and the time it expires
+    _baseUriCache: dict[tuple[str, str], tuple[str, float]] = {}
 
     def __init__(self, prefix: Prefix, componentType: ComponentType, clientSession: ClientSession):
         self.prefix = prefix
         self.componentType = componentType
         self._session = clientSession
         self.log = structlog.get_logger()
-
-
-    def _getBaseUri(self) -> str:
-        locationService = LocationServiceSync()
+        # Whether the component handles several QueryFinal requests on one websocket (None until known)
+        self._queryFinalMultiplexed: bool | None = None
+        # Persistent websocket used for all queryFinal() calls if it does, and the task that reads the responses
+        self._queryFinalWs: ClientWebSocketResponse | None = None
+        self._queryFinalReader: Task | None = None
+        self._queryFinalLock = asyncio.Lock()
+        # Maps the runId of each QueryFinal request to the ones waiting for its response
+        self._pendingQueries: dict[str, _PendingQueryFinal] = {}
+        # Websocket shared by the current state subscriptions, if the component supports it
+        self._currentStateSocket: _CurrentStateSocket | None = None
+        # All open current state websockets (the shared one, and the ones for components that do not share them)
+        self._currentStateSockets: set[_CurrentStateSocket] = set()
+
+    def _cacheKey(self) -> tuple[str, str]:
+        return str(self.prefix), self.componentType.value
+
+    async def _getBaseUri(self) -> str:
+        cacheKey = self._cacheKey()
+        entry = self._baseUriCache.get(cacheKey)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        locationService = LocationService(self._session)
         connection = ConnectionInfo.make(self.prefix, self.componentType, ConnectionType.HttpType)
-        location = locationService.resolve(connection)
+        location = await locationService.resolve(connection)
         if location is not None:
             location.__class__ = HttpLocation
+            self._baseUriCache[cacheKey] = (location.uri, time.monotonic() + self.locationCacheTtl)
             return location.uri
         raise RuntimeError
 
+    def _invalidateBaseUri(self):
+        self._baseUriCache.pop(self._cacheKey(), None)
+
+    async def _postRequest(self, data: dict) -> ClientResponse:
+        """
+        Posts the given request to the component's post-endpoint.
+        If connecting fails, the component might have moved (for example after a restart), so its location is
+        resolved again and the request is retried once (This is safe, since the request was not sent).
+        """
+        body = JsonCodec.encode(data)
+        for retry in (False, True):
+            postUri = f"{await self._getBaseUri()}post-endpoint"
+            try:
+                return await JsonCodec.postEncoded(self._session, postUri, body)
+            except ClientConnectorError:
+                self._invalidateBaseUri()
+                if retry:
+                    raise
+
+    async def _wsConnect(self) -> ClientWebSocketResponse:
+        """
+        Opens a websocket to the component's websocket-endpoint, retrying once if connecting fails (as for _postRequest).
+        The MultiplexWebSocketProtocol subprotocol is offered: The websocket's protocol is set to it
+        if the component can handle several requests on the websocket.
+        """
+        for retry in (False, True):
+            wsUri = f"{(await self._getBaseUri()).replace('http:', 'ws:')}websocket-endpoint"
+            try:
+                return await self._session.ws_connect(wsUri, protocols=(MultiplexWebSocketProtocol,))
+            except ClientConnectorError:
+                self._invalidateBaseUri()
+                if retry:
+                    raise
+
     async def _postCommand(self, command: str, controlCommand: ControlCommand) -> SubmitResponse:
-        baseUri = self._getBaseUri()
-        postUri = f"{baseUri}post-endpoint"
-        headers = {'Content-type': 'application/json'}
         match command:
             case 'Submit':
                 data = Submit(controlCommand)._asDict()
@@ -68,12 +169,11 @@ class CommandService:
                 data = Validate(controlCommand)._asDict()
             case _:
                 data = Oneway(controlCommand)._asDict()
-        jsonData = json.loads(json.dumps(data))
-        response = await self._session.post(postUri, headers=headers, json=jsonData)
+        response = await self._postRequest(data)
         if not response.ok:
             runId = str(uuid.uuid4())
             return Error(runId, await response.text())
-        resp = CommandResponse._fromDict(await response.json())
+        resp = CommandResponse._fromDict(await JsonCodec.readResponse(response))
         return resp
 
     async def submit(self, controlCommand: ControlCommand) -> SubmitResponse:
@@ -112,6 +212,52 @@ class CommandService:
       """
         return await self._postCommand("Oneway", controlCommand)
 
+    async def _postBatch(self, command: str, controlCommands: List[ControlCommand]) -> List[CommandResponse]:
+        if command == 'Submit':
+            data = SubmitBatch(controlCommands)._asDict()
+        else:
+            data = OnewayBatch(controlCommands)._asDict()
+        response = await self._postRequest(data)
+        if response.status == 400:
+            # The server does not know the batch request type (and so did not handle any of the commands):
+            # Send the commands one at a time, in order
+            self.log.debug(f"{command} batch rejected by {self.prefix}: sending the commands separately")
+            return [await self._postCommand(command, controlCommand) for controlCommand in controlCommands]
+        if not response.ok:
+            # Some of the commands might have been handled, so they are not sent again
+            text = await response.text()
+            return [Error(str(uuid.uuid4()), text) for _ in controlCommands]
+        return [CommandResponse._fromDict(obj) for obj in await JsonCodec.readResponse(response)]
+
+    async def submitBatch(self, controlCommands: List[ControlCommand]) -> List[SubmitResponse]:
+        """
+        Submits a list of commands to the command service in one request.
+        The component dispatches the commands in the given order, as if each one was submitted with submit().
+        If the component does not support batches (it rejects the request with status 400), the commands are submitted
+        one at a time. For other errors, an Error response is returned for each command.
+
+        Args:
+            controlCommands (List[ControlCommand]): commands to submit
+
+        Returns: List[SubmitResponse]
+            the response for each command, in the same order (use queryFinal() with the runId of any Started responses)
+       """
+        return await self._postBatch("Submit", controlCommands)
+
+    async def onewayBatch(self, controlCommands: List[ControlCommand]) -> List[OnewayResponse]:
+        """
+        Sends a list of commands to the command service in one request, without expecting a reply (as for oneway()).
+        If the component does not support batches (it rejects the request with status 400), the commands are sent
+        one at a time. For other errors, an Error response is returned for each command.
+
+        Args:
+            controlCommands (List[ControlCommand]): commands to send
+
+        Returns: List[OnewayResponse]
+            the response for each command, in the same order (only Accepted, Invalid or Locked)
+       """
+        return await self._postBatch("Oneway", controlCommands)
+
     # noinspection DuplicatedCode
     async def queryFinal(self, runId: str, timeout: timedelta) -> SubmitResponse:
         """
@@ -125,15 +271,119 @@ class CommandService:
        Returns: SubmitResponse
            a subclass of SubmitResponse
       """
-        baseUri = (self._getBaseUri()).replace('http:', 'ws:')
-        wsUri = f"{baseUri}websocket-endpoint"
-        msgDict = QueryFinal(runId, timeout)._asDict()
-        jsonStr = json.dumps(msgDict)
-        ws = await self._session.ws_connect(wsUri)
-        await ws.send_str(jsonStr)
-        jsonResp = await ws.receive_str()
+        ws = await self._queryFinalSocket()
+        if ws is not self._queryFinalWs:
+            # The component handles one request per websocket (like the Scala command service)
+            return await self._queryFinalOnce(ws, runId, timeout)
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pendingQueries.get(runId)
+        if pending is not None:
+            pending.futures.append(future)
+        else:
+            deadline = time.monotonic() + timeout.total_seconds()
+            self._pendingQueries[runId] = _PendingQueryFinal(deadline, [future])
+            try:
+                await self._sendQueryFinal(runId)
+            except Exception:
+                self._pendingQueries.pop(runId, None)
+                raise
+        return await future
+
+    async def _queryFinalOnce(self, ws: ClientWebSocketResponse, runId: str, timeout: timedelta) -> SubmitResponse:
+        """
+        Sends a QueryFinal request on the given websocket, which is closed after the response was received
+        """
+        try:
+            await ws.send_str(json.dumps(QueryFinal(runId, timeout)._asDict()))
+            jsonResp = await ws.receive_str()
+        finally:
+            await ws.close()
+        return CommandResponse._fromDict(JsonCodec.decode(jsonResp))
+
+    async def _queryFinalSocket(self) -> ClientWebSocketResponse:
+        """
+        Returns the websocket to use for a QueryFinal request.
+        If the component can handle several requests on one websocket (it selected MultiplexWebSocketProtocol),
+        this is the shared websocket (self._queryFinalWs), which is opened (and the task that reads the responses
+        is started) if needed: The responses are then matched by runId.
+        Otherwise, this is a new websocket for a single request.
+        """
+        if self._queryFinalMultiplexed is False:
+            return await self._wsConnect()
+        async with self._queryFinalLock:
+            if self._queryFinalWs is not None and not self._queryFinalWs.closed:
+                return self._queryFinalWs
+            ws = await self._wsConnect()
+            self._queryFinalMultiplexed = ws.protocol == MultiplexWebSocketProtocol
+            if self._queryFinalMultiplexed:
+                self._queryFinalWs = ws
+                self._queryFinalReader = asyncio.create_task(self._readQueryFinalResponses(ws))
+            return ws
+
+    async def _sendQueryFinal(self, runId: str):
+        pending = self._pendingQueries[runId]
+        remainingSecs = max(math.ceil(pending.deadline - time.monotonic()), 1)
+        ws = await self._queryFinalSocket()
+        if ws is not self._queryFinalWs:
+            # The component was replaced by one that handles one request per websocket
+            await ws.close()
+            raise RuntimeError(f"{self.prefix} no longer accepts several QueryFinal requests on one websocket")
+        await ws.send_str(json.dumps(QueryFinal(runId, timedelta(seconds=remainingSecs))._asDict()))
+
+    async def _readQueryFinalResponses(self, ws: ClientWebSocketResponse):
+        """
+        Reads the responses to the QueryFinal requests sent on the shared websocket until it is closed.
+        If there are requests left without a response (for example, if the server was restarted),
+        they are sent again on a new websocket.
+        """
+        receivedResponse = False
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                resp = CommandResponse._fromDict(JsonCodec.decode(msg.data))
+                receivedResponse = True
+                pending = self._pendingQueries.pop(resp.runId, None)
+                if pending is not None:
+                    for future in pending.futures:
+                        if not future.done():
+                            future.set_result(resp)
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                self.log.debug(f"QueryFinal websocket closed with exception {ws.exception()}")
+                break
         await ws.close()
-        return CommandResponse._fromDict(json.loads(jsonResp))
+        for runId, pending in list(self._pendingQueries.items()):
+            if not receivedResponse:
+                pending.failedAttempts += 1
+            try:
+                if pending.failedAttempts > self.maxQueryFinalResends:
+                    raise RuntimeError(f"The QueryFinal websocket for {self.prefix} was closed without a response")
+                await self._sendQueryFinal(runId)
+            except Exception as ex:
+                self._pendingQueries.pop(runId, None)
+                for future in pending.futures:
+                    if not future.done():
+                        future.set_exception(ex)
+
+    async def close(self):
+        """
+        Closes the websocket used for queryFinal() and the current state websockets (which ends all current state
+        subscriptions), if they are open
+        """
+        if self._queryFinalReader is not None:
+            self._queryFinalReader.cancel()
+            await asyncio.gather(self._queryFinalReader, return_exceptions=True)
+            self._queryFinalReader = None
+        pendingQueries = list(self._pendingQueries.values())
+        self._pendingQueries.clear()
+        for pending in pendingQueries:
+            for future in pending.futures:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"The CommandService for {self.prefix} was closed"))
+        if self._queryFinalWs is not None:
+            await self._queryFinalWs.close()
+            self._queryFinalWs = None
+        for socket in list(self._currentStateSockets):
+            socket.reader.cancel()
+            await asyncio.gather(socket.reader, return_exceptions=True)
 
     async def submitAndWaitAsync(self, controlCommand: ControlCommand, timeout: timedelta) -> SubmitResponse:
         """
@@ -167,16 +417,12 @@ class CommandService:
         Returns: SubmitResponse
            a subclass of SubmitResponse
         """
-        baseUri = self._getBaseUri()
-        postUri = f"{baseUri}post-endpoint"
-        headers = {'Content-type': 'application/json'}
         data = Query(runId)._asDict()
-        jsonData = json.loads(json.dumps(data))
-        response = await self._session.post(postUri, headers=headers, json=jsonData)
+        response = await self._postRequest(data)
         if not response.ok:
-            raise Exception(f"CommandService: query failed: {await response.json()}")
+            raise Exception(f"CommandService: query failed: {await JsonCodec.readResponse(response)}")
         # return CommandResponse._fromDict(json.loads(await response.json()))
-        return CommandResponse._fromDict(await response.json())
+        return CommandResponse._fromDict(await JsonCodec.readResponse(response))
 
 
     async def submitAndWait(self, controlCommand: ControlCommand, timeout: timedelta) -> SubmitResponse:
@@ -197,39 +443,73 @@ class CommandService:
             case _:
                 return resp
 
-    async def _subscribeCurrentState(self, names: List[str], callback: Callable[[CurrentState], Awaitable]):
-        baseUri = self._getBaseUri().replace('http:', 'ws:')
-        wsUri = f"{baseUri}websocket-endpoint"
-        msgDict = SubscribeCurrentState(names)._asDict()
-        jsonStr = json.dumps(msgDict)
-        async with connect(wsUri) as websocket:
-            await websocket.send(jsonStr)
-            async for message in websocket:
-                await callback(CurrentState._fromDict(json.loads(message)))
-
-    # async def _subscribeCurrentState(self, names: List[str], callback: Callable[[CurrentState], Awaitable]):
-    #     baseUri = (self._getBaseUri()).replace('http:', 'ws:')
-    #     wsUri = f"{baseUri}websocket-endpoint"
-    #     msgDict = SubscribeCurrentState(names)._asDict()
-    #     jsonStr = json.dumps(msgDict)
-    #     print(f"XXX _subscribeCurrentState: json = {jsonStr}")
-    #     async with self._session.ws_connect(wsUri) as ws:
-    #         await ws.send_str(jsonStr)
-    #         async for msgF in ws:
-    #             msg = await msgF
-    #             print(f"XXX _subscribeCurrentState: message = {msg}")
-    #             match msg.type:
-    #                 case aiohttp.WSMsgType.TEXT:
-    #                     print(f"XXX _subscribeCurrentState: callback({CurrentState._fromDict(json.loads(msg.data))})")
-    #                     await callback(CurrentState._fromDict(json.loads(msg.data)))
-    #                 case aiohttp.WSMsgType.CLOSED:
-    #                     break
-    #                 case aiohttp.WSMsgType.ERROR:
-    #                     break
+    async def _openCurrentStateSocket(self) -> _CurrentStateSocket:
+        socket = _CurrentStateSocket(await self._wsConnect())
+        socket.reader = asyncio.create_task(self._readCurrentStates(socket))
+        self._currentStateSockets.add(socket)
+        if socket.ws.protocol == MultiplexWebSocketProtocol and self._currentStateSocket is None:
+            # The component handles more subscriptions on the same websocket: Use it for the next ones
+            self._currentStateSocket = socket
+        return socket
+
+    async def _readCurrentStates(self, socket: _CurrentStateSocket):
+        """
+        Reads the messages on the given current state websocket until it is closed (or this task is cancelled)
+        and passes each current state to the subscribers that want it
+        """
+        try:
+            async for msg in socket.ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    obj = JsonCodec.decode(msg.data)
+                    if obj.get('_type') == 'SubscribeCurrentStateAck':
+                        if socket.pendingAcks:
+                            ack = socket.pendingAcks.popleft()
+                            if not ack.done():
+                                ack.set_result(None)
+                        continue
+                    currentState = CurrentState._fromDict(obj)
+                    for subscriber in list(socket.subscribers):
+                        if not subscriber.names or currentState.stateName in subscriber.names:
+                            try:
+                                await subscriber.callback(currentState)
+                            except Exception as ex:
+                                self.log.error(f"Current state callback failed for {currentState.stateName}: {ex}")
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    self.log.debug(f"Current state websocket closed with exception {socket.ws.exception()}")
+                    break
+        finally:
+            if self._currentStateSocket is socket:
+                self._currentStateSocket = None
+            self._currentStateSockets.discard(socket)
+            for ack in socket.pendingAcks:
+                if not ack.done():
+                    ack.set_exception(RuntimeError(f"The current state websocket for {self.prefix} was closed"))
+            socket.pendingAcks.clear()
+            await socket.ws.close()
+
+    @staticmethod
+    async def _currentStateSubscription(socket: _CurrentStateSocket):
+        await asyncio.shield(socket.reader)
+
+    def _removeCurrentStateSubscriber(self, socket: _CurrentStateSocket, subscriber: _CurrentStateSubscriber):
+        """
+        Called when a subscription task is done (also if it was cancelled before it started).
+        The websocket is closed when its last subscriber is removed.
+        """
+        if subscriber in socket.subscribers:
+            socket.subscribers.remove(subscriber)
+        if not socket.subscribers:
+            if self._currentStateSocket is socket:
+                self._currentStateSocket = None
+            socket.reader.cancel()
 
     async def subscribeCurrentState(self, names: List[str], callback: Callable[[CurrentState], Awaitable]) -> Subscription:
         """
-        Subscribe to the current state of a component
+        Subscribe to the current state of a component.
+        If the component is a Python CommandServer (which selects MultiplexWebSocketProtocol), this returns once
+        the component has acknowledged the subscription, and all subscriptions share one websocket.
+        Other components (such as Scala components) do not acknowledge subscriptions: For them, this returns after
+        currentStateSubscribeDelay seconds, and a current state published right after that might still be missed.
 
         Args:
            names (List[str]): subscribe to states which have any of the provided value for name.
@@ -238,8 +518,26 @@ class CommandService:
 
         Returns: subscription task
         """
-        task = asyncio.create_task(self._subscribeCurrentState(names, callback))
-        await asyncio.sleep(0.1) # XXX TODO FIXME: Need to wait for task to startup
+        subscriber = _CurrentStateSubscriber(set(names), callback)
+        socket = self._currentStateSocket
+        if socket is None or socket.ws.closed:
+            socket = await self._openCurrentStateSocket()
+        socket.subscribers.append(subscriber)
+        try:
+            if socket.ws.protocol == MultiplexWebSocketProtocol:
+                ack = asyncio.get_running_loop().create_future()
+                socket.pendingAcks.append(ack)
+                await socket.ws.send_str(json.dumps(SubscribeCurrentState(names)._asDict()))
+                await asyncio.shield(ack)
+            else:
+                await socket.ws.send_str(json.dumps(SubscribeCurrentState(names)._asDict()))
+                await asyncio.sleep(self.currentStateSubscribeDelay)
+        except BaseException:
+            self._removeCurrentStateSubscriber(socket, subscriber)
+            raise
+        # The subscription task runs until it is cancelled or the websocket is closed
+        task = asyncio.create_task(self._currentStateSubscription(socket))
+        task.add_done_callback(lambda _: self._removeCurrentStateSubscriber(socket, subscriber))
         return Subscription(task)
 
     async def executeDiagnosticMode(self, startTime: UTCTime, hint: str):
@@ -251,12 +549,8 @@ class CommandService:
             startTime: represents the time at which the diagnostic mode actions will take effect
             hint: represents supported diagnostic data mode for a component
         """
-        baseUri = self._getBaseUri()
-        postUri = f"{baseUri}post-endpoint"
-        headers = {'Content-type': 'application/json'}
         data = ExecuteDiagnosticMode(startTime, hint)._asDict()
-        jsonData = json.loads(json.dumps(data))
-        response = await self._session.post(postUri, headers=headers, json=jsonData)
+        response = await self._postRequest(data)
         if not response.ok:
             raise Exception(f"CommandService: executeDiagnosticMode failed: {await response.text()}")
 
@@ -264,31 +558,19 @@ class CommandService:
         """
         On receiving a operations mode command, the current diagnostic data mode is halted.
         """
-        baseUri = self._getBaseUri()
-        postUri = f"{baseUri}post-endpoint"
-        headers = {'Content-type': 'application/json'}
         data = ExecuteOperationsMode()._asDict()
-        jsonData = json.loads(json.dumps(data))
-        response = await self._session.post(postUri, headers=headers, json=jsonData)
+        response = await self._postRequest(data)
         if not response.ok:
             raise Exception(f"CommandService: executeOperationsMode failed: {await response.text()}")
 
     async def goOnline(self):
-        baseUri = self._getBaseUri()
-        postUri = f"{baseUri}post-endpoint"
-        headers = {'Content-type': 'application/json'}
         data = GoOnline()._asDict()
-        jsonData = json.loads(json.dumps(data))
-        response = await self._session.post(postUri, headers=headers, json=jsonData)
+        response = await self._postRequest(data)
         if not response.ok:
             raise Exception(f"CommandService: goOnline failed: {await response.text()}")
 
     async def goOffline(self):
-        baseUri = self._getBaseUri()
-        postUri = f"{baseUri}post-endpoint"
-        headers = {'Content-type': 'application/json'}
         data = GoOffline()._asDict()
-        jsonData = json.loads(json.dumps(data))
-        response = await self._session.post(postUri, headers=headers, json=jsonData)
+        response = await self._postRequest(data)
         if not response.ok:
             raise Exception(f"CommandService: goOffline failed: {await response.text()}")
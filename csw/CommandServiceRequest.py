@@ -8,6 +8,12 @@ from dataclasses_json import dataclass_json
 from csw.ParameterSetType import ControlCommand
 from csw.TMTTime import UTCTime
 
+# Websocket subprotocol selected by the Python CommandServer, which handles any number of QueryFinal and
+# SubscribeCurrentState messages on the same websocket and acknowledges each subscription (see SubscribeCurrentStateAck).
+# Clients offer it when connecting: Servers that do not select it (such as Scala components) handle one request
+# per websocket.
+MultiplexWebSocketProtocol = "csw-multiplex"
+
 
 @dataclass_json
 @dataclass
@@ -48,6 +54,38 @@ class Oneway(CommandServiceRequest):
     pass
 
 
+@dataclass
+class CommandServiceBatchRequest:
+    """
+    Represents a list of commands sent in one request, which requires a list of responses (of type CommandResponse),
+    one for each command, in the same order.
+    Note: This is only supported by the Python CommandServer.
+
+    Args:
+        controlCommands (List[ControlCommand]): The commands to send
+    """
+    controlCommands: List[ControlCommand]
+
+    def _asDict(self):
+        """
+        Returns: a dictionary corresponding to this object
+        """
+        return {
+            "_type": self.__class__.__name__,
+            'controlCommands': [c._asDict() for c in self.controlCommands],
+        }
+
+
+@dataclass
+class SubmitBatch(CommandServiceBatchRequest):
+    pass
+
+
+@dataclass
+class OnewayBatch(CommandServiceBatchRequest):
+    pass
+
+
 @dataclass
 class QueryFinal:
     """
@@ -123,6 +161,37 @@ class SubscribeCurrentState:
         }
 
 
+@dataclass
+class SubscribeCurrentStateAck:
+    """
+    Message sent by the Python CommandServer on the websocket after a SubscribeCurrentState message was handled,
+    so that the client knows that the subscription is active.
+    Note: This is only sent on websockets that use MultiplexWebSocketProtocol (The Scala command service does not
+    send it).
+
+    Args:
+        stateNames (List[str]) the current state names from the SubscribeCurrentState message
+    """
+    stateNames: List[str]
+
+    @staticmethod
+    def _fromDict(obj):
+        """
+        Returns a SubscribeCurrentStateAck for the given dict.
+        """
+        return SubscribeCurrentStateAck(obj.get("names", []))
+
+    def _asDict(self):
+        """
+        Returns: dict
+            a dictionary corresponding to this object
+        """
+        return {
+            "_type": self.__class__.__name__,
+            'names': self.stateNames
+        }
+
+
 @dataclass
 class ExecuteDiagnosticMode:
     startTime: UTCTime
@@ -3,6 +3,12 @@ from enum import Enum
 from astropy.coordinates import Angle
 from astropy import units as u
 
+# Scale factor from microarc seconds to degrees (the same one astropy uses for Angle.to(u.deg))
+_uasToDeg = u.uarcsec.to(u.deg)
+
+# Cache of scale factors from an Angle's unit to microarc seconds
+_uasScales = {}
+
 
 @dataclass
 class Tag:
@@ -26,9 +32,29 @@ class _CswAngle:
     def toAngle(self):
         return Angle(self.uas * u.uarcsec)
 
+    @staticmethod
+    def angleFromUas(uas: int) -> Angle:
+        """
+        Returns the given number of microarc seconds as an Angle in degrees.
+        This gives the same result as _CswAngle(uas).toAngle().to(u.deg), but avoids the intermediate Angle.
+        """
+        return Angle(uas * _uasToDeg, u.deg)
+
     @staticmethod
     def fromAngle(a: Angle):
-        return _CswAngle(int(a.uarcsec))
+        return _CswAngle(_CswAngle.uasFromAngle(a))
+
+    @staticmethod
+    def uasFromAngle(a: Angle) -> int:
+        """
+        Returns the given Angle in microarc seconds.
+        This gives the same result as int(a.uarcsec), but caches the scale factor for the Angle's unit.
+        """
+        unit = a.unit
+        scale = _uasScales.get(unit)
+        if scale is None:
+            scale = _uasScales[unit] = unit.to(u.uarcsec)
+        return int(a.value * scale)
 
 
 class EqFrame(Enum):
@@ -72,15 +98,7 @@ class Coord:
 
     @staticmethod
     def _fromDict(obj: dict):
-        switcher = {
-            "EqCoord": EqCoord,
-            "SolarSystemCoord": SolarSystemCoord,
-            "MinorPlanetCoord": MinorPlanetCoord,
-            "CometCoord": CometCoord,
-            "AltAzCoord": AltAzCoord
-        }
-        typ = obj["_type"]
-        return switcher[typ]._fromValueDict(obj)
+        return _coordClasses[obj["_type"]]._fromValueDict(obj)
 
     def _asDict(self):
         pass
@@ -111,8 +129,8 @@ class EqCoord(Coord):
         return {
             "_type": self.__class__.__name__,
             "tag": self.tag.name,
-            "ra": _CswAngle.fromAngle(self.ra).uas,
-            "dec": _CswAngle.fromAngle(self.dec).uas,
+            "ra": _CswAngle.uasFromAngle(self.ra),
+            "dec": _CswAngle.uasFromAngle(self.dec),
             "frame": self.frame.name,
             "catalogName": self.catalogName,
             "pm": asdict(self.pm)
@@ -122,8 +140,8 @@ class EqCoord(Coord):
     def _fromValueDict(obj: dict):
         return EqCoord(
             tag=Tag(obj["tag"]),
-            ra=_CswAngle(obj["ra"]).toAngle().to(u.deg),
-            dec=_CswAngle(obj["dec"]).toAngle().to(u.deg),
+            ra=_CswAngle.angleFromUas(obj["ra"]),
+            dec=_CswAngle.angleFromUas(obj["dec"]),
             frame=EqFrame[obj["frame"]],
             catalogName=obj["catalogName"],
             pm=ProperMotion(**obj["pm"]),
@@ -186,12 +204,12 @@ class MinorPlanetCoord(Coord):
             "_type": self.__class__.__name__,
             "tag": self.tag.name,
             "epoch": self.epoch,
-            "inclination": _CswAngle.fromAngle(self.inclination).uas,
-            "longAscendingNode": _CswAngle.fromAngle(self.longAscendingNode).uas,
-            "argOfPerihelion": _CswAngle.fromAngle(self.argOfPerihelion).uas,
+            "inclination": _CswAngle.uasFromAngle(self.inclination),
+            "longAscendingNode": _CswAngle.uasFromAngle(self.longAscendingNode),
+            "argOfPerihelion": _CswAngle.uasFromAngle(self.argOfPerihelion),
             "meanDistance": self.meanDistance,
             "eccentricity": self.eccentricity,
-            "meanAnomaly": _CswAngle.fromAngle(self.meanAnomaly).uas
+            "meanAnomaly": _CswAngle.uasFromAngle(self.meanAnomaly)
         }
 
     @staticmethod
@@ -199,12 +217,12 @@ class MinorPlanetCoord(Coord):
         return MinorPlanetCoord(
             tag=Tag(obj["tag"]),
             epoch=obj["epoch"],
-            inclination=_CswAngle(obj["inclination"]).toAngle().to(u.deg),
-            longAscendingNode=_CswAngle(obj["longAscendingNode"]).toAngle().to(u.deg),
-            argOfPerihelion=_CswAngle(obj["argOfPerihelion"]).toAngle().to(u.deg),
+            inclination=_CswAngle.angleFromUas(obj["inclination"]),
+            longAscendingNode=_CswAngle.angleFromUas(obj["longAscendingNode"]),
+            argOfPerihelion=_CswAngle.angleFromUas(obj["argOfPerihelion"]),
             meanDistance=obj["meanDistance"],
             eccentricity=obj["eccentricity"],
-            meanAnomaly=_CswAngle(obj["meanAnomaly"]).toAngle().to(u.deg)
+            meanAnomaly=_CswAngle.angleFromUas(obj["meanAnomaly"])
         )
 
 
@@ -238,9 +256,9 @@ class CometCoord(Coord):
             "_type": self.__class__.__name__,
             "tag": self.tag.name,
             "epochOfPerihelion": self.epochOfPerihelion,
-            "inclination": _CswAngle.fromAngle(self.inclination).uas,
-            "longAscendingNode": _CswAngle.fromAngle(self.longAscendingNode).uas,
-            "argOfPerihelion": _CswAngle.fromAngle(self.argOfPerihelion).uas,
+            "inclination": _CswAngle.uasFromAngle(self.inclination),
+            "longAscendingNode": _CswAngle.uasFromAngle(self.longAscendingNode),
+            "argOfPerihelion": _CswAngle.uasFromAngle(self.argOfPerihelion),
             "perihelionDistance": self.perihelionDistance,
             "eccentricity": self.eccentricity
         }
@@ -250,9 +268,9 @@ class CometCoord(Coord):
         return CometCoord(
             tag=Tag(obj["tag"]),
             epochOfPerihelion=obj["epochOfPerihelion"],
-            inclination=_CswAngle(obj["inclination"]).toAngle().to(u.deg),
-            longAscendingNode=_CswAngle(obj["longAscendingNode"]).toAngle().to(u.deg),
-            argOfPerihelion=_CswAngle(obj["argOfPerihelion"]).toAngle().to(u.deg),
+            inclination=_CswAngle.angleFromUas(obj["inclination"]),
+            longAscendingNode=_CswAngle.angleFromUas(obj["longAscendingNode"]),
+            argOfPerihelion=_CswAngle.angleFromUas(obj["argOfPerihelion"]),
             perihelionDistance=obj["perihelionDistance"],
             eccentricity=obj["eccentricity"]
         )
@@ -279,14 +297,24 @@ class AltAzCoord(Coord):
         return {
             "_type": self.__class__.__name__,
             "tag": self.tag.name,
-            "alt": _CswAngle.fromAngle(self.alt).uas,
-            "az": _CswAngle.fromAngle(self.az).uas
+            "alt": _CswAngle.uasFromAngle(self.alt),
+            "az": _CswAngle.uasFromAngle(self.az)
         }
 
     @staticmethod
     def _fromValueDict(obj: dict):
         return AltAzCoord(
             tag=Tag(obj["tag"]),
-            alt=_CswAngle(obj["alt"]).toAngle().to(u.deg),
-            az=_CswAngle(obj["az"]).toAngle().to(u.deg),
+            alt=_CswAngle.angleFromUas(obj["alt"]),
+            az=_CswAngle.angleFromUas(obj["az"]),
         )
+
+
+# Maps the "_type" value of an encoded coordinate to the corresponding class
+_coordClasses = {
+    "EqCoord": EqCoord,
+    "SolarSystemCoord": SolarSystemCoord,
+    "MinorPlanetCoord": MinorPlanetCoord,
+    "CometCoord": CometCoord,
+    "AltAzCoord": AltAzCoord
+}
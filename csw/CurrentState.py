@@ -2,6 +2,7 @@ import traceback
 from dataclasses import dataclass
 from typing import List, TypeVar
 from csw.Parameter import Parameter, Key, KeyType
+from csw.ParameterSetIndex import ParameterSetIndex
 from csw.Prefix import Prefix
 
 T = TypeVar('T')
@@ -9,7 +10,7 @@ T = TypeVar('T')
 
 # noinspection PyPep8Naming
 @dataclass
-class CurrentState:
+class CurrentState(ParameterSetIndex):
     """
     Represents the current state of a python based CSW component.
     """
@@ -24,7 +25,7 @@ class CurrentState:
         """
         prefix = Prefix.from_str(obj['prefix'])
         stateName = obj['stateName']
-        paramSet = list(map(lambda p: Parameter._fromDict(p), obj['paramSet']))
+        paramSet = [Parameter._fromDict(p) for p in obj['paramSet']]
         return CurrentState(prefix, stateName, paramSet)
 
     def _asDict(self):
@@ -35,7 +36,7 @@ class CurrentState:
         return {
             'prefix': str(self.prefix),
             'stateName': self.stateName,
-            'paramSet': list(map(lambda p: p._asDict(), self.paramSet))
+            'paramSet': [p._asDict() for p in self.paramSet]
         }
 
     def __call__(self, key: Key[T]) -> Parameter[T] | None:
@@ -48,9 +49,7 @@ class CurrentState:
         Returns: Parameter[T] | None
             the parameter, if found
         """
-        for p in self.paramSet:
-            if p.keyName == key.keyName:
-                return p
+        return self._findParam(key.keyName)
 
     # noinspection PyUnusedLocal
     def get(self, keyName: str, keyType: KeyType[T]) -> Parameter[T] | None:
@@ -64,9 +63,7 @@ class CurrentState:
         Returns: Parameter[T] | None
             the parameter, if found
         """
-        for p in self.paramSet:
-            if p.keyName == keyName:
-                return p
+        return self._findParam(keyName)
 
     def gets(self, keyName: str) -> Parameter | None:
         """
@@ -78,9 +75,7 @@ class CurrentState:
         Returns: Parameter | None
             the parameter, if found
         """
-        for p in self.paramSet:
-            if p.keyName == keyName:
-                return p
+        return self._findParam(keyName)
 
     def exists(self, keyName: str):
         """
@@ -92,7 +87,4 @@ class CurrentState:
         Returns: bool
             true if the parameter is found
         """
-        for p in self.paramSet:
-            if p.keyName == keyName:
-                return True
-        return False
+        return self._findParam(keyName) is not None
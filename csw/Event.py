@@ -5,12 +5,13 @@ from abc import abstractmethod
 
 from csw.EventName import EventName
 from csw.Parameter import Parameter
+from csw.ParameterSetIndex import ParameterSetIndex, ParamSet
 from csw.EventTime import EventTime
 from csw.Prefix import Prefix
 
 
 @dataclass
-class Event:
+class Event(ParameterSetIndex):
     """
     Abstract base class that creates an Event that can be published to the event service
     (Don't use this class directly: The system expects a SystemEvent or an ObserveEvent).
@@ -45,7 +46,7 @@ class Event:
         """
         typ = obj['_type']
         assert (typ in {"SystemEvent", "ObserveEvent"})
-        paramSet = list(map(lambda p: Parameter._fromDict(p, True), obj['paramSet']))
+        paramSet = [Parameter._fromDict(p, True) for p in obj['paramSet']]
         eventTime = EventTime._fromDict(obj['eventTime'])
         prefix = Prefix.from_str(obj['source'])
         eventName = EventName(obj['eventName'])
@@ -61,12 +62,12 @@ class Event:
             a dictionary corresponding to this object
         """
         return {
-            "_type": self.__class__.__name__,
+            "_type": self.eventType(),
             'eventId': self.eventId,
             'source': str(self.source),
             'eventName': self.eventName.name,
             'eventTime': self.eventTime._asDict(),
-            'paramSet': list(map(lambda p: p._asDict(True), self.paramSet))
+            'paramSet': [p._asDict(True) for p in self.paramSet]
         }
 
     def isInvalid(self):
@@ -82,9 +83,7 @@ class Event:
         Returns: Parameter|None
             the parameter, if found
         """
-        for p in self.paramSet:
-            if p.keyName == keyName:
-                return p
+        return self._findParam(keyName)
 
     def exists(self, keyName: str):
         """
@@ -96,10 +95,7 @@ class Event:
         Returns: bool
             true if the parameter is found
         """
-        for p in self.paramSet:
-            if p.keyName == keyName:
-                return True
-        return False
+        return self._findParam(keyName) is not None
 
 
 @dataclass
@@ -153,3 +149,92 @@ class ObserveEvent(Event):
     @abstractmethod
     def eventType(self) -> str:
         return "ObserveEvent"
+
+
+class _LazyEvent:
+    """
+    Mixin for an event received from the Event Service whose parameters are only decoded when accessed.
+    The header fields (source, eventName, eventTime, eventId) are decoded eagerly, while the parameters
+    are kept in their decoded CBOR form (dicts) until get() or getMany() is called for one of them, or until
+    the paramSet is accessed, which decodes all of them.
+    """
+
+    def __init__(self, source: Prefix, eventName: EventName, rawParamSet: List[dict], eventTime: EventTime,
+                 eventId: str):
+        self.source = source
+        self.eventName = eventName
+        self.eventTime = eventTime
+        self.eventId = eventId
+        self._rawParamSet = rawParamSet
+        # Maps keyName to the raw (CBOR) parameter dict, built on first use
+        self._rawParams: dict[str, dict] | None = None
+        # Maps keyName to the parameters that were already decoded
+        self._decodedParams: dict[str, Parameter] = {}
+        self._paramSet: List[Parameter] | None = None
+
+    @property
+    def paramSet(self) -> List[Parameter]:
+        if self._paramSet is None:
+            self._paramSet = ParamSet(self._decodeParam(raw) for raw in self._rawParamSet)
+        return self._paramSet
+
+    @paramSet.setter
+    def paramSet(self, paramSet: List[Parameter]):
+        self._paramSet = paramSet
+
+    def _getRawParams(self) -> dict[str, dict]:
+        if self._rawParams is None:
+            rawParams = {}
+            for raw in self._rawParamSet:
+                [v] = raw.values()
+                # Keep the first one, as the linear search in Event.get() does
+                rawParams.setdefault(v['keyName'], raw)
+            self._rawParams = rawParams
+        return self._rawParams
+
+    def _decodeParam(self, raw: dict) -> Parameter:
+        [v] = raw.values()
+        keyName = v['keyName']
+        if self._getRawParams()[keyName] is not raw:
+            # A duplicate of an earlier parameter name, which get() would never return
+            return Parameter._fromDict(raw, True)
+        p = self._decodedParams.get(keyName)
+        if p is None:
+            p = self._decodedParams[keyName] = Parameter._fromDict(raw, True)
+        return p
+
+    def _findParam(self, keyName: str) -> Parameter | None:
+        if self._paramSet is not None:
+            return super()._findParam(keyName)
+        raw = self._getRawParams().get(keyName)
+        if raw is not None:
+            return self._decodeParam(raw)
+        return None
+
+    def exists(self, keyName: str):
+        if self._paramSet is not None:
+            return super().exists(keyName)
+        return keyName in self._getRawParams()
+
+    def __eq__(self, other):
+        # Lazy events are equal to the corresponding fully decoded events
+        if not isinstance(other, Event) or self.eventType() != other.eventType():
+            return NotImplemented
+        return (self.source, self.eventName, self.paramSet, self.eventTime, self.eventId) == \
+            (other.source, other.eventName, other.paramSet, other.eventTime, other.eventId)
+
+
+class LazySystemEvent(_LazyEvent, SystemEvent):
+    """
+    A SystemEvent received from the Event Service whose parameters are decoded on demand
+    (See EventSubscriber.subscribe()).
+    """
+    pass
+
+
+class LazyObserveEvent(_LazyEvent, ObserveEvent):
+    """
+    An ObserveEvent received from the Event Service whose parameters are decoded on demand
+    (See EventSubscriber.subscribe()).
+    """
+    pass
@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import List
+
+
+class EventCache:
+    """
+    Client side cache of the latest (encoded) event for each event key, used by EventSubscriber.get() when enabled.
+
+    While an event key is subscribed (with EventSubscriber.subscribe()), its value in the cache is updated
+    from the received events, so it is always current and get() does not need to access Redis.
+    When an event key is no longer subscribed, its last value is kept for up to `ttl`,
+    and at most `maxSize` of these values are kept (the least recently used ones are removed first).
+    """
+
+    def __init__(self, maxSize: int = 1000, ttl: timedelta = timedelta(seconds=1)):
+        self.maxSize = maxSize
+        self.ttl = ttl.total_seconds()
+        # Number of subscriptions for each subscribed event key
+        self._subscriptionCount: dict[str, int] = {}
+        # Latest value for subscribed event keys (None if no event was published), once it is known
+        self._live: dict[str, bytes | None] = {}
+        # Last value for event keys that are no longer subscribed, with the time they were unsubscribed
+        self._expiring: OrderedDict[str, tuple[bytes | None, float]] = OrderedDict()
+
+    def retain(self, keyList: List[str]) -> List[str]:
+        """
+        Called when the given event keys are subscribed.
+
+        Returns:
+            the keys that were not subscribed before, for which onMessage() needs to be registered
+        """
+        newKeys = []
+        for key in keyList:
+            count = self._subscriptionCount.get(key, 0)
+            if count == 0:
+                # The value might have changed while the key was not subscribed
+                self._expiring.pop(key, None)
+                newKeys.append(key)
+            self._subscriptionCount[key] = count + 1
+        return newKeys
+
+    def release(self, keyList: List[str], all: bool = False) -> List[str]:
+        """
+        Called when a subscription to the given event keys is removed (or all subscriptions, if all is true).
+
+        Returns:
+            the keys that are no longer subscribed, for which onMessage() can be unregistered
+        """
+        releasedKeys = []
+        now = time.monotonic()
+        for key in keyList:
+            count = self._subscriptionCount.get(key)
+            if count is None:
+                continue
+            if count > 1 and not all:
+                self._subscriptionCount[key] = count - 1
+                continue
+            del self._subscriptionCount[key]
+            releasedKeys.append(key)
+            if key in self._live:
+                self._expiring[key] = (self._live.pop(key), now)
+        while len(self._expiring) > self.maxSize:
+            self._expiring.popitem(last=False)
+        return releasedKeys
+
+    def subscribedKeys(self) -> List[str]:
+        """
+        Returns the list of event keys that are currently subscribed
+        """
+        return list(self._subscriptionCount.keys())
+
+    async def onMessage(self, message: dict):
+        """
+        Callback for received events (Redis messages) for the subscribed event keys
+        """
+        channel = message['channel']
+        key = channel.decode() if isinstance(channel, bytes) else channel
+        if key in self._subscriptionCount:
+            self._live[key] = message['data']
+
+    def lookup(self, key: str) -> tuple[bool, bytes | None]:
+        """
+        Returns (True, value) if the value for the given key is in the cache (where the value can be None, if no event
+        was published for the key), otherwise (False, None)
+        """
+        if key in self._live:
+            return True, self._live[key]
+        entry = self._expiring.get(key)
+        if entry is not None:
+            data, t = entry
+            if time.monotonic() - t <= self.ttl:
+                self._expiring.move_to_end(key)
+                return True, data
+            del self._expiring[key]
+        return False, None
+
+    def store(self, key: str, data: bytes | None):
+        """
+        Stores the value that was read from Redis for a subscribed key, unless a newer one was already received.
+        """
+        if key in self._subscriptionCount:
+            self._live.setdefault(key, data)
@@ -0,0 +1,166 @@
+import zlib
+from io import BytesIO
+
+import cbor2
+
+from csw.Event import Event, SystemEvent, ObserveEvent, LazySystemEvent, LazyObserveEvent
+from csw.EventName import EventName
+from csw.EventTime import EventTime
+from csw.Parameter import Parameter, _cborDefault, _paramCodecs, _keyTypesByName, _unitsByName
+from csw.Prefix import Prefix
+
+# Maps the "_type" value of an encoded event to the corresponding class
+_eventClasses = {
+    "SystemEvent": SystemEvent,
+    "ObserveEvent": ObserveEvent
+}
+
+# Same as above, for the events whose parameters are decoded on demand
+_lazyEventClasses = {
+    "SystemEvent": LazySystemEvent,
+    "ObserveEvent": LazyObserveEvent
+}
+
+# Prefix of compressed events, followed by one byte for the compression algorithm.
+# Since 0xff (the CBOR "break" code) can not start a CBOR item, it can't be confused with an uncompressed event.
+compressionMarker = b'\xffZ'
+
+# Maps each available compression algorithm name to its id byte and its compress and decompress functions
+_compressors = {
+    "zlib": (b'z', lambda data: zlib.compress(data, 1), zlib.decompress)
+}
+
+try:
+    import zstandard
+
+    _compressors["zstd"] = (b's', zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress)
+except ImportError:
+    pass
+
+try:
+    import lz4.frame
+
+    _compressors["lz4"] = (b'4', lz4.frame.compress, lz4.frame.decompress)
+except ImportError:
+    pass
+
+# Maps the id byte of each available compression algorithm to its decompress function
+_decompressors = {algorithmId: decompress for algorithmId, _, decompress in _compressors.values()}
+
+
+class EventCodec:
+    """
+    Encodes and decodes events to and from the CBOR format used by the CSW Event Service.
+
+    The result is the same as cbor2.dumps(event._asDict()) and Event._fromDict(cbor2.loads(data)),
+    but the parameters are converted directly using the per key type codec table, without the
+    Parameter._asDict()/_fromDict() calls for each parameter, and a single CBOR encoder and decoder
+    are reused for all events, which avoids the cost of creating new ones for each call.
+
+    Optionally, large encoded events can be compressed: The result then starts with compressionMarker, followed by
+    a byte for the algorithm, which decode() and decodeLazy() detect automatically.
+    Note that only Python subscribers can read compressed events.
+
+    Note: An instance is not thread safe: Each EventPublisher or EventSubscriber has its own.
+    """
+
+    def __init__(self, compression: str | None = None, compressionThreshold: int = 64 * 1024):
+        """
+        Args:
+            compression: if given, the compression algorithm to use for large events
+                         (one of compressionAlgorithms(): "zlib", and also "zstd" and "lz4" if installed)
+            compressionThreshold: only events whose encoding is at least this many bytes are compressed
+        """
+        self._encoderBuffer = BytesIO()
+        self._encoder = cbor2.CBOREncoder(self._encoderBuffer, default=_cborDefault)
+        self._decoder = cbor2.CBORDecoder(BytesIO())
+        if compression is not None and compression not in _compressors:
+            raise ValueError(f"Unsupported compression algorithm: {compression}: "
+                             f"Expected one of {self.compressionAlgorithms()}")
+        self._compressor = _compressors[compression] if compression is not None else None
+        self.compressionThreshold = compressionThreshold
+
+    @staticmethod
+    def compressionAlgorithms() -> list[str]:
+        """
+        Returns the names of the compression algorithms that are available (depending on the installed packages)
+        """
+        return list(_compressors.keys())
+
+    def encode(self, event: Event) -> bytes:
+        """
+        Returns the CBOR encoding of the given event.
+        """
+        codecs = _paramCodecs
+        paramSet = []
+        for p in event.paramSet:
+            keyTypeName = p.keyType.name
+            paramSet.append({
+                keyTypeName: {
+                    'keyName': p.keyName,
+                    'values': codecs[keyTypeName].toCbor(p.values),
+                    'units': p.units.name
+                }
+            })
+        eventTime = event.eventTime
+        buffer = self._encoderBuffer
+        buffer.seek(0)
+        buffer.truncate()
+        self._encoder.encode({
+            "_type": event.eventType(),
+            'eventId': event.eventId,
+            'source': str(event.source),
+            'eventName': event.eventName.name,
+            'eventTime': {'seconds': eventTime.seconds, 'nanos': eventTime.nanos},
+            'paramSet': paramSet
+        })
+        data = buffer.getvalue()
+        if self._compressor is not None and len(data) >= self.compressionThreshold:
+            algorithmId, compress, _ = self._compressor
+            compressed = compress(data)
+            # Not worth it if the data can't be compressed (for example, random values)
+            if len(compressed) + 3 < len(data):
+                return compressionMarker + algorithmId + compressed
+        return data
+
+    def _decodeDict(self, data: bytes) -> dict:
+        if data[:2] == compressionMarker:
+            decompress = _decompressors.get(data[2:3])
+            if decompress is None:
+                raise ValueError(f"Can't decode event compressed with an unsupported algorithm: {data[2:3]}")
+            data = decompress(data[3:])
+        self._decoder.fp = BytesIO(data)
+        return self._decoder.decode()
+
+    def decode(self, data: bytes) -> Event:
+        """
+        Returns the event for the given CBOR encoded (and possibly compressed) bytes.
+        """
+        obj = self._decodeDict(data)
+        eventClass = _eventClasses[obj['_type']]
+        codecs = _paramCodecs
+        paramSet = []
+        for p in obj['paramSet']:
+            [(k, v)] = p.items()
+            paramSet.append(
+                Parameter(v['keyName'], _keyTypesByName[k], codecs[k].fromCbor(v['values']), _unitsByName[v['units']]))
+        eventTime = obj['eventTime']
+        return eventClass(Prefix.from_str(obj['source']),
+                          EventName(obj['eventName']),
+                          paramSet,
+                          EventTime(eventTime['seconds'], eventTime['nanos']),
+                          obj['eventId'])
+
+    def decodeLazy(self, data: bytes) -> Event:
+        """
+        Returns a LazySystemEvent or LazyObserveEvent for the given CBOR encoded (and possibly compressed) bytes.
+        Only the event header is decoded here: The parameters are decoded when they are accessed.
+        """
+        obj = self._decodeDict(data)
+        eventClass = _lazyEventClasses[obj['_type']]
+        eventTime = obj['eventTime']
+        return eventClass(Prefix.from_str(obj['source']),
+                          EventName(obj['eventName']),
+                          obj['paramSet'],
+                          EventTime(eventTime['seconds'], eventTime['nanos']),
+                          obj['eventId'])
@@ -1,20 +1,91 @@
-from typing import Self
+from datetime import timedelta
+from typing import Self, List, Callable, Awaitable
 
-import cbor2
+import structlog
+from aiohttp import ClientSession
 
+from csw.Cancellable import Cancellable
 from csw.Event import Event
+from csw.EventCodec import EventCodec
+from csw.EventKey import EventKey
 from csw.RedisConnector import RedisConnector
+from csw.TimeServiceScheduler import TimeServiceScheduler
 
 # XXX TODO FIXME: Use async redis
 
 class EventPublisher:
+    log = structlog.get_logger()
 
-    def __init__(self, redis: RedisConnector):
+    def __init__(self, redis: RedisConnector, compression: str | None = None, compressionThreshold: int = 64 * 1024,
+                 persistEvery: int = 1):
+        """
+        Args:
+            redis (RedisConnector): used to access the Event Service
+            compression (str): if given, events whose encoding is larger than compressionThreshold bytes are compressed
+                               with this algorithm (See EventCodec.compressionAlgorithms()).
+                               EventSubscriber detects compressed events automatically, but subscribers in other
+                               languages can't read them.
+            compressionThreshold (int): minimum size in bytes of the encoded events to compress
+            persistEvery (int): by default (1) each published event is also stored in Redis as the latest value for
+                                its event key, for EventSubscriber.get(). For high rate events that are only
+                                subscribed to, this can be set to N to only store every Nth event for each key
+                                (starting with the first one), or to 0 to never store them.
+                                This can also be set for individual event keys with setPersistEvery().
+        """
         self._redis = redis
+        self._codec = EventCodec(compression, compressionThreshold)
+        self.persistEvery = persistEvery
+        # Overrides of persistEvery for individual event keys
+        self._persistEveryByKey: dict[str, int] = {}
+        # Number of events published for each key, for keys where persistEvery > 1
+        self._publishCounts: dict[str, int] = {}
+        # Total number of skipped publish cycles for publishAsync(), when generating and publishing took too long
+        self.overrunCount = 0
+
+    @classmethod
+    def make(cls, compression: str | None = None, compressionThreshold: int = 64 * 1024,
+             persistEvery: int = 1) -> Self:
+        """
+        Returns a new EventPublisher (See __init__ for the arguments).
+        Note: This blocks while looking up the Event Server location: Use create() in async code.
+        """
+        return cls(RedisConnector.make(), compression, compressionThreshold, persistEvery)
 
     @classmethod
-    def make(cls) -> Self:
-        return cls(RedisConnector.make())
+    async def create(cls, clientSession: ClientSession | None = None, compression: str | None = None,
+                     compressionThreshold: int = 64 * 1024, persistEvery: int = 1) -> Self:
+        """
+        Returns a new EventPublisher, without blocking the event loop (uses the async Location Service API)
+
+        Args:
+            clientSession: the HTTP session to use for the Location Service (a temporary one is used if not given)
+            compression: see __init__
+            compressionThreshold: see __init__
+            persistEvery: see __init__
+        """
+        return cls(await RedisConnector.create(clientSession), compression, compressionThreshold, persistEvery)
+
+    def setPersistEvery(self, eventKey: EventKey | str, persistEvery: int | None):
+        """
+        Sets how often the events published for the given key are stored as the latest value in Redis
+        (See persistEvery in __init__), or removes the setting for the key, if persistEvery is None.
+        """
+        key = str(eventKey)
+        if persistEvery is None:
+            self._persistEveryByKey.pop(key, None)
+        else:
+            self._persistEveryByKey[key] = persistEvery
+        self._publishCounts.pop(key, None)
+
+    def _shouldPersist(self, key: str) -> bool:
+        persistEvery = self._persistEveryByKey.get(key, self.persistEvery)
+        if persistEvery == 1:
+            return True
+        if persistEvery <= 0:
+            return False
+        count = self._publishCounts.get(key, 0)
+        self._publishCounts[key] = count + 1
+        return count % persistEvery == 0
 
     async def publish(self, event: Event):
         """
@@ -24,8 +95,50 @@ class EventPublisher:
             event (Event): Event to be published
         """
         event_key = str(event.source) + "." + event.eventName.name
-        obj = cbor2.dumps(event._asDict())
-        await self._redis.publish(event_key, obj)
+        obj = self._codec.encode(event)
+        await self._redis.publish(event_key, obj, self._shouldPersist(event_key))
+
+    async def publishBatch(self, events: List[Event]):
+        """
+        Publish a list of events to the Event Service.
+        This is faster than calling publish() for each event, since all of the events are sent to Redis
+        in a single pipelined write.
+
+        Args:
+            events (List[Event]): Events to be published
+        """
+        items = [(str(event.source) + "." + event.eventName.name, self._codec.encode(event)) for event in events]
+        await self._redis.publishBatch(items, [self._shouldPersist(key) for key, _ in items])
+
+    def publishAsync(self, eventGenerator: Callable[[], Awaitable[Event | None]], every: timedelta) -> Cancellable:
+        """
+        Publishes the events generated by eventGenerator at the given interval, until cancelled.
+        The publish times are fixed relative to the first one, so they do not drift when publishing is slow.
+        If eventGenerator returns None, nothing is published for that cycle.
+        If a cycle takes longer than the interval, the missed cycles are skipped, counted in
+        overrunCount and logged.
+
+        Args:
+            eventGenerator: async function that is called at each interval to generate the event to publish
+            every: the interval at which events are to be published
+
+        Returns:
+            a handle that can be used to stop publishing
+        """
+
+        async def publishNext():
+            try:
+                event = await eventGenerator()
+                if event is not None:
+                    await self.publish(event)
+            except Exception as ex:
+                self.log.error(f"Failed to generate or publish event: {ex}")
+
+        def onOverrun(missed: int):
+            self.overrunCount += missed
+            self.log.warning(f"Periodic event publishing skipped {missed} cycle(s), since it took longer than {every}")
+
+        return TimeServiceScheduler().schedulePeriodically(every, publishNext, onOverrun)
 
     async def close(self):
         await self._redis.close()
\ No newline at end of file
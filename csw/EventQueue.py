@@ -0,0 +1,80 @@
+import asyncio
+from collections import OrderedDict
+from enum import Enum
+
+
+class OverflowPolicy(Enum):
+    """
+    What to do when an event is received for a subscription whose queue is full (See EventSubscriber.subscribe()).
+    """
+    # Drop the oldest event in the queue to make room for the new one
+    DropOldest = 0
+    # Drop the new event
+    DropNewest = 1
+    # Keep only the latest event for each event key: A new event replaces the queued one with the same key,
+    # otherwise the oldest event is dropped if the queue is full
+    KeepLatestPerKey = 2
+    # Wait until there is room in the queue. Note that this delays the events for all subscriptions of the subscriber.
+    Block = 3
+
+
+class EventQueue:
+    """
+    A bounded queue of received messages for a subscription, with a single consumer.
+    The number of messages that were dropped due to the overflow policy is counted in `dropped`.
+    """
+
+    def __init__(self, maxSize: int, policy: OverflowPolicy = OverflowPolicy.DropOldest):
+        assert maxSize > 0
+        self.maxSize = maxSize
+        self.policy = policy
+        self.dropped = 0
+        # For KeepLatestPerKey the dict key is the event key, otherwise a sequence number
+        self._items: OrderedDict = OrderedDict()
+        self._seq = 0
+        self._notEmpty = asyncio.Event()
+        self._notFull = asyncio.Event()
+        self._notFull.set()
+
+    def __len__(self):
+        return len(self._items)
+
+    async def put(self, key: str, item):
+        """
+        Adds an item to the queue, applying the overflow policy if the queue is full.
+
+        Args:
+            key: the event key for the item
+            item: the item to add (for example, the Redis message)
+        """
+        if self.policy == OverflowPolicy.KeepLatestPerKey:
+            if key in self._items:
+                self._items[key] = item
+                self.dropped += 1
+                return
+        else:
+            key = self._seq
+            self._seq += 1
+        while len(self._items) >= self.maxSize:
+            if self.policy == OverflowPolicy.Block:
+                self._notFull.clear()
+                await self._notFull.wait()
+            elif self.policy == OverflowPolicy.DropNewest:
+                self.dropped += 1
+                return
+            else:
+                self._items.popitem(last=False)
+                self.dropped += 1
+        self._items[key] = item
+        self._notEmpty.set()
+
+    async def get(self):
+        """
+        Removes and returns the oldest item in the queue, waiting for one if the queue is empty.
+        """
+        while not self._items:
+            self._notEmpty.clear()
+            await self._notEmpty.wait()
+        _, item = self._items.popitem(last=False)
+        self._notFull.set()
+        return item
@@ -35,6 +35,8 @@ class EventService:
         Create a new instance of EventPublisher with a separate underlying connection than the default instance.
         The new instance will be required when the location of Event Service is updated or in case the performance requirements
         of a publish operation demands a separate connection to be used.
+        Note that all publishers share the connection pool for the Event Server (See RedisClientPool), so
+        RedisClientPool.maxConnections should be increased if the publishers need more concurrent connections.
         """
         return EventPublisher.make()
 
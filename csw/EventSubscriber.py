@@ -1,36 +1,146 @@
 import asyncio
-from typing import Callable, Set, Self, Awaitable, List
+from asyncio import Task
+from datetime import timedelta
+from typing import Callable, Self, Awaitable, List, Iterable
 
-import cbor2
+import structlog
+from aiohttp import ClientSession
 
+from csw.Cancellable import Cancellable
+from csw.EventCache import EventCache
+from csw.EventCodec import EventCodec
+from csw.EventQueue import EventQueue, OverflowPolicy
 from csw.EventSubscription import EventSubscription
-from csw.RedisConnector import RedisConnector
+from csw.RedisConnector import RedisConnector, ReconnectMetrics
 from csw.Event import Event, SystemEvent
 from csw.EventKey import EventKey
+from csw.TimeServiceScheduler import TimeServiceScheduler
 
 
 # XXX TODO FIXME: Use async redis
 
+class _KeyTask:
+    """
+    A background task of a subscription (queue consumer task or rate adapter ticker) that delivers the events
+    for the given keys. It is cancelled once all of its keys are unsubscribed.
+    """
+
+    def __init__(self, keys: List[str]):
+        self.keys = set(keys)
+        self.task: Task | Cancellable | None = None
+
+
 class EventSubscriber:
+    log = structlog.get_logger()
 
-    def __init__(self, redis: RedisConnector):
+    def __init__(self, redis: RedisConnector, cacheSize: int | None = None,
+                 cacheTtl: timedelta = timedelta(seconds=1)):
+        """
+        Args:
+            redis (RedisConnector): used to access the Event Service
+            cacheSize (int): if given, get() and getsOrdered() are served from a client side cache for the event keys
+                             that are subscribed with subscribe(), which is kept up to date by the received events,
+                             so that no Redis access is needed. The value of a key that is no longer subscribed is
+                             kept for up to cacheTtl, with at most cacheSize of these values
+                             (the least recently used ones are removed first).
+            cacheTtl (timedelta): how long to keep the last value of an event key that is no longer subscribed
+                                  (only used if cacheSize is given)
+        """
         self._redis = redis
+        self._codec = EventCodec()
+        self._cache = EventCache(cacheSize, cacheTtl) if cacheSize is not None else None
+        # Maps each subscribed key to the background tasks that deliver its events
+        self._keyTasks: dict[str, list[_KeyTask]] = {}
 
     @classmethod
-    def make(cls) -> Self:
-        return cls(RedisConnector.make())
+    def make(cls, cacheSize: int | None = None, cacheTtl: timedelta = timedelta(seconds=1)) -> Self:
+        """
+        Returns a new EventSubscriber (See __init__ for the arguments).
+        Note: This blocks while looking up the Event Server location: Use create() in async code.
+        """
+        return cls(RedisConnector.make(), cacheSize, cacheTtl)
+
+    @classmethod
+    async def create(cls, clientSession: ClientSession | None = None, cacheSize: int | None = None,
+                     cacheTtl: timedelta = timedelta(seconds=1)) -> Self:
+        """
+        Returns a new EventSubscriber, without blocking the event loop (uses the async Location Service API)
+
+        Args:
+            clientSession: the HTTP session to use for the Location Service (a temporary one is used if not given)
+            cacheSize: see __init__
+            cacheTtl: see __init__
+        """
+        return cls(await RedisConnector.create(clientSession), cacheSize, cacheTtl)
 
     async def close(self):
+        for keyTasks in self._keyTasks.values():
+            for keyTask in keyTasks:
+                keyTask.task.cancel()
+        self._keyTasks.clear()
         await self._redis.close()
 
-    @staticmethod
-    async def _handleCallback(message: dict, callback: Callable[[Event], Awaitable]):
+    @property
+    def reconnectMetrics(self) -> ReconnectMetrics:
+        """
+        Statistics for the reconnections after the connection to the Event Server was lost.
+        The subscriptions are automatically restored after a reconnection (See RedisConnector).
+        """
+        return self._redis.reconnectMetrics
+
+    async def _subscribeKeys(self, keyList: List[str], f: Callable[[dict], Awaitable]):
+        await self._redis.subscribe(keyList, f)
+        if self._cache is not None:
+            newKeys = self._cache.retain(keyList)
+            if newKeys:
+                await self._redis.subscribe(newKeys, self._cache.onMessage)
+
+    async def _unsubscribeKeys(self, keyList: List[str], f: Callable[[dict], Awaitable]):
+        await self._redis.unsubscribe(keyList, f)
+        if self._cache is not None:
+            releasedKeys = self._cache.release(keyList)
+            if releasedKeys:
+                await self._redis.unsubscribe(releasedKeys, self._cache.onMessage)
+
+    def _addKeyTask(self, keyTask: _KeyTask):
+        for key in keyTask.keys:
+            self._keyTasks.setdefault(key, []).append(keyTask)
+
+    def _removeKeyTask(self, keyTask: _KeyTask):
+        """
+        Cancels the given task and removes it for all of its keys (when its subscription is unsubscribed)
+        """
+        keyTask.task.cancel()
+        for key in keyTask.keys:
+            keyTasks = self._keyTasks.get(key, [])
+            if keyTask in keyTasks:
+                keyTasks.remove(keyTask)
+            if not keyTasks:
+                self._keyTasks.pop(key, None)
+        keyTask.keys.clear()
+
+    def _releaseKeyTasks(self, keyList: List[str]):
+        """
+        Removes the given keys from the tasks that deliver their events, and cancels the tasks that have no keys left
+        (when the keys are unsubscribed with unsubscribe())
+        """
+        for key in keyList:
+            for keyTask in self._keyTasks.pop(key, []):
+                keyTask.keys.discard(key)
+                if not keyTask.keys:
+                    keyTask.task.cancel()
+
+    async def _handleCallback(self, message: dict, callback: Callable[[Event], Awaitable], lazy: bool = False):
         data = message['data']
-        event = Event._fromDict(cbor2.loads(data))
+        event = self._codec.decodeLazy(data) if lazy else self._codec.decode(data)
         await callback(event)
 
     async def subscribe(self, eventKeyList: list[EventKey],
-                        callback: Callable[[Event], Awaitable]) -> EventSubscription:
+                        callback: Callable[[Event], Awaitable],
+                        lazy: bool = False,
+                        every: timedelta | None = None,
+                        queueSize: int | None = None,
+                        overflowPolicy: OverflowPolicy = OverflowPolicy.DropOldest) -> EventSubscription:
         """
         Start a subscription to system events in event service, specifying a callback
         to be called when an event in the list has its value updated.
@@ -38,19 +148,111 @@ class EventSubscriber:
         Args:
             eventKeyList (list[EventKey]): list of event EventKey to subscribe to
             callback (Callable[[Event], None]): function to be called when event updates. Should take Event and return void
+            lazy (bool): if true, the callback receives a LazySystemEvent or LazyObserveEvent, where the
+                         parameters are only decoded when accessed (with event.get(keyName) or event.paramSet).
+                         This saves time if the callback only looks at a few of the parameters.
+            every (timedelta): if given, the callback is called at this interval for each of the event keys with the
+                               latest event, instead of for each published event (like the CSW RateAdapterMode):
+                               If multiple events were published since the last call, only the latest one is passed
+                               to the callback, and if none was published, the previous one is passed again.
+                               Event keys that have no published event yet receive an invalid event.
+            queueSize (int): if given, received events are put in a queue of this size, from which a separate task
+                             calls the callback, so that a slow callback does not delay the events for other
+                             subscriptions. If the queue is full, the overflow policy is applied
+                             (see EventSubscription.dropped for the number of dropped events).
+                             Otherwise the callback is called directly by the task that reads the events.
+            overflowPolicy (OverflowPolicy): what to do when an event is received and the queue is full
+                                             (used only if queueSize is given)
 
         Returns:
             an object that can be used to unsubscribe
         """
+        if every is not None:
+            return await self._subscribeWithRateAdapter(eventKeyList, callback, lazy, every)
+
+        if queueSize is not None:
+            return await self._subscribeWithQueue(eventKeyList, callback, lazy, EventQueue(queueSize, overflowPolicy))
+
         keyList = list(map(lambda k: str(k), eventKeyList))
 
         async def f(message):
-            await self._handleCallback(message, callback)
+            await self._handleCallback(message, callback, lazy)
 
-        t = await self._redis.subscribe(keyList, f)
+        await self._subscribeKeys(keyList, f)
         async def unsub():
-            await self._redis.unsubscribe(keyList)
-        return EventSubscription(t, unsub)
+            await self._unsubscribeKeys(keyList, f)
+        return EventSubscription(None, unsub)
+
+    async def _subscribeWithQueue(self, eventKeyList: list[EventKey],
+                                  callback: Callable[[Event], Awaitable],
+                                  lazy: bool,
+                                  queue: EventQueue) -> EventSubscription:
+        keyList = list(map(lambda k: str(k), eventKeyList))
+
+        # Events are only decoded by the consumer, so dropped events are never decoded
+        async def f(message):
+            await queue.put(message['channel'], message)
+
+        async def consume():
+            while True:
+                message = await queue.get()
+                try:
+                    await self._handleCallback(message, callback, lazy)
+                except Exception as ex:
+                    self.log.error(f"Error in event subscriber callback: {ex}")
+
+        await self._subscribeKeys(keyList, f)
+        keyTask = _KeyTask(keyList)
+        keyTask.task = asyncio.create_task(consume())
+        self._addKeyTask(keyTask)
+
+        async def unsub():
+            self._removeKeyTask(keyTask)
+            await self._unsubscribeKeys(keyList, f)
+        return EventSubscription(keyTask.task, unsub, queue)
+
+    async def _subscribeWithRateAdapter(self, eventKeyList: list[EventKey],
+                                        callback: Callable[[Event], Awaitable],
+                                        lazy: bool,
+                                        every: timedelta) -> EventSubscription:
+        keyList = list(map(lambda k: str(k), eventKeyList))
+        # Latest encoded event for each key: Events are only decoded when passed to the callback
+        latest = {}
+
+        async def f(message):
+            channel = message['channel']
+            latest[channel.decode() if isinstance(channel, bytes) else channel] = message['data']
+
+        keyTask = _KeyTask(keyList)
+
+        async def tick():
+            for eventKey, key in zip(eventKeyList, keyList):
+                # Skip the keys that were unsubscribed with EventSubscriber.unsubscribe()
+                if key not in keyTask.keys:
+                    continue
+                data = latest[key]
+                try:
+                    if not data:
+                        event = SystemEvent.invalidEvent(eventKey)
+                    else:
+                        event = self._codec.decodeLazy(data) if lazy else self._codec.decode(data)
+                    # An error in the callback must not stop the ticks (and so the subscription)
+                    await callback(event)
+                except Exception as ex:
+                    self.log.error(f"Error in event subscriber callback: {ex}")
+
+        await self._subscribeKeys(keyList, f)
+        # Start with the current values (unless a newer one was already received)
+        for key, data in zip(keyList, await self._redis.mget(keyList)):
+            latest.setdefault(key, data)
+        # Since the ticks are skipped if the callback is slow, there is no backlog of events
+        keyTask.task = TimeServiceScheduler().schedulePeriodically(every, tick)
+        self._addKeyTask(keyTask)
+
+        async def unsub():
+            self._removeKeyTask(keyTask)
+            await self._unsubscribeKeys(keyList, f)
+        return EventSubscription(None, unsub)
 
     async def unsubscribe(self, eventKeyList: list[EventKey]):
         """
@@ -60,52 +262,98 @@ class EventSubscriber:
             eventKeyList (list[EventKey]): list of EventKeys to unsubscribe from
         """
         keyList = list(map(lambda k: str(k), eventKeyList))
+        self._releaseKeyTasks(keyList if keyList else list(self._keyTasks))
+        if self._cache is not None:
+            self._cache.release(keyList if keyList else self._cache.subscribedKeys(), all=True)
         return await self._redis.unsubscribe(keyList)
 
-    # XXX Commented out due to Event Service performance concerns when using psubscribe
-    # def pSubscribe(self, eventKeyList: list, callback):
-    #     """
-    #     Start a subscription to system events in event service, specifying a callback
-    #     to be called when an event in the list has its value updated.
-    #     In this case the keys are treated as glob-style patterns:
-    #     h?llo subscribes to hello, hallo and hxllo,
-    #     h*llo subscribes to hllo and heeeello,
-    #     h[ae]llo subscribes to hello and hallo, but not hillo.
-    #
-    #     Args:
-    #         eventKeyList (list): list of event key (string patterns) to subscribe to
-    #         callback (function): function to be called when event updates. Should take Event and return void
-    #
-    #     Returns: PubSubWorkerThread
-    #         subscription thread. Use .stop() method to stop subscription.
-    #     """
-    #     return self._redis.pSubscribe(eventKeyList, lambda message: self._handleCallback(message, callback))
-
-    # def pUnsubscribe(self, eventKeyList: list):
-    #     """
-    #     Unsubscribes to the given list of event key patterns (or all keys, if eventKeyList is empty)
-    #
-    #     Args:
-    #         eventKeyList (list): list of event key patterns (Strings) to unsubscribe from
-    #     """
-    #     return self._redis.pUnsubscribe(eventKeyList)
-
-    async def gets(self, eventKeys: Set[EventKey]) -> Set[Event]:
+    async def pSubscribe(self, patternList: list[str],
+                         callback: Callable[[Event], Awaitable],
+                         lazy: bool = False) -> EventSubscription:
+        """
+        Start a subscription to system events in event service, specifying a callback
+        to be called when an event in the list has its value updated.
+        In this case the keys are treated as glob-style patterns:
+        h?llo subscribes to hello, hallo and hxllo,
+        h*llo subscribes to hllo and heeeello,
+        h[ae]llo subscribes to hello and hallo, but not hillo.
+        For example, "TCS.*" subscribes to all events published by TCS components.
+
+        Note: Only one pattern per subsystem is subscribed in Redis and the events are filtered on the client side,
+        since many Redis pattern subscriptions would slow down publishing for everyone.
+
+        Args:
+            patternList (list[str]): list of event key patterns to subscribe to
+            callback (Callable[[Event], None]): function to be called when event updates. Should take Event and return void
+            lazy (bool): if true, the callback receives events whose parameters are only decoded when accessed
+                         (See subscribe())
+
+        Returns:
+            an object that can be used to unsubscribe
+        """
+
+        async def f(message):
+            await self._handleCallback(message, callback, lazy)
+
+        await self._redis.pSubscribe(patternList, f)
+        async def unsub():
+            await self._redis.pUnsubscribe(patternList, f)
+        return EventSubscription(None, unsub)
+
+    async def pUnsubscribe(self, patternList: list[str]):
+        """
+        Unsubscribes to the given list of event key patterns (or all patterns, if patternList is empty)
+
+        Args:
+            patternList (list[str]): list of event key patterns to unsubscribe from
+        """
+        return await self._redis.pUnsubscribe(patternList)
+
+    async def gets(self, eventKeys: Iterable[EventKey]) -> List[Event]:
         """
         Get latest events for multiple Event Keys. The latest events available for the given Event Keys will be received first.
         If event is not published for one or more event keys, `invalid event` will be received for those Event Keys.
+        All of the events are fetched in a single round trip to Redis (See getsOrdered()).
 
         In case the underlying server is not available, the future fails with [[csw.event.api.exceptions.EventServerNotAvailable]] exception.
         In all other cases of exception, the future fails with the respective exception
 
         Args:
-            eventKeys: a set of [[csw.params.events.EventKey]] to subscribe to
+            eventKeys: a collection of [[csw.params.events.EventKey]] to get the events for
+        Returns:
+            a list of latest Event for the provided Event Keys, with one event for each distinct key
+            (Note: Events can't be put in a Python set, since they are mutable)
+        """
+        distinctKeys = list({str(k): k for k in eventKeys}.values())
+        return await self.getsOrdered(distinctKeys)
+
+    async def getsOrdered(self, eventKeys: List[EventKey]) -> List[Event]:
+        """
+        Get latest events for multiple Event Keys, in the same order as the keys.
+        If event is not published for one or more event keys, `invalid event` will be received for those Event Keys.
+        The events are fetched with MGET, in chunks that are all sent in a single pipelined round trip to Redis.
+
+        Args:
+            eventKeys: list of [[csw.params.events.EventKey]] to get the events for
         Returns:
-            a set of latest Event for the provided Event Keys
+            a list containing the latest Event for each of the provided Event Keys
         """
-        fList = list(map(lambda k: self.get(k), eventKeys))
-        events: List[Event] = await asyncio.gather(*fList)
-        return set(events)
+        keyList = [str(k) for k in eventKeys]
+        if self._cache is None:
+            values = await self._redis.mget(keyList)
+        else:
+            values = [None] * len(keyList)
+            missing = []
+            for i, key in enumerate(keyList):
+                found, values[i] = self._cache.lookup(key)
+                if not found:
+                    missing.append(i)
+            if missing:
+                for i, data in zip(missing, await self._redis.mget([keyList[i] for i in missing])):
+                    values[i] = data
+                    self._cache.store(keyList[i], data)
+        decode = self._codec.decode
+        return [decode(data) if data else SystemEvent.invalidEvent(k) for k, data in zip(eventKeys, values)]
 
     async def get(self, eventKey: EventKey) -> Event:
         """
@@ -114,10 +362,17 @@ class EventSubscriber:
         Args:
             eventKey (EventKey): String specifying Redis key for event.  Should be source prefix + "." + event name.
 
-        Returns: Event obtained from Event Service, decoded into a Event
+        Returns: Event obtained from Event Service (or from the cache, if enabled), decoded into a Event
         """
-        data = await self._redis.get(str(eventKey))
+        key = str(eventKey)
+        if self._cache is None:
+            data = await self._redis.get(key)
+        else:
+            found, data = self._cache.lookup(key)
+            if not found:
+                data = await self._redis.get(key)
+                self._cache.store(key, data)
         if data:
-            event = Event._fromDict(cbor2.loads(data))
+            event = self._codec.decode(data)
             return event
         return SystemEvent.invalidEvent(eventKey)
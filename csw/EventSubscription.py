@@ -1,15 +1,27 @@
 from asyncio import Task
 from typing import Callable, Awaitable
 
+from csw.EventQueue import EventQueue
+
 
 class EventSubscription:
     """
     Return value from EventSubscriber.subscribe(): Can be used to unsubscribe from an event.
     """
-    def __init__(self, t: Task, f: Callable[[], Awaitable]):
+    def __init__(self, t: Task | None, f: Callable[[], Awaitable], queue: EventQueue | None = None):
         self.t = t
         self.f = f
+        self.queue = queue
+
+    @property
+    def dropped(self) -> int:
+        """
+        The number of events that were dropped because the subscription's queue was full
+        (always 0 for subscriptions without a queue).
+        """
+        return self.queue.dropped if self.queue is not None else 0
 
     async def unsubscribe(self):
         await self.f()
-        self.t.cancel()
+        if self.t:
+            self.t.cancel()
@@ -0,0 +1,176 @@
+import asyncio
+import re
+from typing import List, Self
+
+from csw.PatternIndex import PatternIndex
+
+
+def _toBytes(value: str | bytes) -> bytes:
+    return value.encode() if isinstance(value, str) else value
+
+
+class InMemoryPubSub:
+    """
+    In-memory version of the redis.asyncio PubSub class (the subset used by RedisConnector).
+    Received messages have the same format as with Redis.
+    """
+
+    def __init__(self, server: 'InMemoryRedis'):
+        self._server = server
+        self._channels: set[bytes] = set()
+        self._patterns: dict[bytes, re.Pattern] = {}
+        self._messages: asyncio.Queue[dict] = asyncio.Queue()
+        server._pubsubs.append(self)
+
+    def _confirm(self, type: str, name: bytes):
+        self._messages.put_nowait({'type': type, 'pattern': None, 'channel': name,
+                                   'data': len(self._channels) + len(self._patterns)})
+
+    async def subscribe(self, *channels: str | bytes):
+        for channel in map(_toBytes, channels):
+            self._channels.add(channel)
+            self._confirm('subscribe', channel)
+
+    async def unsubscribe(self, *channels: str | bytes):
+        for channel in list(map(_toBytes, channels)) or list(self._channels):
+            self._channels.discard(channel)
+            self._confirm('unsubscribe', channel)
+
+    async def psubscribe(self, *patterns: str | bytes):
+        for pattern in map(_toBytes, patterns):
+            self._patterns[pattern] = PatternIndex.globToRegex(pattern.decode())
+            self._confirm('psubscribe', pattern)
+
+    async def punsubscribe(self, *patterns: str | bytes):
+        for pattern in list(map(_toBytes, patterns)) or list(self._patterns):
+            self._patterns.pop(pattern, None)
+            self._confirm('punsubscribe', pattern)
+
+    def _deliver(self, channel: bytes, data: bytes) -> int:
+        count = 0
+        if channel in self._channels:
+            self._messages.put_nowait({'type': 'message', 'pattern': None, 'channel': channel, 'data': data})
+            count += 1
+        if self._patterns:
+            name = channel.decode()
+            for pattern, regex in self._patterns.items():
+                if regex.fullmatch(name):
+                    self._messages.put_nowait({'type': 'pmessage', 'pattern': pattern, 'channel': channel, 'data': data})
+                    count += 1
+        return count
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float | None = 0.0) -> dict | None:
+        """
+        Returns the next message, or None if there is none within the timeout
+        (or if it is a subscribe confirmation and ignore_subscribe_messages is true, as with Redis).
+        """
+        try:
+            if timeout is None:
+                message = await self._messages.get()
+            elif timeout <= 0:
+                message = self._messages.get_nowait()
+            else:
+                message = await asyncio.wait_for(self._messages.get(), timeout)
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            return None
+        if ignore_subscribe_messages and message['type'] not in ('message', 'pmessage'):
+            return None
+        return message
+
+    async def aclose(self):
+        self._channels.clear()
+        self._patterns.clear()
+        if self in self._server._pubsubs:
+            self._server._pubsubs.remove(self)
+
+
+class InMemoryPipeline:
+    """
+    In-memory version of the redis.asyncio Pipeline class: Commands are queued and run by execute().
+    """
+
+    def __init__(self, server: 'InMemoryRedis'):
+        self._server = server
+        self._commands = []
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args):
+        self._commands.clear()
+
+    def set(self, key: str | bytes, value: str | bytes) -> Self:
+        self._commands.append((self._server._set, (key, value)))
+        return self
+
+    def get(self, key: str | bytes) -> Self:
+        self._commands.append((self._server._get, (key,)))
+        return self
+
+    def mget(self, keys: List[str | bytes]) -> Self:
+        self._commands.append((self._server._mget, (keys,)))
+        return self
+
+    def publish(self, channel: str | bytes, message: str | bytes) -> Self:
+        self._commands.append((self._server._publish, (channel, message)))
+        return self
+
+    async def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        return [command(*args) for command, args in commands]
+
+
+class InMemoryRedis:
+    """
+    An in-process replacement for the Redis client used by RedisConnector, with the same key/value and
+    publish/subscribe semantics (including glob-style pattern subscriptions), so that the Event Service
+    can be tested and benchmarked without running the CSW services.
+    All RedisConnectors that are created with the same InMemoryRedis instance share its keys and channels:
+
+        redis = InMemoryRedis()
+        publisher = EventPublisher(RedisConnector(client=redis))
+        subscriber = EventSubscriber(RedisConnector(client=redis))
+
+    Like redis-py (without decode_responses), keys and channels are returned as bytes.
+    """
+
+    def __init__(self):
+        self._data: dict[bytes, bytes] = {}
+        self._pubsubs: List[InMemoryPubSub] = []
+
+    def _set(self, key: str | bytes, value: str | bytes) -> bool:
+        self._data[_toBytes(key)] = _toBytes(value)
+        return True
+
+    def _get(self, key: str | bytes) -> bytes | None:
+        return self._data.get(_toBytes(key))
+
+    def _mget(self, keys: List[str | bytes]) -> List[bytes | None]:
+        return [self._data.get(_toBytes(key)) for key in keys]
+
+    def _publish(self, channel: str | bytes, message: str | bytes) -> int:
+        channel = _toBytes(channel)
+        message = _toBytes(message)
+        return sum(pubsub._deliver(channel, message) for pubsub in self._pubsubs)
+
+    async def set(self, key: str | bytes, value: str | bytes) -> bool:
+        return self._set(key, value)
+
+    async def get(self, key: str | bytes) -> bytes | None:
+        return self._get(key)
+
+    async def mget(self, keys: List[str | bytes]) -> List[bytes | None]:
+        return self._mget(keys)
+
+    async def publish(self, channel: str | bytes, message: str | bytes) -> int:
+        return self._publish(channel, message)
+
+    def pipeline(self, transaction: bool = True) -> InMemoryPipeline:
+        return InMemoryPipeline(self)
+
+    def pubsub(self) -> InMemoryPubSub:
+        return InMemoryPubSub(self)
+
+    async def aclose(self):
+        # The keys are kept, since other RedisConnectors might share this instance (like a Redis server)
+        pass
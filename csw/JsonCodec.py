@@ -0,0 +1,71 @@
+import json
+
+from aiohttp import ClientResponse, ClientSession
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# HTTP headers for a request with a JSON body
+jsonHeaders = {'Content-type': 'application/json'}
+
+
+class JsonCodec:
+    """
+    Encodes and decodes the JSON messages sent to and received from the CSW HTTP services
+    (Location Service, Command Service, Sequencers).
+
+    Each request body is serialized once, directly to the bytes that are sent (rather than converting the dict to a
+    JSON string and back, and then letting aiohttp serialize it again), and each response is decoded from its bytes.
+    If the orjson package is installed, it is used for both, since it is several times faster than the json module.
+    """
+
+    @staticmethod
+    def encode(obj) -> bytes:
+        """
+        Returns the UTF-8 encoded JSON for the given object (made of dicts, lists, str, int, float, bool and None)
+        """
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+    @staticmethod
+    def decode(data: bytes | str):
+        """
+        Returns the object for the given JSON
+        """
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    @staticmethod
+    async def post(session: ClientSession, url: str, obj) -> ClientResponse:
+        """
+        Posts the given object, encoded as JSON, to the given URL
+
+        Args:
+            session (ClientSession): the HTTP session to use
+            url (str): the URL to post to
+            obj: the object to send (see encode())
+        """
+        return await JsonCodec.postEncoded(session, url, JsonCodec.encode(obj))
+
+    @staticmethod
+    async def postEncoded(session: ClientSession, url: str, data: bytes | str) -> ClientResponse:
+        """
+        Posts the given JSON, which is already encoded (for example, with dataclasses_json's to_json()), to the given URL
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        return await session.post(url, headers=jsonHeaders, data=data)
+
+    @staticmethod
+    async def readResponse(response: ClientResponse):
+        """
+        Returns the object for the JSON body of the given response (None if the body is empty, as for response.json())
+        """
+        data = await response.read()
+        if not data.strip():
+            return None
+        return JsonCodec.decode(data)
@@ -7,7 +7,7 @@ from aiohttp import ClientSession
 from dataclasses_json import dataclass_json
 from enum import Enum
 from multipledispatch import dispatch
-import json
+from csw.JsonCodec import JsonCodec
 from csw.Prefix import Prefix
 
 
@@ -206,13 +206,12 @@ class LocationService:
             an object describing the connection
         """
         # noinspection PyUnresolvedReferences
-        regJson = json.loads(registration.to_json())
+        regJson = registration.to_dict(encode_json=True)
         regJson['_type'] = registration.__class__.__name__
-        jsonBody = f'{{"_type": "Register", "registration": {json.dumps(regJson)}}}'
-        r = await self._session.post(self.postUri, json=json.loads(jsonBody))
+        r = await JsonCodec.post(self._session, self.postUri, {"_type": "Register", "registration": regJson})
         if not r.ok:
             raise Exception(r.text)
-        maybeResult = json.loads(await r.text())
+        maybeResult = await JsonCodec.readResponse(r)
         if len(maybeResult) != 0:
             location = Location._makeLocation(maybeResult)
             return RegistrationResult.make(location, self.unregister)
@@ -227,15 +226,15 @@ class LocationService:
         self.log.debug(f"Unregistering connection {connection} from the Location Service.")
         # noinspection PyUnresolvedReferences
         jsonBody = f'{{"_type": "Unregister", "connection": {connection.to_json()}}}'
-        r = await self._session.post(self.postUri, json=json.loads(jsonBody))
+        r = await JsonCodec.postEncoded(self._session, self.postUri, jsonBody)
         if not r.ok:
             raise Exception(await r.text())
 
     async def _postJson(self, jsonBody: str) -> Location:
-        r = await self._session.post(self.postUri, json=json.loads(jsonBody))
+        r = await JsonCodec.postEncoded(self._session, self.postUri, jsonBody)
         if not r.ok:
             raise Exception(r.text)
-        maybeResult = json.loads(await r.text())
+        maybeResult = await JsonCodec.readResponse(r)
         if len(maybeResult) != 0:
             return Location._makeLocation(maybeResult[0])
 
@@ -270,10 +269,10 @@ class LocationService:
         return await self._postJson(resolveInfo.to_json())
 
     async def _list(self, jsonBody: str) -> List[Location]:
-        r = await self._session.post(LocationService.postUri, json=json.loads(jsonBody))
+        r = await JsonCodec.postEncoded(self._session, LocationService.postUri, jsonBody)
         if not r.ok:
             raise Exception(r.text)
-        return list(map(lambda x: Location._makeLocation(x), json.loads(await r.text())))
+        return list(map(lambda x: Location._makeLocation(x), await JsonCodec.readResponse(r)))
 
     @dispatch()
     async def list(self) -> List[Location]:
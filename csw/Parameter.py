@@ -1,6 +1,9 @@
 # noinspection PyUnresolvedReferences
 from dataclasses import dataclass, field
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Callable
+
+import cbor2
+import numpy as np
 
 from csw.KeyTypes import KeyTypes
 from csw.TMTTime import TAITime
@@ -9,12 +12,111 @@ from csw.Units import Units
 from csw.Coords import *
 
 coordTypes = {KeyTypes.CoordKey, KeyTypes.EqCoordKey, KeyTypes.SolarSystemCoordKey, KeyTypes.MinorPlanetCoordKey,
-              KeyTypes.CometCoordKey}
+              KeyTypes.CometCoordKey, KeyTypes.AltAzCoordKey}
 timeKeyTypes = {KeyTypes.TAITimeKey, KeyTypes.UTCTimeKey}
 
+# Numeric array and matrix key types whose values can be stored in a numpy ndarray
+arrayKeyTypes = {KeyTypes.ShortArrayKey, KeyTypes.LongArrayKey, KeyTypes.IntArrayKey, KeyTypes.FloatArrayKey,
+                 KeyTypes.DoubleArrayKey}
+matrixKeyTypes = {KeyTypes.ShortMatrixKey, KeyTypes.LongMatrixKey, KeyTypes.IntMatrixKey, KeyTypes.FloatMatrixKey,
+                  KeyTypes.DoubleMatrixKey}
+
 T = TypeVar('T')
 
 
+def _cborHeader(major: int, n: int) -> bytes:
+    """
+    Returns the CBOR header for the given major type (already shifted, for example 0x80 for arrays) and length.
+    """
+    if n < 24:
+        return bytes([major | n])
+    if n < 0x100:
+        return bytes([major | 24, n])
+    if n < 0x10000:
+        return bytes([major | 25]) + n.to_bytes(2, 'big')
+    if n < 0x100000000:
+        return bytes([major | 26]) + n.to_bytes(4, 'big')
+    return bytes([major | 27]) + n.to_bytes(8, 'big')
+
+
+def _cborItems(a: np.ndarray) -> np.ndarray:
+    """
+    Returns a structured array with the same shape as the given numeric array, where each item holds the
+    CBOR encoding of the corresponding element (initial byte followed by the big-endian value).
+    Floats keep their precision (float32 or float64), integers all use the same width, chosen so that
+    the largest magnitude in the array fits (CBOR decoders accept integers that are not minimally encoded).
+    """
+    if a.dtype.kind == 'f':
+        if a.dtype.itemsize <= 4:
+            items = np.empty(a.shape, dtype=[('h', 'u1'), ('v', '>f4')])
+            items['h'] = 0xfa
+        else:
+            items = np.empty(a.shape, dtype=[('h', 'u1'), ('v', '>f8')])
+            items['h'] = 0xfb
+        items['v'] = a
+        return items
+    if a.dtype.kind == 'i':
+        neg = a < 0
+        # CBOR encodes a negative integer n as -1 - n (major type 1)
+        mag = np.where(neg, ~a, a)
+    else:
+        neg = False
+        mag = a
+    m = int(mag.max())
+    width, info = next((w, i) for w, i in ((1, 24), (2, 25), (4, 26), (8, 27)) if m < 1 << (8 * w))
+    items = np.empty(a.shape, dtype=[('h', 'u1'), ('v', f'>u{width}')])
+    items['h'] = np.where(neg, 0x20 | info, info)
+    items['v'] = mag
+    return items
+
+
+def _ndarrayToCbor(a: np.ndarray) -> bytes:
+    """
+    Returns the CBOR encoding of the given numeric array as nested CBOR arrays (the same encoding that would
+    be produced for a.tolist()), without creating a Python object for each element.
+    """
+    if a.ndim == 0 or a.size == 0 or a.dtype.kind not in 'iuf':
+        return cbor2.dumps(a.tolist())
+    # Each step prepends the array header to the rows of the innermost remaining dimension
+    # and then merges them into the rows of the next dimension.
+    rows = _cborItems(np.ascontiguousarray(a)).view(np.uint8)
+    for n in reversed(a.shape):
+        hdr = np.frombuffer(_cborHeader(0x80, n), dtype=np.uint8)
+        rows = np.concatenate([np.broadcast_to(hdr, rows.shape[:-1] + hdr.shape), rows], axis=-1)
+        if rows.ndim > 1:
+            rows = rows.reshape(rows.shape[:-2] + (-1,))
+    return rows.tobytes()
+
+
+def _cborDefault(encoder: cbor2.CBOREncoder, value):
+    """
+    Default hook for cbor2.dumps() that handles numpy arrays in parameter values.
+    """
+    if isinstance(value, np.ndarray):
+        encoder.write(_ndarrayToCbor(value))
+    elif isinstance(value, np.generic):
+        encoder.encode(value.item())
+    else:
+        raise cbor2.CBOREncodeError(f"cannot serialize type {value.__class__.__name__}")
+
+
+def _valuesEqual(a, b) -> bool:
+    """
+    Compares the values of two parameters, which can be lists, ndarrays or lists of ndarrays (of different shapes).
+    """
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        try:
+            return np.array_equal(a, b)
+        except ValueError:
+            # A list of ndarrays with different shapes can't be converted to an ndarray, so it is not equal to one
+            return False
+    if len(a) != len(b):
+        return False
+    if any(isinstance(v, np.ndarray) for v in a) or any(isinstance(v, np.ndarray) for v in b):
+        return all(np.array_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
 @dataclass
 class KeyType(Generic[T]):
     pass
@@ -32,70 +134,29 @@ class Parameter(Generic[T]):
             keyName (str): name of the key
             keyType (KeyTypes): type of the key
             values (List[T]): an array of values, or a nested array for array and matrix types.
+                              For the numeric array and matrix types this can also be a numpy ndarray,
+                              where the first axis indexes the values (or a list of ndarrays).
             units (Units): units of the values.
         """
     keyName: str
     keyType: KeyTypes
-    values: List[T]
+    values: List[T] | np.ndarray
     units: Units = field(default_factory=lambda: Units.NoUnits)
 
-    @staticmethod
-    def _paramValueOrDict(keyType: KeyTypes, param: T, forEvent: bool):
-        """
-        Internal method that also handles coord and time types
-
-        Args:
-            keyType (KeyTypes): parameter's key type
-            param (T): parameter value
-            forEvent (bool): needed since time values are encoded differently in CBOR and JSON
-
-        Returns:
-            param value
-        """
-        # keyTypes = coordTypes.union(timeKeyTypes) if forEvent else coordTypes
-        if keyType in coordTypes:
-            return param._asDict()
-        if keyType in timeKeyTypes:
-            if forEvent:
-                return param._asDict()
-            return str(param)
-        return param
-
-    @staticmethod
-    def _paramValueFromDict(keyType: KeyTypes, obj: T, forEvent: bool) -> T:
-        """
-        Internal recursive method that also handles Coord types
-
-        Args:
-
-            keyType (KeyTypes): parameter's key type
-            obj: T
-            forEvent (bool): needed since time values are encoded differently in CBOR and JSON
-
-        Returns: object
-            param value
-        """
-        if keyType in coordTypes:
-            return Coord._fromDict(obj)
-        elif not forEvent and keyType in timeKeyTypes:
-            if keyType == KeyTypes.UTCTimeKey:
-                return UTCTime.from_str(obj)
-            else:
-                return TAITime.from_str(obj)
-        else:
-            return obj
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.keyName, self.keyType, self.units) == (other.keyName, other.keyType, other.units) and \
+            _valuesEqual(self.values, other.values)
 
     # noinspection PyTypeChecker
     # forEvent flag is needed since time and byte values are encoded differently in CBOR and JSON
     def _asDict(self, forEvent: bool = False):
-        # Note that bytes are stored in a byte string (b'...') instead of a list or array.
-        if forEvent and self.keyType == KeyTypes.ByteKey:
-            values = bytes(self.values)
-        else:
-            values = list(map(lambda p: Parameter._paramValueOrDict(self.keyType, p, forEvent), self.values))
-
+        keyTypeName = self.keyType.name
+        codec = _paramCodecs[keyTypeName]
+        values = codec.toCbor(self.values) if forEvent else codec.toJson(self.values)
         return {
-            self.keyType.name: {
+            keyTypeName: {
                 'keyName': self.keyName,
                 'values': values,
                 'units': self.units.name
@@ -108,15 +169,90 @@ class Parameter(Generic[T]):
         """
         Returns a Parameter for the given dict.
         """
-        k = next(iter(obj))
-        keyType = KeyTypes[k]
-        obj = obj[k]
+        [(k, obj)] = obj.items()
+        keyType = _keyTypesByName[k]
+        codec = _paramCodecs[k]
+        values = codec.fromCbor(obj['values']) if forEvent else codec.fromJson(obj['values'])
+        return Parameter(obj['keyName'], keyType, values, _unitsByName[obj['units']])
 
-        if forEvent and keyType == KeyTypes.ByteKey:
-            values = list(obj['values'])
-        else:
-            values = list(map(lambda p: Parameter._paramValueFromDict(keyType, p, forEvent), obj['values']))
-        return Parameter(obj['keyName'], keyType, values, Units[obj['units']])
+
+@dataclass(frozen=True)
+class _ParamCodec:
+    """
+    Converts the list of values of a parameter with a given key type to and from the form used in
+    CBOR (events) and JSON (commands). The functions are chosen once per key type (see _paramCodecs),
+    so that encoding and decoding a parameter does not need to check the key type for each value.
+    """
+    toCbor: Callable[[List], any]
+    fromCbor: Callable[[List], List]
+    toJson: Callable[[List], any]
+    fromJson: Callable[[List], List]
+
+
+def _identity(values):
+    return values
+
+
+def _valuesToJson(values):
+    return values.tolist() if isinstance(values, np.ndarray) else values
+
+
+def _arrayValuesToJson(values):
+    if isinstance(values, np.ndarray):
+        return values.tolist()
+    return [v.tolist() if isinstance(v, np.ndarray) else v for v in values]
+
+
+def _toDicts(values):
+    return [v._asDict() for v in values]
+
+
+def _coordCodec(fromValueDict: Callable[[dict], Coord]) -> _ParamCodec:
+    def fromDicts(values):
+        return [fromValueDict(v) for v in values]
+
+    return _ParamCodec(_toDicts, fromDicts, _toDicts, fromDicts)
+
+
+def _timeCodec(timeClass: type[UTCTime] | type[TAITime]) -> _ParamCodec:
+    # Times are encoded as {seconds, nanos} in CBOR and as ISO strings in JSON
+    def fromDicts(values):
+        return [timeClass._fromDict(v) for v in values]
+
+    def toStrings(values):
+        return [str(v) for v in values]
+
+    def fromStrings(values):
+        return [timeClass.from_str(v) for v in values]
+
+    return _ParamCodec(_toDicts, fromDicts, toStrings, fromStrings)
+
+
+def _makeParamCodecs() -> dict[str, _ParamCodec]:
+    primitiveCodec = _ParamCodec(_identity, _identity, _valuesToJson, _identity)
+    arrayCodec = _ParamCodec(_identity, _identity, _arrayValuesToJson, _identity)
+    codecs = {keyType: primitiveCodec for keyType in KeyTypes}
+    codecs.update({keyType: arrayCodec for keyType in arrayKeyTypes | matrixKeyTypes})
+    # Note that bytes are stored in a byte string (b'...') instead of a list or array in CBOR.
+    codecs[KeyTypes.ByteKey] = _ParamCodec(bytes, list, _valuesToJson, _identity)
+    codecs[KeyTypes.CoordKey] = _coordCodec(Coord._fromDict)
+    codecs[KeyTypes.EqCoordKey] = _coordCodec(EqCoord._fromValueDict)
+    codecs[KeyTypes.SolarSystemCoordKey] = _coordCodec(SolarSystemCoord._fromValueDict)
+    codecs[KeyTypes.MinorPlanetCoordKey] = _coordCodec(MinorPlanetCoord._fromValueDict)
+    codecs[KeyTypes.CometCoordKey] = _coordCodec(CometCoord._fromValueDict)
+    codecs[KeyTypes.AltAzCoordKey] = _coordCodec(AltAzCoord._fromValueDict)
+    codecs[KeyTypes.UTCTimeKey] = _timeCodec(UTCTime)
+    codecs[KeyTypes.TAITimeKey] = _timeCodec(TAITime)
+    # Keyed by name, since hashing a str is cheaper than hashing an Enum member
+    return {keyType.name: codec for keyType, codec in codecs.items()}
+
+
+# Maps the KeyTypes name to the codec for that key type
+_paramCodecs = _makeParamCodecs()
+
+# Used instead of KeyTypes[name] and Units[name] when decoding, since plain dict lookups are faster
+_keyTypesByName: dict[str, KeyTypes] = dict(KeyTypes.__members__)
+_unitsByName: dict[str, Units] = dict(Units.__members__)
 
 
 # noinspection PyUnresolvedReferences
@@ -135,9 +271,23 @@ class Key(Generic[T]):
     keyType: KeyTypes
     units: Units
 
+    def _valueDims(self) -> int:
+        """
+        Returns the number of dimensions of a single value of this key if it can be stored in a numpy ndarray,
+        otherwise 0.
+        """
+        if self.keyType in arrayKeyTypes:
+            return 1
+        if self.keyType in matrixKeyTypes:
+            return 2
+        return 0
+
     def set(self, *values: T) -> Parameter[T]:
         """
-        Set values for this key using variable number of arguments
+        Set values for this key using variable number of arguments.
+        For the numeric array and matrix key types, the values may also be numpy arrays.
+        If they all have the same shape, they are stacked into a single ndarray.
+
         Args:
             *values: an Array of values
 
@@ -145,18 +295,31 @@ class Key(Generic[T]):
             an instance of Parameter[T] containing the key name and values
 
         """
+        dims = self._valueDims()
+        if dims and values and all(isinstance(v, np.ndarray) for v in values):
+            assert all(v.ndim == dims for v in values), \
+                f"Values for key: {self.keyName} must be {dims} dimensional arrays"
+            if all(v.shape == values[0].shape for v in values):
+                return Parameter(self.keyName, self.keyType, np.stack(values), self.units)
         return Parameter(self.keyName, self.keyType, [*values], self.units)
 
-    def setAll(self, values: List[T]) -> Parameter[T]:
+    def setAll(self, values: List[T] | np.ndarray) -> Parameter[T]:
         """
-        Set values for this key using a list
+        Set values for this key using a list.
+        For the numeric array and matrix key types, this can also be a numpy ndarray, where the first axis
+        indexes the values (for example an array of shape (n, rows, cols) for n matrix values).
+
         Args:
-            *values: an Array of values
+            values: an Array of values
 
         Returns:
             an instance of Parameter[T] containing the key name and values
 
         """
+        if isinstance(values, np.ndarray):
+            dims = self._valueDims()
+            assert values.ndim == dims + 1, \
+                f"An ndarray of values for key: {self.keyName} must have {dims + 1} dimension(s)"
         return Parameter(self.keyName, self.keyType, values, self.units)
 
 
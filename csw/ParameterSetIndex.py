@@ -0,0 +1,85 @@
+from typing import List, Iterable
+
+from csw.Parameter import Parameter, Key
+
+
+class ParamSet(list):
+    """
+    The list of parameters of an Event, CurrentState or SequenceCommand.
+
+    This is a list that also keeps an index from keyName to the position of the first parameter with that name
+    (As with a linear search, the first parameter with a given name is the one that is found).
+    The index is built on first use and discarded by every method that modifies the list,
+    so that it is rebuilt the next time a parameter is looked up.
+    """
+
+    # Maps keyName to the index of the parameter in this list (None until built, or after the list was modified)
+    _index: dict[str, int] | None = None
+
+    def __init__(self, params: Iterable[Parameter] = ()):
+        super().__init__(params)
+
+    def find(self, keyName: str) -> Parameter | None:
+        """
+        Returns the first parameter with the given name, or None if not found.
+        """
+        index = self._index
+        if index is None:
+            index = {}
+            for i, p in enumerate(self):
+                index.setdefault(p.keyName, i)
+            self._index = index
+        i = index.get(keyName)
+        return None if i is None else self[i]
+
+
+def _invalidatingIndex(name: str):
+    method = getattr(list, name)
+
+    def f(self, *args, **kwargs):
+        self._index = None
+        return method(self, *args, **kwargs)
+
+    f.__name__ = name
+    f.__doc__ = method.__doc__
+    return f
+
+
+for _name in ('append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(ParamSet, _name, _invalidatingIndex(_name))
+
+
+class ParameterSetIndex:
+    """
+    Mixin for the classes that contain a paramSet (Event, CurrentState, SequenceCommand), used to
+    look up parameters by name in constant time.
+
+    The paramSet passed to the constructor is copied to a ParamSet, which keeps the index from keyName to parameter
+    and discards it whenever the paramSet is modified in place (so later changes to the original list are not seen).
+    A plain list that is assigned to paramSet later is used as is (and searched linearly).
+    """
+
+    def __post_init__(self):
+        self.paramSet = ParamSet(self.paramSet)
+
+    def _findParam(self, keyName: str) -> Parameter | None:
+        """
+        Returns the first parameter in the paramSet with the given name, or None if not found.
+        """
+        paramSet = self.paramSet
+        if isinstance(paramSet, ParamSet):
+            return paramSet.find(keyName)
+        return next((p for p in paramSet if p.keyName == keyName), None)
+
+    def getMany(self, keys: List[str | Key]) -> List[Parameter | None]:
+        """
+        Gets the parameters for the given key names or keys.
+
+        Args:
+            keys (List[str | Key]): list of parameter names or keys
+
+        Returns: List[Parameter | None]
+            list containing the parameter for each key, or None if not found
+        """
+        return [self._findParam(k if isinstance(k, str) else k.keyName) for k in keys]
@@ -3,6 +3,7 @@ from typing import List, TypeVar
 
 from csw.ObsId import ObsId
 from csw.Parameter import Parameter, KeyType, Key
+from csw.ParameterSetIndex import ParameterSetIndex
 from csw.Prefix import Prefix
 
 T = TypeVar('T')
@@ -17,7 +18,7 @@ class CommandName:
 
 
 @dataclass
-class SequenceCommand:
+class SequenceCommand(ParameterSetIndex):
     """
     Represents a CSW command.
     """
@@ -36,7 +37,7 @@ class SequenceCommand:
         source = Prefix.from_str(obj['source'])
         commandName = CommandName(obj['commandName'])
         maybeObsId = ObsId.make(obj['maybeObsId']) if 'maybeObsId' in obj else None
-        paramSet = list(map(lambda p: Parameter._fromDict(p), obj['paramSet']))
+        paramSet = [Parameter._fromDict(p) for p in obj['paramSet']]
         assert (typ in {"Setup", "Observe", "Wait"})
         match typ:
             case 'Setup':
@@ -58,7 +59,7 @@ class SequenceCommand:
             '_type': self.__class__.__name__,
             'source': str(self.source),
             'commandName': self.commandName.name,
-            'paramSet': list(map(lambda p: p._asDict(), self.paramSet))
+            'paramSet': [p._asDict() for p in self.paramSet]
         }
         if self.maybeObsId:
             d['maybeObsId'] = str(self.maybeObsId)
@@ -77,9 +78,7 @@ class SequenceCommand:
         Returns: Parameter[T] | None
             the parameter, if found
         """
-        for p in self.paramSet:
-            if p.keyName == keyName:
-                return p
+        return self._findParam(keyName)
 
     def gets(self, keyName: str) -> Parameter | None:
         """
@@ -91,9 +90,7 @@ class SequenceCommand:
         Returns: Parameter | None
             the parameter, if found
         """
-        for p in self.paramSet:
-            if p.keyName == keyName:
-                return p
+        return self._findParam(keyName)
 
     def __call__(self, key: Key[T]) -> Parameter[T] | None:
         """
@@ -105,9 +102,7 @@ class SequenceCommand:
         Returns: Parameter[T] | None
             the parameter, if found
         """
-        for p in self.paramSet:
-            if p.keyName == key.keyName:
-                return p
+        return self._findParam(key.keyName)
 
     def exists(self, keyName: str) -> bool:
         """
@@ -119,10 +114,7 @@ class SequenceCommand:
         Returns: bool
             true if the parameter is found
         """
-        for p in self.paramSet:
-            if p.keyName == keyName:
-                return True
-        return False
+        return self._findParam(keyName) is not None
 
 
 @dataclass
@@ -0,0 +1,160 @@
+import re
+from typing import Callable, List
+
+
+class PatternIndex:
+    """
+    Client side index of glob-style event key patterns, used for pattern subscriptions
+    (See EventSubscriber.pSubscribe()).
+
+    Since each pattern subscription in Redis adds to the cost of every publish in the Event Service,
+    only one broad pattern per subsystem is subscribed in Redis (for example "TCS.*" for "TCS.mcs.*pos*"),
+    and the received events are matched against the actual patterns here.
+    The patterns are compiled to regular expressions, and the list of callbacks for each
+    received event key (Redis channel) is cached until the patterns change.
+    """
+
+    # Limit for the number of cached channels (the cache is cleared when it is reached)
+    maxCachedChannels = 10000
+
+    def __init__(self):
+        # Maps each pattern to its compiled regular expression and its callbacks
+        self._patterns: dict[str, tuple[re.Pattern, List[Callable]]] = {}
+        # Maps each Redis pattern to the patterns it covers (dict used as an ordered set)
+        self._serverPatterns: dict[str, dict[str, None]] = {}
+        # Cache of the callbacks for each (Redis pattern, channel)
+        self._channelCallbacks: dict[tuple[str, str], List[Callable]] = {}
+
+    @staticmethod
+    def serverPattern(pattern: str) -> str:
+        """
+        Returns the broad pattern to subscribe to in Redis for the given pattern:
+        The subsystem followed by ".*", or "*" if the subsystem part of the pattern contains glob characters.
+        """
+        subsystem, sep, _ = pattern.partition('.')
+        if any(c in subsystem for c in '*?[\\'):
+            return '*'
+        return f"{subsystem}.*" if sep else pattern
+
+    @staticmethod
+    def globToRegex(pattern: str) -> re.Pattern:
+        """
+        Compiles the given glob-style pattern, with the same syntax as Redis PSUBSCRIBE:
+        h?llo matches hello, hallo and hxllo, h*llo matches hllo and heeeello,
+        h[ae]llo matches hello and hallo, but not hillo, h[^e]llo matches hallo but not hello,
+        and special characters can be escaped with a backslash.
+        """
+        i, n = 0, len(pattern)
+        regex = []
+        while i < n:
+            c = pattern[i]
+            i += 1
+            if c == '*':
+                regex.append('.*')
+            elif c == '?':
+                regex.append('.')
+            elif c == '\\' and i < n:
+                regex.append(re.escape(pattern[i]))
+                i += 1
+            elif c == '[':
+                # Character class (as in Redis, an unterminated class ends at the end of the pattern)
+                negate = i < n and pattern[i] == '^'
+                if negate:
+                    i += 1
+                chars = []
+                while i < n and pattern[i] != ']':
+                    if pattern[i] == '\\' and i + 1 < n:
+                        i += 1
+                        chars.append(re.escape(pattern[i]))
+                    elif pattern[i] == '-':
+                        chars.append('-')
+                    else:
+                        chars.append(re.escape(pattern[i]))
+                    i += 1
+                i += 1
+                if chars:
+                    regex.append(f"[{'^' if negate else ''}{''.join(chars)}]")
+                else:
+                    regex.append('.' if negate else '(?!)')
+            else:
+                regex.append(re.escape(c))
+        return re.compile(''.join(regex), re.DOTALL)
+
+    def add(self, pattern: str, callback: Callable) -> str | None:
+        """
+        Adds a callback for the given pattern.
+
+        Returns:
+            the Redis pattern to subscribe to, if it is not already subscribed, otherwise None
+        """
+        entry = self._patterns.get(pattern)
+        if entry is None:
+            entry = self._patterns[pattern] = (self.globToRegex(pattern), [])
+        entry[1].append(callback)
+        self._channelCallbacks.clear()
+        serverPattern = self.serverPattern(pattern)
+        patterns = self._serverPatterns.get(serverPattern)
+        if patterns is None:
+            self._serverPatterns[serverPattern] = {pattern: None}
+            return serverPattern
+        patterns[pattern] = None
+        return None
+
+    def remove(self, pattern: str, callback: Callable | None = None) -> str | None:
+        """
+        Removes the given callback (or all callbacks, if None) for the given pattern.
+
+        Returns:
+            the Redis pattern to unsubscribe from, if it is no longer needed, otherwise None
+        """
+        entry = self._patterns.get(pattern)
+        if entry is None:
+            return None
+        callbacks = entry[1]
+        if callback is None:
+            callbacks.clear()
+        elif callback in callbacks:
+            callbacks.remove(callback)
+        self._channelCallbacks.clear()
+        if callbacks:
+            return None
+        del self._patterns[pattern]
+        serverPattern = self.serverPattern(pattern)
+        patterns = self._serverPatterns[serverPattern]
+        del patterns[pattern]
+        if patterns:
+            return None
+        del self._serverPatterns[serverPattern]
+        return serverPattern
+
+    def patterns(self) -> List[str]:
+        """
+        Returns the list of patterns that have callbacks
+        """
+        return list(self._patterns.keys())
+
+    def serverPatterns(self) -> List[str]:
+        """
+        Returns the list of Redis patterns that need to be subscribed
+        """
+        return list(self._serverPatterns.keys())
+
+    def callbacks(self, serverPattern: str, channel: str) -> List[Callable]:
+        """
+        Returns the callbacks for the patterns that match the given channel (event key),
+        out of the ones covered by the given Redis pattern.
+        Since Redis sends a separate message for each matching Redis pattern (for example for both "*" and "TCS.*"),
+        this ensures that the callbacks for each pattern are only called once per event.
+        """
+        cacheKey = (serverPattern, channel)
+        callbacks = self._channelCallbacks.get(cacheKey)
+        if callbacks is None:
+            callbacks = []
+            for pattern in self._serverPatterns.get(serverPattern, {}):
+                regex, patternCallbacks = self._patterns[pattern]
+                if regex.fullmatch(channel):
+                    callbacks.extend(patternCallbacks)
+            if len(self._channelCallbacks) >= self.maxCachedChannels:
+                self._channelCallbacks.clear()
+            self._channelCallbacks[cacheKey] = callbacks
+        return callbacks
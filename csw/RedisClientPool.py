@@ -0,0 +1,136 @@
+import asyncio
+import weakref
+from asyncio import AbstractEventLoop
+from urllib.parse import urlparse
+
+from aiohttp import ClientSession
+from redis.asyncio import Redis
+from redis.asyncio.sentinel import Sentinel
+
+from csw.LocationService import ConnectionInfo, ComponentType, ConnectionType, Location, LocationService
+from csw.LocationServiceSync import LocationServiceSync
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+
+class RedisClientPool:
+    """
+    Process wide pool of Redis clients for the Event Service, used by RedisConnector.
+
+    All RedisConnectors (and so all EventPublishers and EventSubscribers) for the same Event Server location
+    share one Redis client, whose connection pool is used for the commands (SET, GET, PUBLISH, ...),
+    so creating many publishers does not open many sockets. Each subscriber still uses one connection
+    from the pool for its pubsub subscriptions.
+    A client is closed when the last RedisConnector using it is closed.
+    Since a redis.asyncio client can only be used from the event loop it was first used in, the clients are
+    shared per event loop: A RedisConnector acquires its client when it is first used in an event loop
+    (and acquires another one if it is later used in another event loop, for example in another asyncio.run()).
+    The event loops are only referenced weakly, and the clients for closed event loops are dropped.
+
+    The Event Server location is also cached, so that only the first RedisConnector.make() needs to look it up.
+    The cached location is discarded when the connection to the Event Server is lost (See RedisConnector).
+    """
+
+    # Maximum number of connections for each client (None for no limit).
+    # Note that each subscriber (pubsub) also uses a connection from the pool.
+    maxConnections: int | None = None
+
+    # Seconds after which an idle connection is checked (with PING) before it is used again
+    healthCheckInterval: float = 30
+
+    # Maps each event loop and Event Server URI to the Redis client and the number of RedisConnectors using it
+    _clients: weakref.WeakKeyDictionary[AbstractEventLoop, dict[str, tuple[Redis, int]]] = weakref.WeakKeyDictionary()
+
+    # Cached Event Server location
+    _location: Location | None = None
+
+    @classmethod
+    def eventServerConnection(cls) -> ConnectionInfo:
+        prefix = Prefix(Subsystem.CSW, "EventServer")
+        return ConnectionInfo.make(prefix, ComponentType.Service, ConnectionType.TcpType)
+
+    @classmethod
+    def eventServerLocation(cls) -> Location:
+        """
+        Returns the Event Server location, which is looked up in the Location Service the first time
+        """
+        if cls._location is None:
+            cls._location = LocationServiceSync().find(cls.eventServerConnection())
+        return cls._location
+
+    @classmethod
+    async def eventServerLocationAsync(cls, clientSession: ClientSession | None = None) -> Location:
+        """
+        Returns the Event Server location, which is looked up (without blocking) in the Location Service the first time
+
+        Args:
+            clientSession: the HTTP session to use for the lookup (a temporary one is used if not given)
+        """
+        if cls._location is None:
+            if clientSession is not None:
+                location = await LocationService(clientSession).find(cls.eventServerConnection())
+            else:
+                async with ClientSession() as session:
+                    location = await LocationService(session).find(cls.eventServerConnection())
+            cls._location = location
+        return cls._location
+
+    @classmethod
+    def invalidateLocation(cls):
+        """
+        Forgets the cached Event Server location, so that it is looked up again the next time it is needed
+        (for example, after the Event Server was restarted)
+        """
+        cls._location = None
+
+    @classmethod
+    def _makeClient(cls, loc: Location) -> Redis:
+        uri = urlparse(loc.uri)
+        sentinel = Sentinel([(uri.hostname, uri.port)])
+        return sentinel.master_for('eventServer',
+                                   max_connections=cls.maxConnections,
+                                   health_check_interval=cls.healthCheckInterval)
+
+    @classmethod
+    def acquire(cls, loc: Location, loop: AbstractEventLoop) -> Redis:
+        """
+        Returns the shared Redis client for the given Event Server location and event loop (creating it, if needed).
+        Each call must be matched by a call to release() or discard().
+        """
+        for closedLoop in [l for l in cls._clients.keys() if l.is_closed()]:
+            del cls._clients[closedLoop]
+        clients = cls._clients.setdefault(loop, {})
+        client, count = clients.get(loc.uri, (None, 0))
+        if client is None:
+            client = cls._makeClient(loc)
+        clients[loc.uri] = (client, count + 1)
+        return client
+
+    @classmethod
+    def discard(cls, client: Redis) -> bool:
+        """
+        Releases a client returned by acquire() without closing it (for example, when its event loop was closed).
+
+        Returns:
+            true if the client is no longer used (and should be closed, if its event loop is still running)
+        """
+        for loop, clients in list(cls._clients.items()):
+            for uri, (c, count) in clients.items():
+                if c is client:
+                    if count > 1:
+                        clients[uri] = (client, count - 1)
+                        return False
+                    del clients[uri]
+                    if not clients:
+                        del cls._clients[loop]
+                    return True
+        return False
+
+    @classmethod
+    async def release(cls, client: Redis):
+        """
+        Releases a client returned by acquire(), which is closed if it is no longer used
+        (Must be called in the event loop that the client was acquired for)
+        """
+        if cls.discard(client):
+            await client.aclose()
@@ -1,107 +1,370 @@
 import asyncio
+import time
+import weakref
 from asyncio import Task
-from urllib.parse import urlparse
+from dataclasses import dataclass
+from typing import List, Self, Awaitable, Callable, Tuple
 
-from typing import List, Self, Awaitable, Callable
+import structlog
+from aiohttp import ClientSession
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 
-from redis.asyncio.sentinel import Sentinel
+from csw.LocationService import Location
+from csw.PatternIndex import PatternIndex
+from csw.RedisClientPool import RedisClientPool
+
+
+@dataclass
+class ReconnectMetrics:
+    """
+    Statistics for the reconnections of a RedisConnector's subscriptions after the connection to Redis was lost
+    (for example after a sentinel failover). The durations are in seconds.
+    """
+    count: int = 0
+    lastDuration: float = 0.0
+    maxDuration: float = 0.0
+    totalDuration: float = 0.0
+    lastError: str | None = None
+
+    def record(self, duration: float, error: Exception):
+        self.count += 1
+        self.lastDuration = duration
+        self.maxDuration = max(self.maxDuration, duration)
+        self.totalDuration += duration
+        self.lastError = str(error)
 
-from csw.LocationService import ConnectionInfo, ComponentType, ConnectionType, Location
-from csw.LocationServiceSync import LocationServiceSync
-from csw.Prefix import Prefix
-from csw.Subsystem import Subsystem
 
 # XXX TODO FIXME: Use redis.asyncio?
 # See https://redis-py.readthedocs.io/en/stable/examples/asyncio_examples.html
 class RedisConnector:
+    log = structlog.get_logger()
+
+    # Delay before the first attempt to reconnect after the connection to Redis was lost (doubled after each failure)
+    reconnectMinDelay: float = 0.1
+    # Maximum delay between attempts to reconnect
+    reconnectMaxDelay: float = 10.0
 
-    def __init__(self, loc: Location):
+    def __init__(self, loc: Location | None = None, client=None):
         """
         Events are posted to Redis. This is internal class used to access Redis.
 
         Args:
-            loc (Location): EventServer location
+            loc (Location): EventServer location (The Redis client for it is shared, see RedisClientPool)
+            client: if given, the Redis client to use instead of the one for the EventServer location.
+                    This can be any object that provides the subset of the redis.asyncio.Redis API used here
+                    (set, get, mget, publish, pipeline, pubsub and aclose), for example InMemoryRedis,
+                    for testing without the CSW services.
+        """
+        self._loc = loc if client is None else None
+        # The Redis client: For an Event Server location, this is acquired from RedisClientPool when first used
+        # in an event loop (see _redis)
+        self._client = client
+        # The event loop that the pooled client was acquired for (held weakly)
+        self._clientLoop: weakref.ref | None = None
+        # The pubsub used for the subscriptions (created on first use)
+        self._currentPubSub = None
+        # Maps each subscribed channel (event key) to the callbacks for it
+        self._callbacks: dict[str, List[Callable[[dict], Awaitable]]] = {}
+        # The single task that reads the pubsub messages and calls the callbacks (started on first subscribe)
+        self._readerTask: Task | None = None
+        # Client side index for pattern subscriptions
+        self._patternIndex = PatternIndex()
+        self.reconnectMetrics = ReconnectMetrics()
+
+    @property
+    def _redis(self):
+        """
+        The Redis client. For an Event Server location, this is the shared client for the running event loop,
+        which is acquired from RedisClientPool on first use (and again, if this connector is used in another loop).
         """
-        # XXX TODO Check why only localhost works!
-        # sentinel = Sentinel([(uri.hostname, uri.port)], socket_timeout=0.1)
-        # print(f"XXX Sentinel({uri.port})")
-        uri = urlparse(loc.uri)
-        sentinel = Sentinel([("localhost", uri.port)])
-        self._redis = sentinel.master_for('eventServer')
-        self._pubsub = self._redis.pubsub()
+        if self._loc is not None:
+            loop = asyncio.get_running_loop()
+            if self._clientLoop is None or self._clientLoop() is not loop:
+                if self._client is not None:
+                    # The previous event loop can no longer be used (redis.asyncio clients are bound to a loop)
+                    RedisClientPool.discard(self._client)
+                    self._currentPubSub = None
+                self._client = RedisClientPool.acquire(self._loc, loop)
+                self._clientLoop = weakref.ref(loop)
+        return self._client
+
+    @property
+    def _pubsub(self):
+        """
+        The pubsub used for the subscriptions, which shares the connection pool of the client
+        """
+        redis = self._redis
+        if self._currentPubSub is None:
+            self._currentPubSub = redis.pubsub()
+        return self._currentPubSub
+
+    @_pubsub.setter
+    def _pubsub(self, pubsub):
+        self._currentPubSub = pubsub
 
     @classmethod
     def make(cls) -> Self:
-        prefix = Prefix(Subsystem.CSW, "EventServer")
-        conn = ConnectionInfo.make(prefix, ComponentType.Service, ConnectionType.TcpType)
-        loc = LocationServiceSync().find(conn)
-        return RedisConnector(loc)
+        """
+        Returns a RedisConnector for the Event Server.
+        Note: This blocks while the Event Server location is looked up (the first time): Use create() in async code.
+        """
+        return RedisConnector(RedisClientPool.eventServerLocation())
 
+    @classmethod
+    async def create(cls, clientSession: ClientSession | None = None) -> Self:
+        """
+        Returns a RedisConnector for the Event Server, looking up its location with the async Location Service API.
+
+        Args:
+            clientSession: the HTTP session to use for the Location Service (a temporary one is used if not given)
+        """
+        return RedisConnector(await RedisClientPool.eventServerLocationAsync(clientSession))
 
     async def close(self):
-        await self._redis.aclose()
-        await self._pubsub.aclose()
+        if self._readerTask:
+            self._readerTask.cancel()
+            try:
+                await self._readerTask
+            except asyncio.CancelledError:
+                pass
+            self._readerTask = None
+        self._callbacks.clear()
+        # A pooled client (and its pubsub) can only be closed in the event loop it was acquired for
+        sameLoop = self._loc is None or (self._clientLoop is not None
+                                         and self._clientLoop() is asyncio.get_running_loop())
+        if self._currentPubSub is not None and sameLoop:
+            await self._currentPubSub.aclose()
+        self._currentPubSub = None
+        if self._loc is None:
+            await self._client.aclose()
+        elif self._client is not None:
+            if sameLoop:
+                await RedisClientPool.release(self._client)
+            else:
+                RedisClientPool.discard(self._client)
+            self._client = None
+            self._clientLoop = None
+
+    async def _readMessages(self):
+        """
+        Reads the messages for all of the subscribed channels and calls the callbacks for each one.
+        """
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception as ex:
+                if not self._hasSubscriptions():
+                    # Everything was unsubscribed (redis-py then raises RuntimeError, since the pubsub has no
+                    # connection): The next call to subscribe() starts a new reader
+                    self._readerTask = None
+                    return
+                if not isinstance(ex, (RedisConnectionError, RedisTimeoutError, OSError, RuntimeError)):
+                    self.log.error(f"Unexpected error reading the Event Service messages: {ex!r}")
+                # RuntimeError is raised if the pubsub has no connection (for example, after a failed reconnect)
+                if not await self._reconnect(ex):
+                    self._readerTask = None
+                    return
+                continue
+            if message is None and not self._hasSubscriptions():
+                self._readerTask = None
+                return
+            if message is not None and message['type'] in ('message', 'pmessage'):
+                channel = message['channel']
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                if message['type'] == 'message':
+                    callbacks = self._callbacks.get(channel, [])
+                else:
+                    pattern = message['pattern']
+                    if isinstance(pattern, bytes):
+                        pattern = pattern.decode()
+                    callbacks = self._patternIndex.callbacks(pattern, channel)
+                # Copy the list, since a callback might subscribe or unsubscribe
+                for callback in list(callbacks):
+                    try:
+                        await callback(message)
+                    except Exception as ex:
+                        self.log.error(f"Error in callback for {channel}: {ex}")
+            # Ensure that other tasks get a chance to run if there was no need to wait for a message
+            await asyncio.sleep(0)
+
+    def _hasSubscriptions(self) -> bool:
+        return bool(self._callbacks) or bool(self._patternIndex.serverPatterns())
 
-    async def subscribe(self, keyList: List[str], callback: Callable[[any], Awaitable]) -> Task:
+    async def _reconnect(self, error: Exception) -> bool:
+        """
+        Called when the connection for the subscriptions was lost: Creates a new one (the sentinel then finds
+        the current master) and subscribes again to all of the keys and patterns, retrying with exponential
+        backoff until it succeeds. The time this took is recorded in reconnectMetrics.
+        The cached Event Server location is also discarded, in case the Event Server was restarted elsewhere,
+        so that the next RedisConnector that is created looks it up again.
+
+        Returns:
+            false if there were no subscriptions left
+        """
+        start = time.monotonic()
+        delay = self.reconnectMinDelay
+        self.log.warning(f"Lost the connection to the Event Server ({error}): reconnecting")
+        if self._loc is not None:
+            RedisClientPool.invalidateLocation()
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = self._redis.pubsub()
+            channels = list(self._callbacks.keys())
+            patterns = self._patternIndex.serverPatterns()
+            try:
+                if channels:
+                    await self._pubsub.subscribe(*channels)
+                if patterns:
+                    await self._pubsub.psubscribe(*patterns)
+                break
+            except (RedisConnectionError, RedisTimeoutError, OSError, RuntimeError) as ex:
+                delay = min(delay * 2, self.reconnectMaxDelay)
+                self.log.warning(f"Failed to reconnect to the Event Server ({ex}): retrying in {delay} secs")
+        duration = time.monotonic() - start
+        self.reconnectMetrics.record(duration, error)
+        self.log.info(f"Reconnected to the Event Server after {duration:.3f} secs "
+                      f"({len(channels)} channels, {len(patterns)} patterns)")
+        return bool(channels or patterns)
+
+    async def subscribe(self, keyList: List[str], callback: Callable[[dict], Awaitable]):
         """
         Set up a Redis subscription on specified keys with specified callback on value changes.
+        All subscriptions share a single Redis connection and a single task that reads the messages:
+        A key is only subscribed in Redis when the first callback is added for it.
 
         Args:
             keyList (List[str]): list of keys to subscribe to
             callback (function): callback called when item changes.  Should take a Redis message type.
+        """
+        newKeys = []
+        for key in keyList:
+            callbacks = self._callbacks.setdefault(key, [])
+            if not callbacks:
+                newKeys.append(key)
+            callbacks.append(callback)
+        if newKeys:
+            await self._pubsub.subscribe(*newKeys)
+        if self._readerTask is None:
+            self._readerTask = asyncio.create_task(self._readMessages())
+
+    async def unsubscribe(self, keyList: List[str], callback: Callable[[dict], Awaitable] | None = None):
+        """
+        Removes the given callback for the list of event keys, or all callbacks if callback is None.
+        Keys that have no callbacks left are unsubscribed in Redis.
+
+        Args:
+            keyList (List[str]): list of keys to unsubscribe from (or all keys, if empty)
+            callback (function): the callback that was passed to subscribe()
+        """
+        removedKeys = []
+        for key in keyList or list(self._callbacks.keys()):
+            callbacks = self._callbacks.get(key)
+            if callbacks is None:
+                continue
+            if callback is None:
+                callbacks.clear()
+            elif callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                del self._callbacks[key]
+                removedKeys.append(key)
+        if removedKeys:
+            await self._pubsub.unsubscribe(*removedKeys)
+
+    async def pSubscribe(self, patternList: List[str], callback: Callable[[dict], Awaitable]):
+        """
+        Set up a Redis subscription on specified key patterns with specified callback on value changes.
+        In this case the keys are treated as glob-style patterns.
+        Since pattern subscriptions in Redis slow down every publish in the Event Service, only one broad
+        pattern per subsystem is subscribed in Redis, and the events are matched against the given patterns
+        on the client side (See PatternIndex).
 
-        Returns: PubSubWorkerThread
-            subscription thread. Use .stop() method to stop subscription
+        Args:
+            patternList (List[str]): list of key patterns to subscribe to
+            callback (function): callback called when item changes.  Should take a Redis message type.
         """
-        d = dict.fromkeys(keyList, callback)
-        await self._pubsub.subscribe(**d)
-        return asyncio.create_task(self._pubsub.run())
+        serverPatterns = [p for p in (self._patternIndex.add(pattern, callback) for pattern in patternList) if p]
+        if serverPatterns:
+            await self._pubsub.psubscribe(*serverPatterns)
+        if self._readerTask is None:
+            self._readerTask = asyncio.create_task(self._readMessages())
 
-    async def unsubscribe(self, keyList: List[str]):
+    async def pUnsubscribe(self, patternList: List[str], callback: Callable[[dict], Awaitable] | None = None):
         """
-        Unsubscribe to the list of event keys
+        Removes the given callback (or all callbacks if None) for the list of event key patterns
 
         Args:
-            keyList (List[str]): list of keys to unsubscribe from
-        """
-        await self._pubsub.unsubscribe(keyList)
-
-    # XXX Commented out due to Event Service performance concerns when using psubscribe
-    # def pSubscribe(self, keyList: List[str], callback):
-    #     """
-    #     Set up a Redis subscription on specified keys with specified callback on value changes.
-    #     In this case the keys are treated as glob-style patterns.
-    #
-    #     Args:
-    #         keyList (List[str]): list of key patterns to subscribe to
-    #         callback (function): callback called when item changes.  Should take a Redis message type.
-    #
-    #     Returns: PubSubWorkerThread
-    #         subscription thread. Use .stop() method to stop subscription
-    #     """
-    #     d = dict.fromkeys(keyList, callback)
-    #     self._pubsub.psubscribe(**d)
-    #     return self._pubsub.run_in_thread(sleep_time=0.001)
-
-    # def pUnsubscribe(self, keyList: List[str]):
-    #     """
-    #     Unsubscribe to the list of event key patterns
-    #
-    #     Args:
-    #         keyList (List[str]): list of key patterns to unsubscribe from
-    #     """
-    #     self._pubsub.punsubscribe(keyList)
-
-    async def publish(self, key: str, encodedValue: bytes):
+            patternList (List[str]): list of key patterns to unsubscribe from (or all patterns, if empty)
+            callback (function): the callback that was passed to pSubscribe()
+        """
+        patterns = patternList or self._patternIndex.patterns()
+        serverPatterns = [p for p in (self._patternIndex.remove(pattern, callback) for pattern in patterns) if p]
+        if serverPatterns:
+            await self._pubsub.punsubscribe(*serverPatterns)
+
+    async def publish(self, key: str, encodedValue: bytes, persist: bool = True):
         """
         Publish CBOR encoded event string to Redis
 
         Args:
             key: String specifying Redis key for event.  Should be source prefix + "." + event name.
             encodedValue: CBOR encoded value for the event (in the form [className, dict])
+            persist: if false, the event is only published and not stored as the latest value for the key
+                     (so get() still returns the previous one)
+        """
+        if not persist:
+            await self._redis.publish(key, encodedValue)
+            return
+        # Use a pipeline so that SET and PUBLISH are sent in one round trip
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, encodedValue)
+            pipe.publish(key, encodedValue)
+            await pipe.execute()
+
+    async def publishBatch(self, items: List[Tuple[str, bytes]], persist: List[bool] | None = None):
+        """
+        Publish a list of CBOR encoded events to Redis, using a single pipelined write for all of them.
+
+        Args:
+            items: list of (key, encodedValue) pairs, where the key is the source prefix + "." + event name
+                   and encodedValue is the CBOR encoded event (as for publish())
+            persist: if given, whether to store each of the events as the latest value for its key (See publish())
+        """
+        if not items:
+            return
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for i, (key, encodedValue) in enumerate(items):
+                if persist is None or persist[i]:
+                    pipe.set(key, encodedValue)
+                pipe.publish(key, encodedValue)
+            await pipe.execute()
+
+    async def mget(self, keys: List[str], chunkSize: int = 500) -> List[bytes | None]:
+        """
+        Get the values for the given keys from Redis, using MGET.
+        Large lists of keys are split into chunks of chunkSize keys, which are sent in a single pipelined write.
+
+        Args:
+            keys (List[str]): list of keys (source prefix + "." + event name)
+            chunkSize (int): maximum number of keys for each MGET command
+
+        Returns: List[bytes | None]
+            list containing the value for each key, or None if there is no value for the key
         """
-        await self._redis.set(key, encodedValue)
-        await self._redis.publish(key, encodedValue)
+        if not keys:
+            return []
+        if len(keys) <= chunkSize:
+            return await self._redis.mget(keys)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for i in range(0, len(keys), chunkSize):
+                pipe.mget(keys[i:i + chunkSize])
+            chunks = await pipe.execute()
+        return [value for chunk in chunks for value in chunk]
 
     async def get(self, key: str) -> str:
         """
@@ -57,31 +57,54 @@ class TimeServiceScheduler:
         task = asyncio.create_task(wrapper())
         return TimerCancellable(timerHandle, task)
 
-    def schedulePeriodically(self, interval: timedelta, func: Callable[[], Awaitable]) -> Cancellable:
+    @staticmethod
+    async def _runPeriodically(secs: float, func: Callable[[], Awaitable], onOverrun: Callable[[int], None] | None):
+        """
+        Calls func every secs seconds, starting now.
+        The times are computed from the start time (using the event loop's monotonic clock), so that the
+        time taken by func and the latency of the event loop do not accumulate.
+        If func takes longer than the interval, the missed executions are skipped and
+        onOverrun (if given) is called with the number of executions that were skipped.
+        """
+        loop = asyncio.get_running_loop()
+        nextTime = loop.time()
+        while True:
+            await func()
+            nextTime += secs
+            delay = nextTime - loop.time()
+            if delay < 0:
+                missed = int(-delay // secs) + 1
+                nextTime += missed * secs
+                delay += missed * secs
+                if onOverrun:
+                    onOverrun(missed)
+            await asyncio.sleep(delay)
+
+    def schedulePeriodically(self, interval: timedelta, func: Callable[[], Awaitable],
+                             onOverrun: Callable[[int], None] | None = None) -> Cancellable:
         """
         Schedules a function to execute periodically at the given interval.
         The function is executed once immediately without any initial delay followed by periodic executions.
         In case you do not want to start scheduling immediately, you can use the overloaded method for `schedulePeriodically` with startTime.
+        The executions are scheduled at fixed times relative to the first one, so that they do not drift
+        when the function or the event loop is slow.
 
         Args:
             interval: the time interval between the executions of the function
             func: the function to execute at each interval
+            onOverrun: optional function that is called with the number of skipped executions, if the function
+                       took longer than the interval and one or more executions had to be skipped
 
         Returns:
             a handle to cancel execution of further tasks
         """
         secs = interval.total_seconds()
-
-        async def periodic():
-            while True:
-                await func()
-                await asyncio.sleep(secs)
-
-        task = asyncio.create_task(periodic())
+        task = asyncio.create_task(self._runPeriodically(secs, func, onOverrun))
         return TimerCancellable(None, task)
 
     def schedulePeriodicallyStarting(self, startTime: TMTTime, interval: timedelta,
-                             func: Callable[[], Awaitable]) -> Cancellable:
+                                     func: Callable[[], Awaitable],
+                                     onOverrun: Callable[[int], None] | None = None) -> Cancellable:
         """
         Schedules a function to execute periodically at the given interval.
         The task is executed once at the given start time followed by execution of task at each interval.
@@ -90,6 +113,8 @@ class TimeServiceScheduler:
             startTime: first time at which task is to be executed
             interval: the time interval between the executions of the function
             func: the function to execute at each interval
+            onOverrun: optional function that is called with the number of skipped executions, if the function
+                       took longer than the interval and one or more executions had to be skipped
 
         Returns:
             a handle to cancel execution of further tasks
@@ -101,9 +126,7 @@ class TimeServiceScheduler:
 
         async def periodic():
             await event.wait()
-            while True:
-                await func()
-                await asyncio.sleep(secs)
+            await self._runPeriodically(secs, func, onOverrun)
 
         timerHandle = loop.call_later(startSecs, lambda: event.set())
         task = asyncio.create_task(periodic())
@@ -5,6 +5,7 @@ from datetime import timedelta
 from aiohttp import ClientResponse, ClientSession
 
 from csw.CommandResponse import SubmitResponse, CommandResponse, Started, Error
+from csw.JsonCodec import JsonCodec, jsonHeaders
 from csw.LocationService import LocationService, ConnectionInfo, ComponentType, ConnectionType, HttpLocation
 from csw.Prefix import Prefix
 from esw.Sequence import Sequence
@@ -25,7 +26,11 @@ class SequencerClient(SequencerApi):
         self._session = clientSession
 
     async def post(self, url: str, headers: dict, jsonData: str) -> ClientResponse:
-        return await self._session.post(url, headers=headers, json=jsonData)
+        """
+        Posts the given data, encoded as JSON, to the given URL.
+        Note: This is kept for compatibility: The SequencerClient methods post their requests with JsonCodec.
+        """
+        return await self._session.post(url, headers={**jsonHeaders, **headers}, data=JsonCodec.encode(jsonData))
 
     async def _getBaseUri(self) -> str:
         locationService = LocationService(self._session)
@@ -39,15 +44,13 @@ class SequencerClient(SequencerApi):
     async def _postCommand(self, data: dict) -> ClientResponse:
         baseUri = await self._getBaseUri()
         postUri = f"{baseUri}post-endpoint"
-        headers = {'Content-type': 'application/json'}
-        jsonData = json.loads(json.dumps(data))
-        return await self.post(postUri, headers=headers, jsonData=jsonData)
+        return await JsonCodec.post(self._session, postUri, data)
 
     async def _postCommandGetResponse(self, request: SequencerRequest) -> EswSequencerResponse:
         response = await self._postCommand(request._asDict())
         if not response.ok:
             return Unhandled("Unknown", request.__class__.__name__, f"Error: {await response.text()}")
-        return EswSequencerResponse._fromDict(await response.json())
+        return EswSequencerResponse._fromDict(await JsonCodec.readResponse(response))
 
     async def getSequence(self) -> StepList | None:
         """
@@ -62,7 +65,7 @@ class SequencerClient(SequencerApi):
         response = await self._postCommand(GetSequence()._asDict())
         if not response.ok:
             return None
-        return StepList._fromDict(await response.json())
+        return StepList._fromDict(await JsonCodec.readResponse(response))
 
     async def isAvailable(self) -> bool:
         """
@@ -74,7 +77,7 @@ class SequencerClient(SequencerApi):
         response = await self._postCommand(IsAvailable()._asDict())
         if not response.ok:
             return False
-        return await response.json()
+        return await JsonCodec.readResponse(response)
 
     async def isOnline(self) -> bool:
         """
@@ -86,7 +89,7 @@ class SequencerClient(SequencerApi):
         response = await self._postCommand(IsOnline()._asDict())
         if not response.ok:
             return False
-        return await response.json()
+        return await JsonCodec.readResponse(response)
 
     async def add(self, commands: List[SequenceCommand]) -> OkOrUnhandledResponse:
         """
@@ -251,7 +254,7 @@ class SequencerClient(SequencerApi):
         if not response.ok:
             runId = str(uuid.uuid4())
             return Error(runId, await response.text())
-        return CommandResponse._fromDict(await response.json())
+        return CommandResponse._fromDict(await JsonCodec.readResponse(response))
 
     async def query(self, id: str) -> SubmitResponse:
         """
@@ -267,7 +270,7 @@ class SequencerClient(SequencerApi):
         if not response.ok:
             runId = str(uuid.uuid4())
             return Error(runId, await response.text())
-        return CommandResponse._fromDict(await response.json())
+        return CommandResponse._fromDict(await JsonCodec.readResponse(response))
 
     async def queryFinal(self, runId: str, timeout: timedelta = timedelta(seconds=10)) -> SubmitResponse:
         """
@@ -289,7 +292,7 @@ class SequencerClient(SequencerApi):
         await ws.send_str(jsonStr)
         jsonResp = await ws.receive_str()
         await ws.close()
-        return CommandResponse._fromDict(json.loads(jsonResp))
+        return CommandResponse._fromDict(JsonCodec.decode(jsonResp))
 
     async def submitAndWait(self, sequence: Sequence, timeout: timedelta) -> SubmitResponse:
         """
@@ -358,7 +361,7 @@ class SequencerClient(SequencerApi):
         response = await self._postCommand(GetSequencerState()._asDict())
         if not response.ok:
             return SequencerState.Offline
-        jsonData = await response.json()
+        jsonData = await JsonCodec.readResponse(response)
         match jsonData["_type"]:
             case "Idle":
                 return SequencerState.Idle
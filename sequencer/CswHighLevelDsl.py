@@ -276,7 +276,7 @@ class CswHighLevelDsl(CswHighLevelDslApi,
         # super(CswHighLevelDsl, self).__init__(clientSession = scriptContext.clientSession)
         LocationServiceDsl.__init__(self, scriptContext.clientSession)
         ConfigServiceDsl.__init__(self, scriptContext.clientSession)
-        EventServiceDsl.__init__(self)
+        EventServiceDsl.__init__(self, scriptContext.clientSession)
         CommandServiceDsl.__init__(self)
         TimeServiceDsl.__init__(self)
         LoopDsl.__init__(self)
@@ -1,8 +1,13 @@
+import asyncio
 from collections.abc import Awaitable
-from typing import Callable, Set
+from datetime import timedelta
+from typing import Callable, List
 
+import structlog
+from aiohttp import ClientSession
 from multipledispatch import dispatch
 
+from csw.Cancellable import Cancellable
 from csw.Event import SystemEvent, Event
 from csw.EventName import EventName
 from csw.EventKey import EventKey
@@ -13,22 +18,96 @@ from csw.Parameter import Parameter
 from csw.Prefix import Prefix
 
 
+class _DeferredCancellable(Cancellable):
+    """
+    Cancellable for periodic publishing that is started once the event publisher was created (without blocking)
+    """
+    log = structlog.get_logger()
+
+    def __init__(self, start: Callable[[], Awaitable[Cancellable]]):
+        self._cancellable: Cancellable | None = None
+        self._task = asyncio.create_task(self._start(start))
+
+    async def _start(self, start: Callable[[], Awaitable[Cancellable]]):
+        try:
+            self._cancellable = await start()
+        except Exception as ex:
+            self.log.error(f"Failed to start publishing events: {ex}")
+
+    def cancel(self) -> bool:
+        self._task.cancel()
+        if self._cancellable is not None:
+            return self._cancellable.cancel()
+        return True
+
+
 class EventServiceDsl:
 
-    def __init__(self):
+    def __init__(self, clientSession: ClientSession | None = None):
+        self._clientSession = clientSession
         self._eventPublisher: EventPublisher | None = None
         self._eventSubscriber: EventSubscriber | None = None
+        self._eventCacheSize: int | None = None
+        self._eventCacheTtl = timedelta(seconds=1)
 
     def eventPublisher(self) -> EventPublisher:
+        """
+        Returns the event publisher, which is created on first use.
+        Note: The first call blocks while looking up the Event Server location: Use eventPublisherAsync() in async code.
+        """
         if self._eventPublisher == None:
             self._eventPublisher = EventPublisher.make()
         return self._eventPublisher
 
     def eventSubscriber(self) -> EventSubscriber:
+        """
+        Returns the event subscriber, which is created on first use.
+        Note: The first call blocks while looking up the Event Server location: Use eventSubscriberAsync() in async code.
+        """
+        if self._eventSubscriber == None:
+            self._eventSubscriber = EventSubscriber.make(self._eventCacheSize, self._eventCacheTtl)
+        return self._eventSubscriber
+
+    async def eventPublisherAsync(self) -> EventPublisher:
+        """
+        Returns the event publisher, which is created on first use without blocking the event loop
+        (The Event Server location is looked up with the async Location Service).
+        """
+        if self._eventPublisher == None:
+            publisher = await EventPublisher.create(self._clientSession)
+            # Another task might have created one while waiting for the location
+            if self._eventPublisher == None:
+                self._eventPublisher = publisher
+            else:
+                await publisher.close()
+        return self._eventPublisher
+
+    async def eventSubscriberAsync(self) -> EventSubscriber:
+        """
+        Returns the event subscriber, which is created on first use without blocking the event loop
+        (The Event Server location is looked up with the async Location Service).
+        """
         if self._eventSubscriber == None:
-            self._eventSubscriber = EventSubscriber.make()
+            subscriber = await EventSubscriber.create(self._clientSession, self._eventCacheSize, self._eventCacheTtl)
+            if self._eventSubscriber == None:
+                self._eventSubscriber = subscriber
+            else:
+                await subscriber.close()
         return self._eventSubscriber
 
+    def useEventCache(self, size: int = 1000, ttl: timedelta = timedelta(seconds=1)):
+        """
+        Enables a client side cache for getEvent() and getEvents(): The latest events for the keys subscribed with
+        onEvent() are then available without accessing the Event Service (See EventSubscriber).
+        Must be called before any other event service method.
+
+        Args:
+            size: maximum number of cached events for keys that are no longer subscribed
+            ttl: how long to keep the latest event for a key that is no longer subscribed
+        """
+        self._eventCacheSize = size
+        self._eventCacheTtl = ttl
+
     @dispatch(str, str)
     def EventKey(self, prefix: str, eventName: str) -> EventKey:
         """
@@ -75,36 +154,49 @@ class EventServiceDsl:
         Args:
             event: event to publish
         """
-        await self.eventPublisher().publish(event)
-
-    # XXX TODO
-    #     /**
-    #      * Publishes the event generated by `eventGenerator` at `every` frequency. Cancellable can used to
-    #      * stop the publishing. Throws [[csw.event.api.exceptions.EventServerNotAvailable]] when event server is not available or
-    #      * [[csw.event.api.exceptions.PublishFailure]] containing the cause for other failures.
-    #      *
-    #      * @param every frequency with which the events are to be published
-    #      * @param eventGenerator function which will be called at given frequency to generate an event to be published
-    #      * @return handle of [[org.apache.pekko.actor.Cancellable]] which can be used to stop event publishing
-    #      */
-    #     fun publishEvent(every: Duration, eventGenerator: SuspendableSupplier<Event?>): Cancellable =
-    #             eventPublisher.publishAsync({
-    #                 coroutineScope.future { Optional.ofNullable(eventGenerator()) }
-    #             }, every.toJavaDuration())
-
-    async def onEvent(self, callback: Callable[[Event], Awaitable], *eventKeys: str) -> EventSubscription:
+        await (await self.eventPublisherAsync()).publish(event)
+
+    @dispatch(timedelta, object)
+    def publishEvent(self, every: timedelta, eventGenerator: Callable[[], Awaitable[Event | None]]) -> Cancellable:
+        """
+        Publishes the event generated by `eventGenerator` at `every` frequency.
+        If `eventGenerator` returns None, no event is published for that cycle.
+        The publish times do not drift, even if generating or publishing an event is slow.
+        If the event publisher was not created yet, publishing starts once it was created (with eventPublisherAsync(),
+        so this never blocks the event loop).
+
+        Args:
+            every: frequency with which the events are to be published
+            eventGenerator: async function which will be called at given frequency to generate an event to be published
+
+        Returns:
+            handle of Cancellable which can be used to stop event publishing
+        """
+        if self._eventPublisher is not None:
+            return self._eventPublisher.publishAsync(eventGenerator, every)
+
+        async def start() -> Cancellable:
+            return (await self.eventPublisherAsync()).publishAsync(eventGenerator, every)
+
+        return _DeferredCancellable(start)
+
+    async def onEvent(self, callback: Callable[[Event], Awaitable], *eventKeys: str,
+                      duration: timedelta | None = None) -> EventSubscription:
         """
         Subscribes to the `eventKeys` which will execute the given `callback` whenever an event is published on any one of the event keys.
+        If `duration` is given, the `callback` is instead executed on each tick of the specified `duration`
+        with the latest event available for each of the event keys.
 
         Args:
             callback: callback to be executed whenever event is published on provided keys
             *eventKeys: collection of strings representing EventKey
+            duration: optional duration which determines the frequency with which events are received
 
         Returns:
             object that can be used to cancel the subscription
         """
         keys = list(map(lambda k: EventKey.from_str(k), eventKeys))
-        subscription = await self.eventSubscriber().subscribe(keys, callback)
+        subscription = await (await self.eventSubscriberAsync()).subscribe(keys, callback, every=duration)
         return subscription
 
     # def onEvent(self, *eventKeys: str):
@@ -115,25 +207,7 @@ class EventServiceDsl:
     #         return wrapper
     #     return decorator
 
-    # XXX TODO
-    #     /**
-    #      * Subscribes to the given `eventKeys` and will execute the given `callback` on tick of specified `duration` with the latest event available.
-    #      * Throws [[csw.event.api.exceptions.EventServerNotAvailable]] when event server is not available.
-    #      *
-    #      * @param eventKeys collection of strings representing [[csw.params.events.EventKey]]
-    #      * @param duration which determines the frequency with which events are received
-    #      * @param callback to be executed whenever event is published on provided keys
-    #      * @return handle of [[esw.ocs.dsl.highlevel.models.EventSubscription]] which can be used to cancel the subscription
-    #      */
-    #     suspend fun onEvent(vararg eventKeys: String, duration: Duration, callback: SuspendableConsumer<Event>): EventSubscription {
-    #         cb = { event: Event -> coroutineScope.future { callback(event) } }
-    #         subscription = eventSubscriber
-    #                 .subscribeAsync(eventKeys.toEventKeys(), cb, duration.toJavaDuration(), SubscriptionModes.jRateAdapterMode())
-    #         subscription.ready().await()
-    #         return EventSubscription { subscription.unsubscribe().await() }
-    #     }
-
-    async def getEvents(self, *eventKeys: str) -> Set[Event]:
+    async def getEvents(self, *eventKeys: str) -> List[Event]:
         """
         Method to get the latest event of all the provided `eventKeys`. Invalid event will be given if no event is published on one or more keys.
         Throws exception when event server is not available.
@@ -142,7 +216,7 @@ class EventServiceDsl:
             *eventKeys: collection of strings representing EventKey
         """
         keys = list(map(lambda k: EventKey.from_str(k), eventKeys))
-        return await self.eventSubscriber().gets(set(keys))
+        return await (await self.eventSubscriberAsync()).gets(keys)
 
     async def getEvent(self, eventKey: str) -> Event:
         """
@@ -153,4 +227,4 @@ class EventServiceDsl:
         Returns:
             latest Event available
         """
-        return await self.eventSubscriber().get(EventKey.from_str(eventKey))
+        return await (await self.eventSubscriberAsync()).get(EventKey.from_str(eventKey))
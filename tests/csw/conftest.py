@@ -0,0 +1,46 @@
+import pytest
+from aiohttp import ClientSession, web
+
+from csw.CommandServer import CommandServer
+from csw.CommandService import CommandService
+from csw.ComponentHandlers import ComponentHandlers
+from csw.LocationService import ComponentType, LocationServiceUtil
+from csw.Prefix import Prefix
+
+
+@pytest.fixture
+async def localCommandService(monkeypatch):
+    """
+    Returns an async function that starts a local HTTP server and returns a CommandService for it, which uses
+    a cached location for the server, so that the tests do not require the CSW services.
+    The server is either a CommandServer for the given ComponentHandlers (which is not registered with the
+    Location Service) or the given aiohttp app. Everything is cleaned up at the end of the test.
+    """
+    monkeypatch.setattr(CommandServer, "registerWithLocationService", lambda self: None)
+    clientSession = ClientSession()
+    runners = []
+    services = []
+
+    async def start(prefix: Prefix, server: ComponentHandlers | web.Application,
+                    componentType: ComponentType = ComponentType.Service) -> CommandService:
+        if isinstance(server, ComponentHandlers):
+            commandServer = CommandServer(prefix, server)
+            app, port = commandServer._app, commandServer.port
+        else:
+            app, port = server, LocationServiceUtil.getFreePort()
+        runner = web.AppRunner(app)
+        runners.append(runner)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        cs = CommandService(prefix, componentType, clientSession)
+        services.append(cs)
+        CommandService._baseUriCache[cs._cacheKey()] = (f"http://127.0.0.1:{port}/", float("inf"))
+        return cs
+
+    yield start
+    for cs in services:
+        CommandService._baseUriCache.pop(cs._cacheKey(), None)
+        await cs.close()
+    await clientSession.close()
+    for runner in runners:
+        await runner.cleanup()
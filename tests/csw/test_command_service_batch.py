@@ -0,0 +1,62 @@
+from aiohttp import web
+
+from csw.CommandResponse import Completed, Accepted, Error
+from csw.CommandServer import CommandServer
+from csw.ComponentHandlers import ComponentHandlers
+from csw.ParameterSetType import Setup, CommandName
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+
+class BatchTestHandlers(ComponentHandlers):
+    def __init__(self):
+        self.received = []
+
+    def onSubmit(self, runId, command):
+        self.received.append(command.commandName.name)
+        if command.commandName.name == "bad":
+            return Error(runId, "bad command"), None
+        if command.commandName.name == "crash":
+            raise RuntimeError("handler failed")
+        return Completed(runId), None
+
+    def onOneway(self, runId, command):
+        self.received.append(command.commandName.name)
+        return Accepted(runId)
+
+
+async def test_command_service_batch(monkeypatch, localCommandService):
+    prefix = Prefix(Subsystem.CSW, "batchTest")
+    handlers = BatchTestHandlers()
+    cs = await localCommandService(prefix, handlers)
+
+    names = ["axis1", "bad", "axis2"]
+    responses = await cs.submitBatch([Setup(prefix, CommandName(name)) for name in names])
+    assert handlers.received == names
+    assert [type(r) for r in responses] == [Completed, Error, Completed]
+    assert len({r.runId for r in responses}) == 3
+
+    # A command whose handler raises an exception gets an Error response, and the others are still handled once
+    handlers.received.clear()
+    responses = await cs.submitBatch([Setup(prefix, CommandName(name)) for name in ["axis1", "crash", "axis2"]])
+    assert handlers.received == ["axis1", "crash", "axis2"]
+    assert [type(r) for r in responses] == [Completed, Error, Completed]
+
+    handlers.received.clear()
+    responses = await cs.onewayBatch([Setup(prefix, CommandName(name)) for name in names])
+    assert handlers.received == names
+    assert all(isinstance(r, Accepted) for r in responses)
+
+    # Servers that do not support batches reject them: The commands are then sent one at a time
+    monkeypatch.setattr(CommandServer, "_handleBatch", lambda *args: web.Response(status=400, text="unsupported"))
+    handlers.received.clear()
+    responses = await cs.submitBatch([Setup(prefix, CommandName(name)) for name in names])
+    assert handlers.received == names
+    assert [type(r) for r in responses] == [Completed, Error, Completed]
+
+    # For other errors, the commands are not sent again, since some of them might have been handled
+    monkeypatch.setattr(CommandServer, "_handleBatch", lambda *args: web.Response(status=500, text="failed"))
+    handlers.received.clear()
+    responses = await cs.submitBatch([Setup(prefix, CommandName(name)) for name in names])
+    assert handlers.received == []
+    assert all(isinstance(r, Error) for r in responses)
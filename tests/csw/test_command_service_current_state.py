@@ -0,0 +1,100 @@
+import asyncio
+import json
+import time
+
+from aiohttp import WSMsgType, web
+
+from csw.CommandService import CommandService
+from csw.ComponentHandlers import ComponentHandlers
+from csw.CurrentState import CurrentState
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+prefix = Prefix(Subsystem.CSW, "currentStateTest")
+
+
+class CurrentStateTestHandlers(ComponentHandlers):
+    def currentStates(self):
+        return [CurrentState(prefix, "state1", []), CurrentState(prefix, "state2", [])]
+
+
+async def test_command_service_current_state(localCommandService):
+    handlers = CurrentStateTestHandlers()
+    cs = await localCommandService(prefix, handlers)
+    received = {"state1": [], "state2": [], "all": []}
+
+    def callback(name):
+        async def f(currentState: CurrentState):
+            received[name].append(currentState.stateName)
+
+        return f
+
+    # The subscriptions return as soon as the server acknowledges them, and share one websocket
+    start = time.monotonic()
+    subscriptions = [await cs.subscribeCurrentState(["state1"], callback("state1")),
+                     await cs.subscribeCurrentState(["state2"], callback("state2")),
+                     await cs.subscribeCurrentState([], callback("all"))]
+    assert time.monotonic() - start < CommandService.currentStateSubscribeDelay
+    socket = cs._currentStateSocket
+    assert socket is not None and len(socket.subscribers) == 3
+
+    # Each subscriber only receives the states it subscribed to
+    await handlers.publishCurrentStates()
+    await asyncio.sleep(0.2)
+    assert received == {"state1": ["state1"], "state2": ["state2"], "all": ["state1", "state2"]}
+
+    # The websocket is closed when the last subscription is cancelled
+    for subscription in subscriptions:
+        subscription.cancel()
+    await asyncio.sleep(0.2)
+    assert socket.ws.closed
+    assert cs._currentStateSocket is None
+
+    # Also if a subscription is cancelled before its task starts
+    subscription = await cs.subscribeCurrentState(["state1"], callback("state1"))
+    socket = cs._currentStateSocket
+    subscription.cancel()
+    await asyncio.sleep(0.2)
+    assert not socket.subscribers
+    assert socket.ws.closed
+
+    # close() closes the current state websockets
+    await cs.subscribeCurrentState([], callback("all"))
+    socket = cs._currentStateSocket
+    await cs.close()
+    assert socket.ws.closed
+    assert not cs._currentStateSockets
+
+
+# Components that do not acknowledge subscriptions (such as Scala components) get one websocket per subscription
+async def test_command_service_current_state_without_ack(localCommandService):
+    subscriptions = []
+
+    async def handleWs(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        msg = await ws.receive()
+        subscriptions.append(json.loads(msg.data)['names'])
+        async for msg in ws:
+            if msg.type == WSMsgType.CLOSE:
+                break
+        return ws
+
+    app = web.Application()
+    app.add_routes([web.get('/websocket-endpoint', handleWs)])
+    cs = await localCommandService(Prefix(Subsystem.CSW, "currentStateWithoutAckTest"), app)
+
+    async def callback(_: CurrentState):
+        pass
+
+    start = time.monotonic()
+    subscription1 = await cs.subscribeCurrentState(["state1"], callback)
+    assert time.monotonic() - start >= CommandService.currentStateSubscribeDelay
+    subscription2 = await cs.subscribeCurrentState(["state2"], callback)
+    assert subscriptions == [["state1"], ["state2"]]
+    assert cs._currentStateSocket is None
+    assert len(cs._currentStateSockets) == 2
+    subscription1.cancel()
+    subscription2.cancel()
+    await asyncio.sleep(0.1)
+    assert not cs._currentStateSockets
@@ -0,0 +1,32 @@
+import pytest
+from aiohttp import web
+
+from csw.CommandResponse import Completed
+from csw.CommandService import CommandService
+from csw.LocationService import ComponentType, LocationServiceUtil
+from csw.ParameterSetType import Setup, CommandName
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+
+async def test_command_service_location_cache(localCommandService):
+    async def handlePost(request: web.Request) -> web.Response:
+        return web.json_response(Completed("test-run-id")._asDict())
+
+    app = web.Application()
+    app.add_routes([web.post('/post-endpoint', handlePost)])
+    prefix = Prefix(Subsystem.CSW, "locationCacheTest")
+    cs = await localCommandService(prefix, app, ComponentType.HCD)
+    cacheKey = cs._cacheKey()
+
+    # The cached URI is used while it is valid
+    resp = await cs.submit(Setup(prefix, CommandName("test")))
+    assert resp == Completed("test-run-id")
+    assert cacheKey in CommandService._baseUriCache
+
+    # If connecting fails, the cached URI is dropped and the location is resolved again
+    # (which also fails here, since the component is not registered)
+    CommandService._baseUriCache[cacheKey] = (f"http://127.0.0.1:{LocationServiceUtil.getFreePort()}/", float("inf"))
+    with pytest.raises(Exception):
+        await cs.submit(Setup(prefix, CommandName("test")))
+    assert cacheKey not in CommandService._baseUriCache
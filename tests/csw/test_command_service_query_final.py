@@ -0,0 +1,108 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+from aiohttp import WSMsgType, web
+
+from csw.CommandResponse import Completed
+from csw.CommandServiceRequest import MultiplexWebSocketProtocol
+from csw.LocationService import ComponentType
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+
+async def test_command_service_query_final(localCommandService):
+    connections = []
+    # runIds in the order in which the server sent their responses
+    replies = []
+    # If true, the server closes the websocket after each response (as if it was restarted)
+    closeAfterResponse = False
+
+    async def reply(ws: web.WebSocketResponse, runId: str):
+        # The command with the highest runId completes first
+        await asyncio.sleep(0.1 / int(runId))
+        if not ws.closed:
+            replies.append(runId)
+            await ws.send_str(json.dumps(Completed(runId)._asDict()))
+            if closeAfterResponse:
+                await ws.close()
+
+    async def handleWs(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(protocols=(MultiplexWebSocketProtocol,))
+        await ws.prepare(request)
+        connections.append(ws)
+        tasks = set()
+        async for msg in ws:
+            if msg.type == WSMsgType.TEXT:
+                runId = json.loads(msg.data)['runId']
+                # Commands that never complete are not answered
+                if runId != "never":
+                    task = asyncio.create_task(reply(ws, runId))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        return ws
+
+    app = web.Application()
+    app.add_routes([web.get('/websocket-endpoint', handleWs)])
+    cs = await localCommandService(Prefix(Subsystem.CSW, "queryFinalTest"), app, ComponentType.HCD)
+
+    # Concurrent queries share one websocket, and the responses (which arrive in a different order than the
+    # requests were sent) are matched by runId
+    runIds = ["1", "2", "3", "1"]
+    responses = await asyncio.gather(*[cs.queryFinal(runId, timedelta(seconds=5)) for runId in runIds])
+    assert responses == [Completed(runId) for runId in runIds]
+    assert replies == ["3", "2", "1"]
+    assert len(connections) == 1
+
+    # Queries left without a response are sent again if the server closes the websocket:
+    # The response for "2" arrives first and closes the websocket, so the query for "1" is sent again on a new one
+    closeAfterResponse = True
+    connections.clear()
+    replies.clear()
+    responses = await asyncio.gather(*[cs.queryFinal(runId, timedelta(seconds=5)) for runId in ["1", "2"]])
+    assert responses == [Completed("1"), Completed("2")]
+    assert replies == ["2", "1"]
+    assert len(connections) == 1
+
+    # close() fails the queries still waiting for a response, without sending them again
+    closeAfterResponse = False
+    connections.clear()
+    query = asyncio.create_task(cs.queryFinal("never", timedelta(seconds=5)))
+    await asyncio.sleep(0.1)
+    await cs.close()
+    with pytest.raises(RuntimeError):
+        await query
+    await asyncio.sleep(0.1)
+    assert len(connections) == 1
+
+
+# Components that do not select MultiplexWebSocketProtocol (such as Scala components) get one websocket per query,
+# so a query does not wait for the response to another one
+async def test_command_service_query_final_single_request_server(localCommandService):
+    connections = []
+
+    async def handleWs(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        connections.append(ws)
+        # Only the first message is handled, and the websocket is closed after the response
+        msg = await ws.receive()
+        runId = json.loads(msg.data)['runId']
+        await asyncio.sleep(1.0 if runId == "slow" else 0.01)
+        await ws.send_str(json.dumps(Completed(runId)._asDict()))
+        await ws.close()
+        return ws
+
+    app = web.Application()
+    app.add_routes([web.get('/websocket-endpoint', handleWs)])
+    cs = await localCommandService(Prefix(Subsystem.CSW, "queryFinalSingleTest"), app, ComponentType.HCD)
+
+    slow = asyncio.create_task(cs.queryFinal("slow", timedelta(seconds=5)))
+    await asyncio.sleep(0.1)
+    fast = await asyncio.wait_for(asyncio.gather(*[cs.queryFinal(runId, timedelta(seconds=5)) for runId in "12"]), 0.5)
+    assert fast == [Completed("1"), Completed("2")]
+    assert not slow.done()
+    assert await slow == Completed("slow")
+    assert len(connections) == 3
+    assert cs._queryFinalWs is None
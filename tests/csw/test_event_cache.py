@@ -0,0 +1,55 @@
+import time
+from datetime import timedelta
+
+from csw.EventCache import EventCache
+
+
+async def test_event_cache():
+    cache = EventCache(maxSize=2, ttl=timedelta(seconds=0.2))
+    assert cache.retain(["a.b", "a.c"]) == ["a.b", "a.c"]
+    assert cache.retain(["a.b"]) == []
+    assert cache.lookup("a.b") == (False, None)
+
+    # A value read from Redis is only kept until a newer one is received
+    cache.store("a.b", b"1")
+    assert cache.lookup("a.b") == (True, b"1")
+    await cache.onMessage({'channel': b"a.b", 'data': b"2"})
+    cache.store("a.b", b"1")
+    assert cache.lookup("a.b") == (True, b"2")
+
+    # Values for keys that are not subscribed are ignored
+    cache.store("x.y", b"1")
+    await cache.onMessage({'channel': b"x.y", 'data': b"1"})
+    assert cache.lookup("x.y") == (False, None)
+
+    # Only the last release of a key stops the updates
+    assert cache.release(["a.b"]) == []
+    await cache.onMessage({'channel': b"a.b", 'data': b"3"})
+    assert cache.lookup("a.b") == (True, b"3")
+    assert cache.release(["a.b"]) == ["a.b"]
+    await cache.onMessage({'channel': b"a.b", 'data': b"4"})
+    assert cache.lookup("a.b") == (True, b"3")
+    assert cache.subscribedKeys() == ["a.c"]
+
+    # Values of unsubscribed keys expire after the ttl
+    time.sleep(0.3)
+    assert cache.lookup("a.b") == (False, None)
+
+    # A key that is subscribed again starts without a value, since it might have changed in the meantime
+    cache.retain(["a.b"])
+    await cache.onMessage({'channel': b"a.b", 'data': b"5"})
+    cache.release(["a.b"])
+    cache.retain(["a.b"])
+    assert cache.lookup("a.b") == (False, None)
+
+    # At most maxSize values are kept for unsubscribed keys, removing the least recently used first
+    for key in ["a.b", "a.c", "a.d"]:
+        cache.retain([key])
+        cache.store(key, key.encode())
+    cache.release(["a.b"], all=True)
+    cache.release(["a.c"], all=True)
+    assert cache.lookup("a.b") == (True, b"a.b")
+    cache.release(["a.d"])
+    assert cache.lookup("a.b") == (True, b"a.b")
+    assert cache.lookup("a.c") == (False, None)
+    assert cache.lookup("a.d") == (True, b"a.d")
@@ -0,0 +1,92 @@
+import cbor2
+import numpy as np
+import pytest
+
+from csw.Coords import EqCoord, EqFrame, AltAzCoord
+from csw.Event import Event, SystemEvent, ObserveEvent
+from csw.EventCodec import EventCodec, compressionMarker
+from csw.EventName import EventName
+from csw.Parameter import *
+from csw.Parameter import _cborDefault
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+
+def _makeParamSet() -> list:
+    return [
+        IntKey.make("IntValue", Units.arcsec).set(42),
+        ByteKey.make("byteValue").set(0xDE, 0xAD, 0xBE, 0xEF),
+        StringKey.make("stringValue").set("a", "b"),
+        IntMatrixKey.make("IntMatrixValue", Units.meter).set([[1, 2], [3, 4]], [[-1, -2], [-3, -4]]),
+        DoubleArrayKey.make("DoubleArrayValue").set(np.array([1.5, 2.5])),
+        UTCTimeKey.make("utcTimeValue").set(UTCTime.from_str("2021-09-20T20:43:35.419053077Z")),
+        CoordKey.make("CoordParam").set(EqCoord.make(ra="12:13:14.15 hours", dec="-30:31:32.3 deg",
+                                                     frame=EqFrame.FK5), AltAzCoord.make("301 deg", "42.5 deg")),
+    ]
+
+
+# noinspection PyProtectedMember
+def test_event_codec():
+    codec = EventCodec()
+    prefix = Prefix(Subsystem.CSW, "assembly")
+    for event in [SystemEvent(prefix, EventName("systemEvent"), _makeParamSet()),
+                  ObserveEvent(prefix, EventName("observeEvent"), _makeParamSet()),
+                  SystemEvent(prefix, EventName("emptyEvent"))]:
+        # Must be the same encoding as the one based on dicts, which matches the Scala CSW format
+        data = codec.encode(event)
+        expected = cbor2.dumps(event._asDict(), default=_cborDefault)
+        assert data == expected
+        decoded = codec.decode(data)
+        assert type(decoded) is type(event)
+        assert decoded == Event._fromDict(cbor2.loads(expected))
+        # The codec can be reused for further events
+        assert codec.encode(decoded) == expected
+
+
+# noinspection PyProtectedMember
+def test_lazy_event():
+    codec = EventCodec()
+    prefix = Prefix(Subsystem.CSW, "assembly")
+    paramSet = _makeParamSet() + [IntKey.make("IntValue").set(1)]
+    for event in [SystemEvent(prefix, EventName("systemEvent"), paramSet),
+                  ObserveEvent(prefix, EventName("observeEvent"), paramSet)]:
+        data = codec.encode(event)
+        decodedEvent = codec.decode(data)
+        lazyEvent = codec.decodeLazy(data)
+        assert isinstance(lazyEvent, type(event))
+        assert lazyEvent.eventTime == event.eventTime
+        # Only the requested parameter is decoded
+        assert lazyEvent.get("IntValue") == event.get("IntValue")
+        assert lazyEvent.get("IntValue") is lazyEvent.get("IntValue")
+        assert list(lazyEvent._decodedParams) == ["IntValue"]
+        assert lazyEvent.exists("CoordParam")
+        assert not lazyEvent.exists("missing")
+        assert lazyEvent.get("missing") is None
+        assert lazyEvent.getMany(["IntValue", "missing"]) == [lazyEvent.get("IntValue"), None]
+        # Accessing the paramSet decodes the rest
+        assert lazyEvent.paramSet == decodedEvent.paramSet
+        assert lazyEvent.paramSet[0] is lazyEvent.get("IntValue")
+        assert lazyEvent == decodedEvent and decodedEvent == lazyEvent
+        assert lazyEvent._asDict() == decodedEvent._asDict()
+        assert codec.encode(lazyEvent) == data
+
+
+def test_event_compression():
+    prefix = Prefix(Subsystem.CSW, "assembly")
+    matrix = np.tile(np.arange(256, dtype=np.float32), (256, 1))
+    largeEvent = SystemEvent(prefix, EventName("largeEvent"), [FloatMatrixKey.make("image").set(matrix)])
+    smallEvent = SystemEvent(prefix, EventName("smallEvent"), [IntKey.make("IntValue").set(42)])
+    decoder = EventCodec()
+    uncompressed = decoder.encode(largeEvent)
+    for algorithm in EventCodec.compressionAlgorithms():
+        codec = EventCodec(compression=algorithm, compressionThreshold=1024)
+        data = codec.encode(largeEvent)
+        assert data.startswith(compressionMarker)
+        assert len(data) < len(uncompressed) / 2
+        # Detected automatically when decoding
+        assert decoder.decode(data) == decoder.decode(uncompressed)
+        assert np.array_equal(decoder.decodeLazy(data).get("image").values[0], matrix)
+        # Events smaller than the threshold are not compressed
+        assert codec.encode(smallEvent) == decoder.encode(smallEvent)
+    with pytest.raises(ValueError):
+        EventCodec(compression="unknown")
@@ -1,5 +1,6 @@
 import asyncio
 import time
+from datetime import timedelta
 
 import pytest
 import structlog
@@ -52,3 +53,53 @@ class TestEventPublisher:
             p = systemEvent.get("testEventValue")
             if p is not None:
                 self.log.debug(f"Found: {p.keyName}")
+
+    # Publishes a batch of events and checks that the latest value is stored for each one.
+    # Requires that CSW services are running.
+    async def test_publish_batch(self):
+        pub = EventPublisher.make()
+        sub = EventSubscriber.make()
+
+        prefix = Prefix(Subsystem.CSW, "assembly")
+        events = [SystemEvent(prefix, EventName(f"test_batch_event{i}"), [IntKey.make("testEventValue").set(i)])
+                  for i in range(50)]
+        await pub.publishBatch(events)
+        for event in events:
+            e = await sub.get(EventKey(prefix, event.eventName))
+            assert (e == event)
+        # Get all of them at once, including one that was never published
+        eventKeys = [EventKey(prefix, event.eventName) for event in events]
+        missingKey = EventKey(prefix, EventName("test_batch_missing_event"))
+        received = await sub.getsOrdered(eventKeys + [missingKey])
+        assert received[:-1] == events
+        assert received[-1].isInvalid()
+        assert len(await sub.gets(eventKeys + eventKeys)) == len(events)
+        await pub.close()
+        await sub.close()
+
+    # Publishes a burst of events to a rate adapted subscription, which should only receive the latest one per tick.
+    # Requires that CSW services are running.
+    async def test_rate_adapter_subscription(self):
+        pub = EventPublisher.make()
+        sub = EventSubscriber.make()
+
+        prefix = Prefix(Subsystem.CSW, "assembly")
+        eventName = EventName("test_rate_adapter_event")
+        eventKey = EventKey(prefix, eventName)
+        received = []
+
+        async def callback(event):
+            received.append(event)
+
+        await pub.publish(SystemEvent(prefix, eventName, [IntKey.make("testEventValue").set(0)]))
+        subscription = await sub.subscribe([eventKey], callback, every=timedelta(seconds=0.2))
+        events = [SystemEvent(prefix, eventName, [IntKey.make("testEventValue").set(i)]) for i in range(1, 100)]
+        await pub.publishBatch(events)
+        await asyncio.sleep(0.5)
+        await subscription.unsubscribe()
+        # Ticks at about 0, 0.2 and 0.4 seconds (allowing for a late or early tick on a loaded machine):
+        # The burst of 99 events is coalesced into the latest one
+        assert 2 <= len(received) <= 4
+        assert received[-1] == events[-1]
+        await pub.close()
+        await sub.close()
@@ -0,0 +1,48 @@
+import asyncio
+
+from csw.EventQueue import EventQueue, OverflowPolicy
+
+
+async def _putAll(queue: EventQueue, items: list):
+    for key, item in items:
+        await queue.put(key, item)
+
+
+async def _getAll(queue: EventQueue) -> list:
+    return [await queue.get() for _ in range(len(queue))]
+
+
+async def test_event_queue_policies():
+    items = [("a", 1), ("b", 2), ("a", 3), ("c", 4), ("a", 5)]
+
+    queue = EventQueue(3, OverflowPolicy.DropOldest)
+    await _putAll(queue, items)
+    assert await _getAll(queue) == [3, 4, 5]
+    assert queue.dropped == 2
+
+    queue = EventQueue(3, OverflowPolicy.DropNewest)
+    await _putAll(queue, items)
+    assert await _getAll(queue) == [1, 2, 3]
+    assert queue.dropped == 2
+
+    queue = EventQueue(3, OverflowPolicy.KeepLatestPerKey)
+    await _putAll(queue, items)
+    assert await _getAll(queue) == [5, 2, 4]
+    assert queue.dropped == 2
+
+    queue = EventQueue(2, OverflowPolicy.KeepLatestPerKey)
+    await _putAll(queue, items)
+    assert await _getAll(queue) == [4, 5]
+    assert queue.dropped == 3
+
+
+async def test_event_queue_block():
+    queue = EventQueue(2, OverflowPolicy.Block)
+    producer = asyncio.create_task(_putAll(queue, [("a", i) for i in range(5)]))
+    await asyncio.sleep(0.01)
+    # The producer waits until there is room in the queue
+    assert len(queue) == 2 and not producer.done()
+    received = [await queue.get() for _ in range(5)]
+    await producer
+    assert received == [0, 1, 2, 3, 4]
+    assert queue.dropped == 0
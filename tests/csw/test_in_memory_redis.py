@@ -0,0 +1,282 @@
+import asyncio
+from datetime import timedelta
+
+from csw.Event import SystemEvent
+from csw.EventKey import EventKey
+from csw.EventName import EventName
+from csw.EventPublisher import EventPublisher
+from csw.EventQueue import OverflowPolicy
+from csw.EventSubscriber import EventSubscriber
+from csw.InMemoryRedis import InMemoryRedis
+from csw.Parameter import IntKey
+from csw.Prefix import Prefix
+from csw.RedisConnector import RedisConnector
+from csw.Subsystem import Subsystem
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+# These tests use InMemoryRedis, so they do not require the CSW services
+
+prefix = Prefix(Subsystem.CSW, "assembly")
+
+
+def makeEvent(name: str, value: int) -> SystemEvent:
+    return SystemEvent(prefix, EventName(name), [IntKey.make("testEventValue").set(value)])
+
+
+def makePubSub(**kwargs) -> tuple[EventPublisher, EventSubscriber]:
+    redis = InMemoryRedis()
+    return EventPublisher(RedisConnector(client=redis)), EventSubscriber(RedisConnector(client=redis), **kwargs)
+
+
+async def test_in_memory_redis():
+    redis = InMemoryRedis()
+    pubsub = redis.pubsub()
+    await pubsub.subscribe("a.b")
+    await pubsub.psubscribe("a.[bc]*")
+    assert await redis.publish("a.b", b"1") == 2
+    assert await redis.publish("a.x", b"2") == 0
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.set("a.c1", b"3")
+        pipe.publish("a.c1", b"3")
+        assert await pipe.execute() == [True, 1]
+    assert await redis.mget(["a.b", "a.c1"]) == [None, b"3"]
+    # The subscribe confirmations are returned as None when ignored, as with Redis
+    assert await pubsub.get_message(ignore_subscribe_messages=True) is None
+    assert await pubsub.get_message(ignore_subscribe_messages=True) is None
+    messages = []
+    while (message := await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)) is not None:
+        messages.append(message)
+    assert [(m['type'], m['channel'], m['data']) for m in messages] == [
+        ('message', b"a.b", b"1"), ('pmessage', b"a.b", b"1"), ('pmessage', b"a.c1", b"3")]
+    await pubsub.aclose()
+    assert await redis.publish("a.b", b"1") == 0
+
+
+async def test_in_memory_pub_sub():
+    pub, sub = makePubSub()
+    eventKey = EventKey(prefix, EventName("test_event"))
+    received = []
+
+    async def callback(event):
+        received.append(event)
+
+    subscription = await sub.subscribe([eventKey], callback)
+    patternSubscription = await sub.pSubscribe(["CSW.assembly.test_*"], callback)
+    event = makeEvent("test_event", 42)
+    await pub.publish(event)
+    await asyncio.sleep(0.1)
+    assert received == [event, event]
+    assert await sub.get(eventKey) == event
+    assert (await sub.getsOrdered([eventKey, EventKey(prefix, EventName("missing"))]))[1].isInvalid()
+
+    await subscription.unsubscribe()
+    await patternSubscription.unsubscribe()
+    await pub.publish(makeEvent("test_event", 43))
+    await asyncio.sleep(0.1)
+    assert len(received) == 2
+    await pub.close()
+    await sub.close()
+
+
+async def test_in_memory_subscription_options():
+    pub, sub = makePubSub(cacheSize=10)
+    eventKey = EventKey(prefix, EventName("test_event"))
+    lazyReceived = []
+    queueReceived = []
+    rateReceived = []
+
+    async def lazyCallback(event):
+        lazyReceived.append(event.get("testEventValue").values[0])
+
+    async def queueCallback(event):
+        queueReceived.append(event.get("testEventValue").values[0])
+        await asyncio.sleep(0.01)
+
+    async def rateCallback(event):
+        rateReceived.append(event)
+
+    await sub.subscribe([eventKey], lazyCallback, lazy=True)
+    queueSubscription = await sub.subscribe([eventKey], queueCallback, queueSize=1,
+                                            overflowPolicy=OverflowPolicy.DropNewest)
+    rateSubscription = await sub.subscribe([eventKey], rateCallback, every=timedelta(seconds=0.2))
+    events = [makeEvent("test_event", i) for i in range(10)]
+    await pub.publishBatch(events)
+    await asyncio.sleep(0.3)
+    assert lazyReceived == list(range(10))
+    assert len(queueReceived) + queueSubscription.dropped == 10
+    # Ticks at about 0 and 0.2 seconds: The events are coalesced
+    assert 1 <= len(rateReceived) <= 3
+    assert rateReceived[-1] == events[-1]
+    # Served from the cache
+    assert await sub.get(eventKey) == events[-1]
+    await rateSubscription.unsubscribe()
+    await pub.close()
+    await sub.close()
+
+
+async def test_unsubscribe_cancels_background_tasks():
+    pub, sub = makePubSub()
+    key1 = EventKey(prefix, EventName("event1"))
+    key2 = EventKey(prefix, EventName("event2"))
+    rateReceived = []
+
+    async def rateCallback(event):
+        rateReceived.append(event.eventName.name)
+
+    async def queueCallback(_):
+        pass
+
+    await sub.subscribe([key1, key2], rateCallback, every=timedelta(seconds=0.05))
+    queueSubscription = await sub.subscribe([key1], queueCallback, queueSize=10)
+
+    # The queue consumer is cancelled when its keys are unsubscribed, and the ticker only delivers the remaining key
+    await sub.unsubscribe([key1])
+    await asyncio.sleep(0.01)
+    assert queueSubscription.t.cancelled()
+    rateReceived.clear()
+    await asyncio.sleep(0.2)
+    assert rateReceived and set(rateReceived) == {"event2"}
+
+    # close() cancels the ticker
+    await sub.close()
+    rateReceived.clear()
+    await asyncio.sleep(0.2)
+    assert not rateReceived
+    await pub.close()
+
+
+
+# An error in the callback of a rate adapted subscription is logged, and the following ticks are still delivered
+async def test_rate_adapter_callback_error():
+    pub, sub = makePubSub()
+    eventKey = EventKey(prefix, EventName("test_event"))
+    calls = 0
+
+    async def rateCallback(_):
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("callback failed")
+
+    await pub.publish(makeEvent("test_event", 1))
+    await sub.subscribe([eventKey], rateCallback, every=timedelta(seconds=0.05))
+    await asyncio.sleep(0.3)
+    assert calls >= 2
+    await sub.close()
+    await pub.close()
+
+async def test_reconnect(monkeypatch):
+    monkeypatch.setattr(RedisConnector, "reconnectMinDelay", 0.01)
+    redis = InMemoryRedis()
+    pub = EventPublisher(RedisConnector(client=redis))
+    connector = RedisConnector(client=redis)
+    sub = EventSubscriber(connector)
+    eventKey = EventKey(prefix, EventName("test_event"))
+    received = []
+
+    async def callback(event):
+        received.append(event)
+
+    await sub.subscribe([eventKey], callback)
+    await sub.pSubscribe(["CSW.*"], callback)
+    await pub.publish(makeEvent("test_event", 1))
+    await asyncio.sleep(0.1)
+    assert len(received) == 2
+
+    # Simulate a lost connection, where the first attempt to reconnect also fails
+    async def fail(*args, **kwargs):
+        raise RedisConnectionError("Connection lost")
+
+    connector._pubsub.get_message = fail
+    newPubSubs = []
+
+    def pubsub():
+        newPubSub = InMemoryRedis.pubsub(redis)
+        if not newPubSubs:
+            newPubSub.subscribe = fail
+        newPubSubs.append(newPubSub)
+        return newPubSub
+
+    monkeypatch.setattr(redis, "pubsub", pubsub)
+    # The pending get_message() call still returns this event: The next one fails
+    await pub.publish(makeEvent("test_event", 2))
+    await asyncio.sleep(0.2)
+    assert len(newPubSubs) == 2
+    assert connector.reconnectMetrics.count == 1
+    assert connector.reconnectMetrics.lastError == "Connection lost"
+
+    # Both the channel and the pattern were subscribed again
+    event = makeEvent("test_event", 3)
+    await pub.publish(event)
+    await asyncio.sleep(0.1)
+    assert received[-2:] == [event, event]
+    await pub.close()
+    await sub.close()
+
+
+
+# redis-py raises RuntimeError from get_message() if the pubsub has no connection
+async def test_reader_runtime_error(monkeypatch):
+    monkeypatch.setattr(RedisConnector, "reconnectMinDelay", 0.01)
+    redis = InMemoryRedis()
+    pub = EventPublisher(RedisConnector(client=redis))
+    connector = RedisConnector(client=redis)
+    sub = EventSubscriber(connector)
+    eventKey = EventKey(prefix, EventName("test_event"))
+    received = []
+
+    async def callback(event):
+        received.append(event)
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("pubsub connection not set")
+
+    # While there are subscriptions, the reader reconnects instead of ending
+    await sub.subscribe([eventKey], callback)
+    await asyncio.sleep(0.01)
+    connector._pubsub.get_message = fail
+    # The pending get_message() call still returns this event: The next one fails
+    await pub.publish(makeEvent("test_event", 1))
+    await asyncio.sleep(0.1)
+    assert connector.reconnectMetrics.count == 1
+    await pub.publish(makeEvent("test_event", 2))
+    await asyncio.sleep(0.1)
+    assert len(received) == 2
+
+    # Once everything was unsubscribed, the reader ends (without reconnecting), and the next subscribe starts a new one
+    await sub.unsubscribe([eventKey])
+    connector._pubsub.get_message = fail
+    await asyncio.sleep(0.1)
+    assert connector._readerTask is None
+    assert connector.reconnectMetrics.count == 1
+    # (Subscribing again connects the pubsub)
+    del connector._pubsub.get_message
+    await sub.subscribe([eventKey], callback)
+    await pub.publish(makeEvent("test_event", 3))
+    await asyncio.sleep(0.1)
+    assert len(received) == 3
+    await pub.close()
+    await sub.close()
+
+async def test_persist_every():
+    pub, sub = makePubSub()
+    pub.persistEvery = 3
+    eventKey = EventKey(prefix, EventName("test_event"))
+    transientKey = EventKey(prefix, EventName("transient_event"))
+    pub.setPersistEvery(transientKey, 0)
+    received = []
+
+    async def callback(event):
+        received.append(event)
+
+    await sub.subscribe([eventKey, transientKey], callback)
+    events = [makeEvent("test_event", i) for i in range(5)]
+    for event in events[:4]:
+        await pub.publish(event)
+    await pub.publishBatch([events[4], makeEvent("transient_event", 0)])
+    await asyncio.sleep(0.1)
+    # All events are published, but only every 3rd one is stored as the latest value
+    assert len(received) == 6
+    assert await sub.get(eventKey) == events[3]
+    assert (await sub.get(transientKey)).isInvalid()
+    await pub.close()
+    await sub.close()
@@ -0,0 +1,31 @@
+import json
+
+from csw.CommandResponse import CommandResponse, Completed
+from csw.CommandServiceRequest import Submit
+from csw.JsonCodec import JsonCodec
+from csw.LocationService import ConnectionInfo, ComponentType, ConnectionType, HttpRegistration
+from csw.Parameter import IntKey, DoubleArrayKey, StringKey
+from csw.ParameterSetType import Setup, CommandName
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+
+def test_json_codec():
+    prefix = Prefix(Subsystem.CSW, "jsonCodecTest")
+    params = [IntKey.make("axis").set(1, 2, 3),
+              DoubleArrayKey.make("positions").set([1.5, 2.25, -3.0]),
+              StringKey.make("mode").set("fast")]
+    request = Submit(Setup(prefix, CommandName("move"), None, params))._asDict()
+    data = JsonCodec.encode(request)
+    assert isinstance(data, bytes)
+    # The result is the same as with the json module
+    assert JsonCodec.decode(data) == json.loads(json.dumps(request))
+    assert JsonCodec.decode(data.decode()) == request
+
+    resp = Completed("test-run-id")
+    assert CommandResponse._fromDict(JsonCodec.decode(JsonCodec.encode(resp._asDict()))) == resp
+
+    # Registrations are converted to dicts directly, without encoding them to JSON and decoding them again
+    conn = ConnectionInfo.make(prefix, ComponentType.Service, ConnectionType.HttpType)
+    registration = HttpRegistration(conn, 8080, "path")
+    assert registration.to_dict(encode_json=True) == json.loads(registration.to_json())
@@ -0,0 +1,65 @@
+import json
+
+import cbor2
+import numpy as np
+
+from csw.Coords import AltAzCoord, EqCoord, SolarSystemCoord, SolarSystemObject
+from csw.Parameter import Parameter, IntArrayKey, FloatArrayKey, DoubleMatrixKey, IntMatrixKey, _cborDefault, \
+    UTCTimeKey, TAITimeKey, ByteKey, AltAzCoordKey, CoordKey, StringKey
+from csw.TMTTime import UTCTime, TAITime
+from csw.Units import Units
+
+
+def _cborRoundTrip(param: Parameter) -> Parameter:
+    return Parameter._fromDict(cbor2.loads(cbor2.dumps(param._asDict(True), default=_cborDefault)), True)
+
+
+def test_ndarray_params():
+    # Values with the same shape are stacked into a single ndarray
+    matrixParam = DoubleMatrixKey.make("DoubleMatrixValue", Units.meter).set(np.eye(3), np.ones((3, 3)))
+    assert isinstance(matrixParam.values, np.ndarray)
+    assert matrixParam.values.shape == (2, 3, 3)
+    assert matrixParam == DoubleMatrixKey.make("DoubleMatrixValue", Units.meter).setAll(np.stack([np.eye(3), np.ones((3, 3))]))
+
+    # The CBOR and JSON encodings are the same as for the equivalent nested lists
+    listParam = DoubleMatrixKey.make("DoubleMatrixValue", Units.meter).setAll(matrixParam.values.tolist())
+    assert cbor2.dumps(matrixParam._asDict(True), default=_cborDefault) == cbor2.dumps(listParam._asDict(True))
+    assert json.dumps(matrixParam._asDict()) == json.dumps(listParam._asDict())
+    assert _cborRoundTrip(matrixParam) == listParam
+
+    intMatrixParam = IntMatrixKey.make("IntMatrixValue").setAll(np.array([[[1, -2], [70000, -2 ** 40]]]))
+    assert _cborRoundTrip(intMatrixParam).values == [[[1, -2], [70000, -2 ** 40]]]
+
+    floatArrayParam = FloatArrayKey.make("FloatArrayValue").set(np.array([1.5, 2.5], dtype=np.float32))
+    assert _cborRoundTrip(floatArrayParam).values == [[1.5, 2.5]]
+
+    # Arrays of different lengths are kept as a list of ndarrays
+    intArrayParam = IntArrayKey.make("IntArrayValue").set(np.arange(3), np.arange(4))
+    assert isinstance(intArrayParam.values, list)
+    assert _cborRoundTrip(intArrayParam).values == [[0, 1, 2], [0, 1, 2, 3]]
+    assert intArrayParam._asDict()['IntArrayKey']['values'] == [[0, 1, 2], [0, 1, 2, 3]]
+    # ... which can be compared with equal parameters (and with the decoded values, which are lists)
+    assert intArrayParam == IntArrayKey.make("IntArrayValue").set(np.arange(3), np.arange(4))
+    assert intArrayParam != IntArrayKey.make("IntArrayValue").set(np.arange(3), np.arange(5))
+    assert intArrayParam == _cborRoundTrip(intArrayParam)
+    assert intArrayParam != IntArrayKey.make("IntArrayValue").set(np.arange(3), np.arange(3))
+
+
+def test_param_codecs():
+    # Round trip parameters of all the key types with special encodings through CBOR (events) and JSON (commands)
+    params = [
+        UTCTimeKey.make("UTCTimeValue").set(UTCTime.from_str("2021-09-20T20:43:35.419053077Z")),
+        TAITimeKey.make("TAITimeValue").set(TAITime.from_str("2021-09-20T18:44:12.419084072Z")),
+        ByteKey.make("byteValue").set(0xDE, 0xAD, 0xBE, 0xEF),
+        AltAzCoordKey.make("AltAzValue").set(AltAzCoord.make("BASE", "301 deg", "42.5 deg")),
+        CoordKey.make("CoordValue").set(EqCoord.make(ra="12:13:14.15 hours", dec="-30:31:32.3 deg"),
+                                        SolarSystemCoord.make("BASE", SolarSystemObject.Venus)),
+        StringKey.make("StringValue").set("a", "b"),
+    ]
+    for param in params:
+        cborParam = _cborRoundTrip(param)
+        jsonParam = Parameter._fromDict(json.loads(json.dumps(param._asDict())))
+        assert cborParam._asDict(True) == param._asDict(True)
+        assert jsonParam._asDict() == param._asDict()
+    assert isinstance(_cborRoundTrip(params[0]).values[0], UTCTime)
+    assert isinstance(_cborRoundTrip(params[3]).values[0], AltAzCoord)
@@ -0,0 +1,64 @@
+from csw.CurrentState import CurrentState
+from csw.Event import SystemEvent
+from csw.EventName import EventName
+from csw.Parameter import IntKey, StringKey
+from csw.ParameterSetIndex import ParamSet
+from csw.ParameterSetType import Setup, CommandName
+from csw.Prefix import Prefix
+from csw.Subsystem import Subsystem
+
+
+def test_parameter_set_index():
+    prefix = Prefix(Subsystem.CSW, "assembly")
+    intKey = IntKey.make("intValue")
+    for paramSetType in [lambda ps: SystemEvent(prefix, EventName("event"), ps),
+                         lambda ps: CurrentState(prefix, "state", ps),
+                         lambda ps: Setup(prefix, CommandName("command"), None, ps)]:
+        params = [IntKey.make(f"p{i}").set(i) for i in range(100)]
+        first = intKey.set(1)
+        obj = paramSetType(params + [first, intKey.set(2)])
+        # The first parameter with a given name is found
+        assert obj.getMany(["p42"])[0] is params[42]
+        assert obj.getMany([intKey])[0] is first
+        assert obj.exists("intValue")
+        assert not obj.exists("missing")
+        assert obj.getMany(["p1", intKey, "missing"]) == [params[1], first, None]
+
+        # The index follows changes to the paramSet
+        added = StringKey.make("added").set("a")
+        obj.paramSet.append(added)
+        assert obj.getMany(["added"]) == [added]
+        replaced = StringKey.make("replaced").set("b")
+        obj.paramSet[0] = replaced
+        assert obj.getMany(["replaced", "p0"]) == [replaced, None]
+        # Replacing a parameter in place with an earlier one of the same name (the list length does not change)
+        earlier = intKey.set(3)
+        obj.paramSet[5] = earlier
+        assert obj.getMany([intKey, "p5"]) == [earlier, None]
+        del obj.paramSet[5]
+        assert obj.getMany([intKey]) == [first]
+        # A plain list assigned later is used as is
+        newParams = [added]
+        obj.paramSet = newParams
+        assert obj.paramSet is newParams
+        assert obj.getMany(["added", "p1"]) == [added, None]
+        newParams.append(replaced)
+        assert obj.getMany(["replaced"]) == [replaced]
+
+
+def test_parameter_set_is_copied():
+    prefix = Prefix(Subsystem.CSW, "assembly")
+    intKey = IntKey.make("intValue")
+    params = [intKey.set(1)]
+    setup = Setup(prefix, CommandName("command"), None, params)
+    # The constructor copies the list: Changes to the original list do not change the command's parameters
+    assert isinstance(setup.paramSet, ParamSet)
+    assert setup.paramSet is not params
+    added = StringKey.make("added").set("a")
+    params.append(added)
+    assert not setup.exists("added")
+    assert len(setup.paramSet) == 1
+    # Changes to the command's paramSet are seen
+    setup.paramSet.append(added)
+    assert setup.getMany(["added"]) == [added]
+    assert params == setup.paramSet
@@ -0,0 +1,41 @@
+from csw.PatternIndex import PatternIndex
+
+
+def test_glob_patterns():
+    for pattern, matching, notMatching in [
+        ("h?llo", ["hello", "hallo", "hxllo"], ["hllo", "heello"]),
+        ("h*llo", ["hllo", "heeeello"], ["hell"]),
+        ("h[ae]llo", ["hello", "hallo"], ["hillo"]),
+        ("h[^e]llo", ["hallo", "hillo"], ["hello"]),
+        ("h[a-c]llo", ["hbllo"], ["hdllo"]),
+        ("h\\*llo", ["h*llo"], ["hello"]),
+        ("TCS.*", ["TCS.mcs.position", "TCS."], ["TCSX.mcs.position", "ESW.TCS.position"]),
+    ]:
+        regex = PatternIndex.globToRegex(pattern)
+        assert all(regex.fullmatch(s) for s in matching), pattern
+        assert not any(regex.fullmatch(s) for s in notMatching), pattern
+
+
+def test_pattern_index():
+    assert PatternIndex.serverPattern("TCS.mcs.*pos*") == "TCS.*"
+    assert PatternIndex.serverPattern("*.mcs.position") == "*"
+
+    index = PatternIndex()
+    a = lambda m: None
+    b = lambda m: None
+    c = lambda m: None
+    # Only the first pattern for a subsystem needs a Redis subscription
+    assert index.add("TCS.mcs.*", a) == "TCS.*"
+    assert index.add("TCS.*.position", b) is None
+    assert index.add("*.position", c) == "*"
+    assert index.callbacks("TCS.*", "TCS.mcs.position") == [a, b]
+    assert index.callbacks("TCS.*", "TCS.mcs.state") == [a]
+    assert index.callbacks("TCS.*", "TCS.m1cs.state") == []
+    # The "*" Redis pattern only dispatches to the patterns it covers, so callbacks are not called twice
+    assert index.callbacks("*", "TCS.mcs.position") == [c]
+
+    # The Redis pattern is only removed with the last pattern for it
+    assert index.remove("TCS.mcs.*", a) is None
+    assert index.callbacks("TCS.*", "TCS.mcs.state") == []
+    assert index.remove("TCS.*.position") == "TCS.*"
+    assert index.patterns() == ["*.position"]
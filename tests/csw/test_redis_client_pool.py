@@ -0,0 +1,100 @@
+import asyncio
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from csw.EventPublisher import EventPublisher
+from csw.EventSubscriber import EventSubscriber
+from csw.InMemoryRedis import InMemoryRedis
+from csw.LocationService import TcpLocation, ConnectionInfo, ComponentType, ConnectionType
+from csw.Prefix import Prefix
+from csw.RedisClientPool import RedisClientPool
+from csw.RedisConnector import RedisConnector
+from csw.Subsystem import Subsystem
+
+
+# The Redis clients only connect when first used, so this does not require the CSW services
+async def test_redis_client_pool():
+    conn = ConnectionInfo.make(Prefix(Subsystem.CSW, "EventServer"), ComponentType.Service, ConnectionType.TcpType)
+    loc1 = TcpLocation("TcpLocation", conn, "tcp://localhost:26379", {})
+    loc2 = TcpLocation("TcpLocation", conn, "tcp://localhost:26380", {})
+    connectors = [RedisConnector(loc1), RedisConnector(loc1), RedisConnector(loc2)]
+    assert connectors[0]._redis is connectors[1]._redis
+    assert connectors[0]._redis is not connectors[2]._redis
+    assert connectors[0]._pubsub is not connectors[1]._pubsub
+
+    loop = asyncio.get_running_loop()
+    await connectors[0].close()
+    assert loc1.uri in RedisClientPool._clients[loop]
+    await connectors[1].close()
+    assert loc1.uri not in RedisClientPool._clients[loop]
+    await connectors[2].close()
+    assert not RedisClientPool._clients
+
+
+# Once the Event Server location is known, creating publishers and subscribers does not access the Location Service
+async def test_create_with_cached_location():
+    conn = ConnectionInfo.make(Prefix(Subsystem.CSW, "EventServer"), ComponentType.Service, ConnectionType.TcpType)
+    RedisClientPool._location = TcpLocation("TcpLocation", conn, "tcp://localhost:26379", {})
+    try:
+        pub = await EventPublisher.create()
+        sub = await EventSubscriber.create(cacheSize=10)
+        assert pub._redis._redis is sub._redis._redis
+        await pub.close()
+        await sub.close()
+        assert not RedisClientPool._clients
+    finally:
+        RedisClientPool.invalidateLocation()
+
+
+# A redis.asyncio client can not be used from another event loop, so the client is acquired for the event loop
+# in which a connector is first used, and the clients of closed event loops are dropped
+def test_client_per_event_loop():
+    conn = ConnectionInfo.make(Prefix(Subsystem.CSW, "EventServer"), ComponentType.Service, ConnectionType.TcpType)
+    loc = TcpLocation("TcpLocation", conn, "tcp://localhost:26379", {})
+
+    # Created outside of an event loop (as with RedisConnector.make()), and used in two asyncio.run() calls
+    connectors = [RedisConnector(loc), RedisConnector(loc)]
+    assert not RedisClientPool._clients
+
+    async def getClients():
+        return [c._redis for c in connectors], len(RedisClientPool._clients)
+
+    clients1, _ = asyncio.run(getClients())
+    assert clients1[0] is clients1[1]
+    clients2, numLoops = asyncio.run(getClients())
+    assert clients2[0] is clients2[1]
+    assert clients2[0] is not clients1[0]
+    # The client for the first (closed) event loop was dropped
+    assert numLoops == 1
+
+    # A connector can be closed in another event loop than the one it was used in
+    for c in connectors:
+        asyncio.run(c.close())
+    assert not RedisClientPool._clients
+
+
+async def test_invalidate_location_on_connection_error(monkeypatch):
+    monkeypatch.setattr(RedisConnector, "reconnectMinDelay", 0.01)
+    redis = InMemoryRedis()
+    monkeypatch.setattr(RedisClientPool, "_makeClient", classmethod(lambda cls, loc: redis))
+    conn = ConnectionInfo.make(Prefix(Subsystem.CSW, "EventServer"), ComponentType.Service, ConnectionType.TcpType)
+    RedisClientPool._location = TcpLocation("TcpLocation", conn, "tcp://localhost:26379", {})
+    try:
+        connector = await RedisConnector.create()
+
+        async def callback(_):
+            pass
+
+        await connector.subscribe(["CSW.test.event"], callback)
+
+        async def fail(*args, **kwargs):
+            raise RedisConnectionError("Connection lost")
+
+        connector._pubsub.get_message = fail
+        await asyncio.sleep(0.1)
+        assert connector.reconnectMetrics.count == 1
+        assert RedisClientPool._location is None
+        await connector.close()
+        assert not RedisClientPool._clients
+    finally:
+        RedisClientPool.invalidateLocation()
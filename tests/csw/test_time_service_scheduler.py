@@ -73,3 +73,64 @@ async def test_schedule_periodically_with_start_time():
     await asyncio.sleep(5.5)
     c.cancel()
     assert count == 4
+
+
+async def test_schedule_periodically_without_drift():
+    """
+    Schedule function foo, which takes more than half of the interval, to run 20 times per second.
+    The time taken by foo should not delay the following executions: Each one starts at its scheduled time
+    (start time + n * interval, where n also counts any executions skipped on a loaded machine).
+    """
+    loop = asyncio.get_running_loop()
+    secs = 0.05
+    skipped = 0
+    # The time of each execution and the number of executions skipped before it
+    calls = []
+
+    async def foo():
+        calls.append((loop.time(), skipped))
+        await asyncio.sleep(0.03)
+
+    def onOverrun(missed: int):
+        nonlocal skipped
+        skipped = skipped + missed
+
+    c = TimeServiceScheduler().schedulePeriodically(timedelta(seconds=secs), foo, onOverrun)
+    await asyncio.sleep(1.0)
+    c.cancel()
+    assert len(calls) >= 10
+    start = calls[0][0]
+    for i, (t, skippedBefore) in enumerate(calls):
+        scheduled = start + (i + skippedBefore) * secs
+        # With drift, the delay would grow by 0.03 secs with each execution
+        assert scheduled - 0.005 <= t < scheduled + 0.1
+
+
+async def test_schedule_periodically_with_overrun():
+    """
+    Schedule function foo, which takes longer than the interval, and check that the skipped executions are reported
+    """
+    loop = asyncio.get_running_loop()
+    secs = 0.05
+    skipped = 0
+    # The time of each execution and the number of executions skipped before it
+    calls = []
+
+    async def foo():
+        calls.append((loop.time(), skipped))
+        await asyncio.sleep(0.12)
+
+    def onOverrun(missed: int):
+        nonlocal skipped
+        skipped = skipped + missed
+
+    c = TimeServiceScheduler().schedulePeriodically(timedelta(seconds=secs), foo, onOverrun)
+    await asyncio.sleep(1.0)
+    c.cancel()
+    assert len(calls) >= 3
+    # foo runs at 0, 0.15, 0.3, ..., skipping (at least) two executions each time
+    slots = [i + skippedBefore for i, (_, skippedBefore) in enumerate(calls)]
+    assert all(b - a >= 3 for a, b in zip(slots, slots[1:]))
+    start = calls[0][0]
+    for slot, (t, _) in zip(slots, calls):
+        assert start + slot * secs - 0.005 <= t < start + slot * secs + 0.1
@@ -0,0 +1,48 @@
+import asyncio
+from datetime import timedelta
+
+from csw.EventKey import EventKey
+from csw.EventPublisher import EventPublisher
+from csw.EventSubscriber import EventSubscriber
+from csw.InMemoryRedis import InMemoryRedis
+from csw.RedisConnector import RedisConnector
+from sequencer.EventServiceDsl import EventServiceDsl
+
+
+async def test_publishEvent_every_does_not_block(monkeypatch):
+    "Periodic publishing must create the event publisher without the blocking Location Service lookup"
+    redis = InMemoryRedis()
+
+    async def create(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return EventPublisher(RedisConnector(client=redis))
+
+    def make():
+        raise AssertionError("EventPublisher.make() blocks the event loop")
+
+    monkeypatch.setattr(EventPublisher, "create", create)
+    monkeypatch.setattr(EventPublisher, "make", make)
+    dsl = EventServiceDsl()
+    event = dsl.SystemEvent("ESW.test", "periodic")
+    count = 0
+
+    async def eventGenerator():
+        nonlocal count
+        count += 1
+        return event
+
+    cancellable = dsl.publishEvent(timedelta(seconds=0.02), eventGenerator)
+    await asyncio.sleep(0.2)
+    cancellable.cancel()
+    assert count >= 2
+    sub = EventSubscriber(RedisConnector(client=redis))
+    assert await sub.get(EventKey(event.source, event.eventName)) == event
+    await sub.close()
+    await dsl._eventPublisher.close()
+
+    # Cancelling before the publisher was created stops publishing before it starts
+    dsl = EventServiceDsl()
+    count = 0
+    dsl.publishEvent(timedelta(seconds=0.02), eventGenerator).cancel()
+    await asyncio.sleep(0.1)
+    assert count == 0